@@ -0,0 +1,202 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+# Sections bigger than this are split into address chunks so one huge
+# section (.text of a big game) does not end up on a single worker.
+DEFAULT_CHUNK_SIZE = 0x1000000
+
+
+# =============================================================
+# PACKING (main process)
+# =============================================================
+
+def pack_sections(project):
+    """Flatten the project into compact per-section arrays.
+
+    Returns {section_id: (mod_idx, rng_idx, starts, ends)} where every entry
+    is an `array`, so shipping a section to a worker pickles a few flat
+    buffers instead of a graph of dataclasses. mod_idx is the module's
+    position in project.modules, rng_idx the range's position in mod.ranges.
+    Ranges pointing at a missing section get a bucket of their own, the
+    serial overlap scan reports them too.
+    """
+    packed = {sid: (array("l"), array("l"), array("Q"), array("Q"))
+              for sid in project.sections}
+
+    for mi, mod in enumerate(project.modules.values()):
+        for ri, r in enumerate(mod.ranges):
+            cols = packed.get(r.section_id)
+            if cols is None:
+                cols = packed[r.section_id] = (array("l"), array("l"),
+                                               array("Q"), array("Q"))
+            cols[0].append(mi)
+            cols[1].append(ri)
+            cols[2].append(r.start)
+            cols[3].append(r.end)
+
+    return packed
+
+
+def split_chunks(start, end, chunk_size):
+    if not chunk_size or end - start <= chunk_size:
+        return [(start, end)]
+    return [(a, min(a + chunk_size, end)) for a in range(start, end, chunk_size)]
+
+
+def as_numpy(col):
+    """Zero-copy NumPy view of a packed `array` column."""
+    return np.frombuffer(col, dtype=col.typecode) if len(col) else np.zeros(0, dtype=col.typecode)
+
+
+def take(col, keep):
+    """The kept entries of a NumPy column, packed back into an `array` for pickling."""
+    out = array(col.dtype.char)
+    out.frombytes(col[keep].tobytes())
+    return out
+
+
+def range_span(sec_start, sec_end, starts, ends):
+    """Section bounds widened to cover ranges sticking out of the section."""
+    if not starts:
+        return sec_start, sec_end
+    return min(sec_start, min(starts)), max(sec_end, max(ends))
+
+
+# =============================================================
+# WORKERS (run in child processes, plain data only)
+# =============================================================
+
+def holes_worker(task):
+    """Holes of one section chunk: task = (lo, hi, first, last, starts, ends).
+
+    Ranges are clipped to the chunk only on inner borders, so the first and
+    last chunk see exactly what the serial scan sees.
+    """
+    lo, hi, first, last, starts, ends = task
+
+    used = sorted((s if first else max(s, lo), e if last else min(e, hi))
+                  for s, e in zip(starts, ends)
+                  if (first or e > lo) and (last or s < hi))
+
+    holes, cursor = [], lo
+    for s, e in used:
+        if s > cursor:
+            holes.append((cursor, s))
+        cursor = max(cursor, e)
+
+    if cursor < hi:
+        holes.append((cursor, hi))
+
+    return holes
+
+
+def overlaps_worker(task):
+    """Overlapping range pairs of one section chunk.
+
+    task = (lo, hi, mod_idx, rng_idx, starts, ends). A pair is reported by
+    the chunk that contains the first overlapping address, so pairs spanning
+    a chunk border are never reported twice. Returns tuples
+    (mi_a, ri_a, mi_b, ri_b, size) with mi_a < mi_b.
+    """
+    lo, hi, mod_idx, rng_idx, starts, ends = task
+
+    order = sorted((i for i in range(len(starts))
+                    if starts[i] < hi and (ends[i] > lo or starts[i] >= lo)),
+                   key=lambda i: starts[i])
+
+    found, active = [], []
+    for i in order:
+        s = starts[i]
+        active = [j for j in active if ends[j] > s]
+
+        for j in active:
+            if mod_idx[i] == mod_idx[j]:
+                continue
+            if starts[j] >= ends[i]:
+                continue   # i is empty and sits at j's start: no shared byte
+            first = max(s, starts[j])
+            if not (lo <= first < hi):
+                continue
+            a, b = (j, i) if mod_idx[j] < mod_idx[i] else (i, j)
+            found.append((mod_idx[a], rng_idx[a], mod_idx[b], rng_idx[b],
+                          min(ends[i], ends[j]) - first))
+
+        active.append(i)
+
+    return found
+
+
+# =============================================================
+# DRIVERS
+# =============================================================
+
+def parallel_module_holes(project, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    secs = sorted(project.sections.values(), key=lambda s: s.start)
+    packed = pack_sections(project)
+
+    # each task carries only the ranges its chunk looks at
+    tasks, owners, glue = [], [], []
+    for k, sec in enumerate(secs):
+        _, _, starts, ends = packed[sec.id]
+        starts, ends = as_numpy(starts), as_numpy(ends)
+        chunks = split_chunks(sec.start, sec.end, chunk_size)
+        for n, (lo, hi) in enumerate(chunks):
+            first, last = n == 0, n == len(chunks) - 1
+            keep = np.ones(len(starts), dtype=bool)
+            if not first:
+                keep &= ends > lo
+            if not last:
+                keep &= starts < hi
+            tasks.append((lo, hi, first, last, take(starts, keep), take(ends, keep)))
+            owners.append((k, sec.name))
+            # a hole running into the border continues in the next chunk,
+            # unless an empty range sits right there (the serial scan starts
+            # a new hole after it)
+            glue.append(not first and not ((starts == lo) & (ends == lo)).any())
+
+    holes, last_owner = [], None
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for (owner, name), glue_lo, task, chunk in zip(owners, glue, tasks, pool.map(holes_worker, tasks)):
+            for i, (a, b) in enumerate(chunk):
+                if i == 0 and glue_lo and last_owner == owner and holes and holes[-1][2] == a == task[0]:
+                    holes[-1] = (name, holes[-1][1], b)
+                else:
+                    holes.append((name, a, b))
+            last_owner = owner
+
+    return holes
+
+
+def parallel_module_overlaps(project, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    packed = pack_sections(project)
+
+    tasks = []
+    for sid, (mod_idx, rng_idx, starts, ends) in packed.items():
+        if len(starts) < 2:
+            continue
+        sec = project.sections.get(sid)
+        if sec is None:
+            lo, hi = range_span(starts[0], ends[0], starts, ends)
+        else:
+            lo, hi = range_span(sec.start, sec.end, starts, ends)
+        s_np, e_np, mods_np, rngs_np = map(as_numpy, (starts, ends, mod_idx, rng_idx))
+        for lo, hi in split_chunks(lo, hi, chunk_size):
+            # ranges reaching into the chunk, and empty ones at its start
+            keep = (s_np < hi) & ((e_np > lo) | (s_np >= lo))
+            tasks.append((lo, hi, take(mods_np, keep), take(rngs_np, keep),
+                          take(s_np, keep), take(e_np, keep)))
+
+    found = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in pool.map(overlaps_worker, tasks):
+            found.extend(chunk)
+
+    # same order the serial nested loops produce
+    found.sort(key=lambda t: (t[0], t[2], t[1], t[3]))
+
+    mods = list(project.modules.values())
+    return [(mods[ma], mods[mb], mods[ma].ranges[ra], mods[mb].ranges[rb], size)
+            for ma, ra, mb, rb, size in found]
@@ -0,0 +1,91 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+# fill bytes linkers and compilers pad with between functions / object files
+CC, ZERO, NOP = 0xCC, 0x00, 0x90
+FILLS = {CC: "0xCC", ZERO: "0x00", NOP: "NOP"}
+
+# shorter runs are mostly padding between functions inside one object file
+MIN_RUN = 8
+# alignments above this do not make a boundary any likelier
+MAX_ALIGN = 4096
+
+
+@dataclass
+class Boundary:
+    """A likely module start inside a module hole: the first byte after a padding run."""
+    section_id: int
+    section: str
+    address: int     # the suggested module start
+    end: int         # next suggested start in the hole, or the hole end
+    fill: int        # padding byte value (see FILLS)
+    run: int         # padding bytes right before address
+    align: int       # largest power of two dividing address (capped at MAX_ALIGN)
+    score: float
+
+    @property
+    def fill_name(self):
+        return FILLS[self.fill]
+
+
+def padding_runs(buf, min_run=MIN_RUN):
+    """(starts, ends, fill bytes) of the runs of one repeated fill byte in buf
+    that are at least min_run (>= 2) long, as offsets into buf.
+
+    Vectorized in two passes over the bytes: one comparison with the
+    neighbour, one for where that flips. Only the (few) runs of equal bytes
+    found are then checked for length and fill value.
+    """
+    x = np.asarray(buf, dtype=np.uint8)
+    n = len(x)
+    if n < 2:
+        return np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.uint8)
+
+    same = np.zeros(n + 1, dtype=bool)   # same[i]: x[i] == x[i - 1]
+    np.equal(x[1:], x[:-1], out=same[1:-1])
+    flips = np.flatnonzero(same[1:] != same[:-1])
+    starts, ends = flips[0::2], flips[1::2] + 1
+
+    fills = x[starts]
+    keep = (ends - starts >= max(min_run, 2)) & ((fills == CC) | (fills == ZERO) | (fills == NOP))
+    return starts[keep], ends[keep], fills[keep]
+
+
+def suggest_boundaries(store, holes=None, min_run=MIN_RUN, limit=None):
+    """Candidate module starts in module holes, best first.
+
+    Each hole (store.compute_module_holes() by default) is read from the
+    executable image and scanned for runs of 0xCC / 0x00 / NOP padding; the
+    byte after a run that ends inside the hole is a candidate. Score is
+    log2(run length) + log2(alignment of the candidate), so long runs and
+    well aligned starts (object files are usually 16 or more aligned) rank
+    first. Raises ValueError when there is no executable.
+    """
+    img = store.executable_image()
+    p = store.project
+    sec_ids = {s.name: s.id for s in p.sections.values()}
+    if holes is None:
+        holes = store.compute_module_holes()
+
+    out = []
+    for sec_name, start, end in holes:
+        starts, ends, fills = padding_runs(img.read(start, end), min_run)
+        inside = ends < end - start
+        starts, ends, fills = starts[inside], ends[inside], fills[inside]
+        if not len(ends):
+            continue
+
+        addrs = ends + start
+        runs = ends - starts
+        align = np.minimum(addrs & -addrs, MAX_ALIGN)
+        scores = np.log2(np.minimum(runs, MAX_ALIGN)) + np.log2(align)
+        nxt = np.append(addrs[1:], end)
+
+        sec_id = sec_ids.get(sec_name)
+        out.extend(Boundary(sec_id, sec_name, a, b, f, r, al, round(sc, 2))
+                   for a, b, f, r, al, sc in zip(addrs.tolist(), nxt.tolist(), fills.tolist(),
+                                                 runs.tolist(), align.tolist(), scores.tolist()))
+
+    out.sort(key=lambda b: (-b.score, b.address))
+    return out[:limit] if limit is not None else out
@@ -0,0 +1,122 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from hex_utils import parse_hex
+
+
+@dataclass
+class PlannedRange:
+    """One pasted line, resolved against the project but not applied yet."""
+    line: int
+    start: int
+    end: int
+    module: str                      # module name as pasted ("" = default module)
+    module_id: Optional[int] = None  # None while the module is still to be created
+    section_id: Optional[int] = None
+    section: str = ""
+    error: str = ""                  # the line will not be imported
+    warning: str = ""                # imported, but worth a look
+
+    @property
+    def ok(self):
+        return not self.error
+
+
+def parse_range_lines(text):
+    """Parse 'start end [module]' lines (parse_hex rules, '#' comments).
+
+    Returns (entries, errors): PlannedRange per good line and
+    (line number, message) per bad one.
+    """
+    entries, errors = [], []
+    for no, line in enumerate(text.splitlines(), start=1):
+        line = line.split("#", 1)[0].replace(",", " ").strip()
+        if not line:
+            continue
+        parts = line.split(None, 2)
+        if len(parts) < 2:
+            errors.append((no, "expected 'start end [module]'"))
+            continue
+        try:
+            start, end = parse_hex(parts[0]), parse_hex(parts[1])
+        except ValueError:
+            errors.append((no, f"not a hex address: {line}"))
+            continue
+        entries.append(PlannedRange(no, start, end, parts[2].strip() if len(parts) > 2 else ""))
+    return entries, errors
+
+
+def plan_ranges(store, entries, default_module_id=None):
+    """Resolve sections and modules for parsed entries and flag conflicts.
+
+    Entries and sections are walked together in start order (one sorted
+    sweep); overlaps with existing ranges come from the store's interval
+    index, overlaps between pasted lines from a second sweep. The checks are
+    the ones apply_range_import's transaction makes at commit, so an entry
+    without error is imported as shown. Sets error / warning on each entry
+    and returns them by start.
+    """
+    p = store.project
+    entries = sorted(entries, key=lambda e: (e.start, e.end))
+    secs = sorted(p.sections.values(), key=lambda s: s.start)
+    by_name = {m.name.lower(): m for m in p.modules.values()}
+
+    i = 0
+    for e in entries:
+        if e.start >= e.end:
+            e.error = "start must be < end"
+            continue
+        while i < len(secs) and secs[i].end <= e.start:
+            i += 1
+        if i == len(secs) or e.start < secs[i].start:
+            e.error = "not inside any section"
+        elif e.end > secs[i].end:
+            e.error = f"crosses the end of section '{secs[i].name}'"
+        else:
+            e.section_id, e.section = secs[i].id, secs[i].name
+
+    touched = sorted({e.section_id for e in entries if e.ok})
+    store.index.refresh(store, touched)
+    taken = {(m.id, r.section_id) for sid in touched for m, r in store.section_ranges(sid)}
+
+    for e in entries:
+        if not e.ok:
+            continue
+
+        if not e.module:
+            if default_module_id is None:
+                e.error = "no module given and none selected"
+                continue
+            e.module_id = default_module_id
+            e.module = p.modules[default_module_id].name
+        elif e.module.lower() in by_name:
+            e.module_id = by_name[e.module.lower()].id
+        else:
+            e.warning = "new module"
+
+        key = (e.module_id if e.module_id is not None else e.module.lower(), e.section_id)
+        if key in taken:
+            e.error = f"module already has a range in '{e.section}'"
+            continue
+        taken.add(key)
+
+    # overlaps with existing ranges and with the other pasted lines (still
+    # sorted by start: the ones before e that reach past its start)
+    overlaps = {id(e): set() for e in entries}
+    reaching = []
+    for e in entries:
+        if not e.ok:
+            continue
+        overlaps[id(e)].update(m.name for m, r in store.index.ranges[e.section_id].query(e.start, e.end))
+        reaching = [o for o in reaching if o.end > e.start]
+        for o in reaching:
+            overlaps[id(e)].add(o.module)
+            overlaps[id(o)].add(e.module)
+        reaching.append(e)
+
+    for e in entries:
+        if overlaps[id(e)]:
+            others = "overlaps " + ", ".join(sorted(overlaps[id(e)]))
+            e.warning = f"{e.warning}; {others}" if e.warning else others
+
+    return entries
@@ -0,0 +1,126 @@
+import os
+
+import numpy as np
+
+# finest resolution: one entropy / zero / 0xCC figure per this many bytes
+BUCKET = 4096
+# each coarser level merges this many buckets of the level below
+FANOUT = 4
+# bytes read (and copied) at a time while building
+CHUNK = 4 << 20
+
+_FORMAT = 1
+
+
+def _bucket_stats(x):
+    """(entropy in bits/byte, zero fraction, 0xCC fraction) per row of x."""
+    n = x.shape[0]
+    zero = (x == 0).mean(axis=1)
+    cc = (x == 0xCC).mean(axis=1)
+
+    idx = (np.arange(n, dtype=np.int32)[:, None] * 256 + x).ravel()
+    p = np.bincount(idx, minlength=n * 256).reshape(n, 256) / x.shape[1]
+    logp = np.log2(p, where=p > 0, out=np.zeros_like(p))
+    return -(p * logp).sum(axis=1), zero, cc
+
+
+class ByteMap:
+    """Entropy and zero / 0xCC (int3 padding) density of an executable image.
+
+    Built once from the memory map, CHUNK bytes at a time, so the file is
+    never loaded whole. Level 0 holds one value of each per BUCKET bytes;
+    every further level averages FANOUT buckets of the one below, down to a
+    handful, so summary() answers any zoom from the level nearest to it in
+    O(columns). Coarser entropy is the mean of the local (4 KB) entropies,
+    which keeps code / data / padding apart instead of blending them.
+    """
+
+    def __init__(self, start, entropy, zero, cc, signature=None):
+        self.start = start
+        self.signature = signature
+        self.levels = []   # [(bucket size, entropy, zero, cc, cumulative sums)]
+
+        size = BUCKET
+        arrays = (entropy.astype(np.float32), zero.astype(np.float32), cc.astype(np.float32))
+        while True:
+            sums = [np.concatenate(([0.0], np.cumsum(a, dtype=np.float64))) for a in arrays]
+            self.levels.append((size, *arrays, sums))
+            n = len(arrays[0])
+            if n <= FANOUT:
+                break
+            pad = -n % FANOUT
+            arrays = tuple(np.pad(a, (0, pad), mode="edge").reshape(-1, FANOUT).mean(axis=1)
+                           for a in arrays)
+            size *= FANOUT
+
+    @property
+    def end(self):
+        return self.start + len(self.levels[0][1]) * BUCKET
+
+    # ---------------------------------------------------------- build
+
+    @classmethod
+    def build(cls, image):
+        """Scan the mapped image (unbacked bytes count as zeros)."""
+        lo = image.segments[0][0] // BUCKET * BUCKET
+        hi = max(s[1] for s in image.segments)
+        n = -(-(hi - lo) // BUCKET)
+
+        entropy = np.zeros(n, dtype=np.float32)
+        zero = np.zeros(n, dtype=np.float32)
+        cc = np.zeros(n, dtype=np.float32)
+
+        for a in range(lo, hi, CHUNK):
+            b = min(a + CHUNK, hi)
+            x = image.read(a, b)
+            rows = -(-len(x) // BUCKET)
+            if len(x) < rows * BUCKET:
+                x = np.pad(x, (0, rows * BUCKET - len(x)))
+            i = (a - lo) // BUCKET
+            entropy[i:i + rows], zero[i:i + rows], cc[i:i + rows] = _bucket_stats(x.reshape(rows, BUCKET))
+
+        return cls(lo, entropy, zero, cc, image.signature)
+
+    # ---------------------------------------------------------- query
+
+    def summary(self, start, end, columns):
+        """(entropy, zero, cc) arrays of `columns` values evenly covering
+        [start, end); NaN where the image has no data."""
+        width = (end - start) / columns
+        level = self.levels[0]
+        for lv in self.levels:
+            if lv[0] > width:
+                break
+            level = lv
+        size, _, _, _, sums = level
+        n = len(sums[0]) - 1
+
+        edges = start + width * np.arange(columns + 1)
+        i0 = np.clip(np.floor((edges[:-1] - self.start) / size), 0, n).astype(np.int64)
+        i1 = np.clip(np.ceil((edges[1:] - self.start) / size), 0, n).astype(np.int64)
+        count = i1 - i0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out = tuple(np.where(count > 0, (s[i1] - s[i0]) / count, np.nan) for s in sums)
+        return out
+
+    # ---------------------------------------------------------- persistence
+
+    def save(self, filename):
+        _, entropy, zero, cc, _ = self.levels[0]
+        tmp = filename + ".tmp.npz"
+        np.savez(tmp, format=_FORMAT, start=self.start, signature=np.array(self.signature, dtype=np.uint64),
+                 entropy=entropy, zero=zero, cc=cc)
+        os.replace(tmp, filename)
+
+    @classmethod
+    def load(cls, filename, signature):
+        """The saved map if it was built from a file with this signature, else None."""
+        if not os.path.exists(filename):
+            return None
+        try:
+            with np.load(filename) as data:
+                if int(data["format"]) != _FORMAT or tuple(data["signature"].tolist()) != tuple(signature):
+                    return None
+                return cls(int(data["start"]), data["entropy"], data["zero"], data["cc"], tuple(signature))
+        except (OSError, ValueError, KeyError):
+            return None
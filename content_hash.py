@@ -0,0 +1,120 @@
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# ranges are hashed in leaves of this size, a thread per leaf; a range of
+# several leaves hashes to the digest of its leaf digests
+LEAF_SIZE = 1 << 20
+DIGEST_SIZE = 16
+
+# below this many leaves the pool costs more than it saves
+MIN_PARALLEL_LEAVES = 4
+
+_ZEROS = bytes(LEAF_SIZE)
+_FORMAT = 1
+
+
+def _leaves(start, end):
+    if end - start <= LEAF_SIZE:
+        return [(start, end)]
+    return [(a, min(a + LEAF_SIZE, end)) for a in range(start, end, LEAF_SIZE)]
+
+
+def _leaf_digest(image, start, end, mask_relocations):
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+    if mask_relocations and len(image.relocs_in(start, end)[0]):
+        h.update(image.read(start, end, mask_relocations=True))
+        return h.digest()
+
+    # straight from the map; blake2b drops the GIL on buffers this big
+    for a, b, off in image.spans(start, end):
+        h.update(image.view[off:off + (b - a)] if off is not None else _ZEROS[:b - a])
+    return h.digest()
+
+
+class HashCache:
+    """Content digests of one executable, kept in a side file next to the project.
+
+    Entries are only trusted while the executable has the size, mtime and
+    image base it had when they were computed; a rebuilt binary (or a flat
+    dump mapped elsewhere) starts a fresh cache.
+    """
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self.signature = None
+        self.digests = {}   # "start-end[m]" -> hex digest
+        self.dirty = False
+
+    @staticmethod
+    def key(start, end, mask_relocations):
+        return f"{start:x}-{end:x}{'m' if mask_relocations else ''}"
+
+    def bind(self, image):
+        """Use the cache for this image, loading the side file on first use."""
+        sig = [os.path.abspath(image.path), *image.signature]
+        if self.signature == sig:
+            return
+        self.signature, self.digests, self.dirty = sig, {}, False
+
+        if self.filename and os.path.exists(self.filename):
+            try:
+                with open(self.filename, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except ValueError:
+                return
+            if data.get("format") == _FORMAT and data.get("exe") == sig:
+                self.digests = data["digests"]
+
+    def save(self):
+        if not self.dirty or not self.filename:
+            return
+        tmp = self.filename + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"format": _FORMAT, "exe": self.signature, "digests": self.digests}, f)
+        os.replace(tmp, self.filename)
+        self.dirty = False
+
+
+def hash_spans(image, spans, mask_relocations=False, cache=None, workers=None):
+    """Hex content digests of the [start, end) address spans, in order.
+
+    Spans found in cache are not read again. The rest are split into
+    LEAF_SIZE leaves hashed on a thread pool (workers=None: one thread per
+    CPU) straight from the memory map, so a 300 MB binary is never copied.
+    With mask_relocations the bytes patched by base relocations hash as
+    zeros, so the same code hashes the same whatever its image base.
+    """
+    if cache is not None:
+        cache.bind(image)
+    known = cache.digests if cache is not None else {}
+
+    todo = {}
+    for start, end in spans:
+        key = HashCache.key(start, end, mask_relocations)
+        if key not in known and key not in todo:
+            todo[key] = _leaves(start, end)
+
+    jobs = [leaf for leaves in todo.values() for leaf in leaves]
+    if len(jobs) >= MIN_PARALLEL_LEAVES and workers != 1:
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            digests = list(pool.map(lambda leaf: _leaf_digest(image, *leaf, mask_relocations), jobs))
+    else:
+        digests = [_leaf_digest(image, a, b, mask_relocations) for a, b in jobs]
+
+    fresh = {}
+    i = 0
+    for key, leaves in todo.items():
+        parts = digests[i:i + len(leaves)]
+        i += len(leaves)
+        if len(parts) == 1:
+            fresh[key] = parts[0].hex()
+        else:
+            fresh[key] = hashlib.blake2b(b"".join(parts), digest_size=DIGEST_SIZE).hexdigest()
+
+    if cache is not None and fresh:
+        cache.digests.update(fresh)
+        cache.dirty = True
+    return [known.get(k) or fresh[k]
+            for k in (HashCache.key(a, b, mask_relocations) for a, b in spans)]
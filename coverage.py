@@ -0,0 +1,127 @@
+import heapq
+from dataclasses import dataclass, field
+
+
+# how many of the biggest holes each section keeps for the rollups
+TOP_HOLES = 10
+
+
+@dataclass
+class SectionCoverage:
+    section_id: int
+    name: str
+    start: int
+    end: int
+    owned: int = 0        # bytes claimed by at least one module
+    overlapped: int = 0   # bytes claimed by two or more modules
+    hole_bytes: int = 0
+    holes: list = field(default_factory=list)         # biggest (start, end) first
+    module_bytes: dict = field(default_factory=dict)  # module id -> bytes here
+
+    @property
+    def size(self):
+        return self.end - self.start
+
+    @property
+    def percent(self):
+        return 100.0 * self.owned / self.size if self.size > 0 else 0.0
+
+
+def compute_section_coverage(sec, ranges):
+    """Coverage of one section from its (module_id, ModuleRange) pairs.
+
+    Single sweep over the range endpoints, every given range counting and
+    each clipped to the section (a broken range sticking out only covers
+    its part inside). Holes are the gaps of [start, end) no range covers,
+    so they are not guaranteed to match what compute_module_holes reports
+    for broken ranges.
+    """
+    cov = SectionCoverage(sec.id, sec.name, sec.start, sec.end)
+
+    events = []
+    for mod_id, r in ranges:
+        a, b = max(r.start, sec.start), min(r.end, sec.end)
+        if a >= b:
+            continue
+        cov.module_bytes[mod_id] = cov.module_bytes.get(mod_id, 0) + (b - a)
+        events.append((a, 1))
+        events.append((b, -1))
+    events.sort()
+
+    holes, depth, cursor = [], 0, sec.start
+    for pos, step in events:
+        if pos > cursor:
+            if depth == 0:
+                holes.append((cursor, pos))
+            else:
+                cov.owned += pos - cursor
+                if depth > 1:
+                    cov.overlapped += pos - cursor
+            cursor = pos
+        depth += step
+
+    if cursor < sec.end:
+        holes.append((cursor, sec.end))
+
+    cov.hole_bytes = sum(b - a for a, b in holes)
+    cov.holes = heapq.nlargest(TOP_HOLES, holes, key=lambda h: h[1] - h[0])
+    return cov
+
+
+class CoverageCache:
+    """Per-section coverage plus module totals, recomputed only where dirty.
+
+    The store marks sections dirty on every mutation that can change their
+    numbers; reads recompute just those sections and patch the module totals
+    by subtracting the stale contribution and adding the fresh one.
+    """
+
+    def __init__(self):
+        self.sections = {}       # section id -> SectionCoverage
+        self.module_bytes = {}   # module id -> bytes over all sections
+        self.dirty = set()
+        self.all_dirty = True
+
+    def invalidate(self, section_ids=None):
+        if section_ids is None:
+            self.all_dirty = True
+        else:
+            self.dirty.update(section_ids)
+
+    def refresh(self, project):
+        if self.all_dirty:
+            self.sections.clear()
+            self.module_bytes.clear()
+            todo = set(project.sections)
+        else:
+            todo = self.dirty
+            if not todo:
+                return
+
+        for sid in todo:
+            old = self.sections.pop(sid, None)
+            if old is not None:
+                self._add_module_bytes(old.module_bytes, -1)
+
+        buckets = {sid: [] for sid in todo if sid in project.sections}
+        for mod in project.modules.values():
+            for r in mod.ranges:
+                bucket = buckets.get(r.section_id)
+                if bucket is not None:
+                    bucket.append((mod.id, r))
+
+        for sid, ranges in buckets.items():
+            cov = compute_section_coverage(project.sections[sid], ranges)
+            self.sections[sid] = cov
+            self._add_module_bytes(cov.module_bytes, 1)
+
+        self.dirty = set()
+        self.all_dirty = False
+
+    def _add_module_bytes(self, per_module, sign):
+        for mod_id, n in per_module.items():
+            total = self.module_bytes.get(mod_id, 0) + sign * n
+            if total:
+                self.module_bytes[mod_id] = total
+            else:
+                self.module_bytes.pop(mod_id, None)
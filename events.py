@@ -0,0 +1,170 @@
+from dataclasses import dataclass, field
+
+# =============================================================
+# EVENT KINDS
+# =============================================================
+#
+# ids holds section ids for SECTION_*, module ids for MODULE_* and
+# RANGE_CHANGED. sections holds the ids of every section whose contents
+# (ranges, bounds, name) the event touched, whatever its kind.
+# EXE_DATA_READY is emitted by background work on the executable once
+# its result is in; ids holds what finished ("hashes", ...).
+
+SECTION_ADDED     = "section_added"
+SECTION_UPDATED   = "section_updated"
+SECTION_DELETED   = "section_deleted"
+MODULE_ADDED      = "module_added"
+MODULE_UPDATED    = "module_updated"
+MODULE_DELETED    = "module_deleted"
+MODULE_REORDERED  = "module_reordered"
+RANGE_CHANGED     = "range_changed"
+EXE_RANGE_CHANGED = "exe_range_changed"   # bounds or file of the executable
+SYMBOLS_CHANGED   = "symbols_changed"
+PROJECT_RELOADED  = "project_reloaded"
+EXE_DATA_READY    = "exe_data_ready"      # not a change: nothing to save
+
+SECTION_EVENTS = (SECTION_ADDED, SECTION_UPDATED, SECTION_DELETED)
+MODULE_EVENTS  = (MODULE_ADDED, MODULE_UPDATED, MODULE_DELETED, MODULE_REORDERED)
+
+# everything that changes the map itself (not symbols)
+MAP_EVENTS = SECTION_EVENTS + MODULE_EVENTS + (RANGE_CHANGED, EXE_RANGE_CHANGED, PROJECT_RELOADED)
+
+_OP_EVENTS = {
+    "section_put":  SECTION_ADDED,
+    "section_del":  SECTION_DELETED,
+    "section_set":  SECTION_UPDATED,
+    "module_put":   MODULE_ADDED,
+    "module_del":   MODULE_DELETED,
+    "module_set":   MODULE_UPDATED,
+    "module_order": MODULE_REORDERED,
+    "range_add":    RANGE_CHANGED,
+    "range_del":    RANGE_CHANGED,
+    "range_set":    RANGE_CHANGED,
+    "symbols_put":  SYMBOLS_CHANGED,
+    "symbols_del":  SYMBOLS_CHANGED,
+}
+
+
+def event_for_op(name, args, sections, modules):
+    """(kind, ids, sections) for a primitive store op, or None if the op is
+    not visible to the UI (id counters)."""
+    if name == "project_set":
+        fields = args[0]
+        if fields.keys() & {"exe_start", "exe_end", "exe_path"}:
+            return EXE_RANGE_CHANGED, (), ()
+        return None
+
+    kind = _OP_EVENTS[name]
+    ids = sections if kind in SECTION_EVENTS else modules
+    return kind, ids, sections
+
+
+# =============================================================
+# EVENTS + BATCHES
+# =============================================================
+
+@dataclass
+class ChangeEvent:
+    kind: str
+    ids: set = field(default_factory=set)
+    sections: set = field(default_factory=set)
+    external: bool = True   # stays True only if every merged change came from disk
+
+
+class EventBatch:
+    """Events of one frame, coalesced per kind (ids are merged)."""
+
+    def __init__(self):
+        self.events = {}
+
+    def __bool__(self):
+        return bool(self.events)
+
+    def __contains__(self, kind):
+        return kind in self.events
+
+    @property
+    def kinds(self):
+        return set(self.events)
+
+    @property
+    def external(self):
+        """True if everything in the batch was merged in from the project file."""
+        return all(e.external for e in self.events.values())
+
+    def add(self, kind, ids=(), sections=(), external=False):
+        ev = self.events.get(kind)
+        if ev is None:
+            ev = self.events[kind] = ChangeEvent(kind)
+        ev.ids.update(ids)
+        ev.sections.update(sections)
+        ev.external = ev.external and external
+
+    def merge(self, other):
+        for ev in other.events.values():
+            self.add(ev.kind, ev.ids, ev.sections, ev.external)
+
+    def ids(self, *kinds):
+        out = set()
+        for kind in kinds:
+            ev = self.events.get(kind)
+            if ev is not None:
+                out |= ev.ids
+        return out
+
+    def sections(self, *kinds):
+        """Touched section ids of the given kinds (none given = all)."""
+        out = set()
+        for ev in self.events.values():
+            if not kinds or ev.kind in kinds:
+                out |= ev.sections
+        return out
+
+
+# =============================================================
+# BUS
+# =============================================================
+
+class EventBus:
+    """Collects store events and delivers them once per frame.
+
+    emit() only records; flush() (called from the render loop) hands every
+    subscriber the coalesced EventBatch, so a burst of edits costs each tab
+    one update. While a transaction is open events are held back and only
+    released if it commits.
+    """
+
+    def __init__(self):
+        self._subscribers = []   # (callback, kinds or None)
+        self._pending = EventBatch()
+        self._held = None
+
+    def subscribe(self, callback, kinds=None):
+        """callback(batch) on flush, only for batches containing one of kinds."""
+        self._subscribers.append((callback, set(kinds) if kinds is not None else None))
+
+    def emit(self, kind, ids=(), sections=(), external=False):
+        target = self._held if self._held is not None else self._pending
+        target.add(kind, ids, sections, external)
+
+    def hold(self):
+        self._held = EventBatch()
+
+    def release(self, discard=False):
+        held, self._held = self._held, None
+        if held is not None and not discard:
+            self._pending.merge(held)
+
+    @property
+    def pending(self):
+        return bool(self._pending)
+
+    def flush(self):
+        batch, self._pending = self._pending, EventBatch()
+        if not batch:
+            return batch
+
+        for callback, kinds in self._subscribers:
+            if kinds is None or kinds & batch.kinds:
+                callback(batch)
+        return batch
@@ -0,0 +1,215 @@
+import mmap
+import os
+import struct
+from bisect import bisect_right
+
+import numpy as np
+
+# base relocation entry types and how many bytes they patch
+_RELOC_WIDTH = {3: 4, 10: 8}   # IMAGE_REL_BASED_HIGHLOW, IMAGE_REL_BASED_DIR64
+
+_DIR_BASERELOC = 5
+
+_SCN_CODE    = 0x00000020   # IMAGE_SCN_CNT_CODE
+_SCN_EXECUTE = 0x20000000   # IMAGE_SCN_MEM_EXECUTE
+
+
+class ExeImage:
+    """Read-only memory map of the executable a project describes.
+
+    Project addresses are virtual addresses. For a PE file they are
+    translated to file offsets through the section table (ImageBase + RVA);
+    anything else is taken as a flat image loaded at `base` (a memory
+    dump). Bytes no file data backs (uninitialized data, gaps between
+    sections) read as zeros, like the loader leaves them.
+
+    Nothing is read up front beyond the headers and the relocation table;
+    callers slice `view` (a memoryview over the map) for the bytes.
+    """
+
+    def __init__(self, path, base=0):
+        self.path = path
+        self.base = base            # as asked for; a PE's own image base wins
+        stat = os.stat(path)
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+
+        self._file = open(path, "rb")
+        self.mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else None
+        self.view = memoryview(self.mm) if self.mm is not None else memoryview(b"")
+
+        self.is_pe = False
+        self.image_base = base
+        self.segments = []          # sorted (va_start, va_end, file offset, raw size)
+        self.code = []              # (va_start, va_end) of executable sections
+        self.ptr_size = 8 if base + self.size > 1 << 32 else 4
+        self.reloc_addrs = np.zeros(0, dtype=np.uint64)
+        self.reloc_widths = np.zeros(0, dtype=np.uint8)
+
+        if self.view[:2] == b"MZ":
+            try:
+                self._parse_pe()
+            except struct.error:
+                self.close()
+                raise ValueError(f"{self.path}: truncated PE headers.")
+            except BaseException:
+                self.close()
+                raise
+        else:
+            self.segments = [(base, base + self.size, 0, self.size)]
+            self.code = [(base, base + self.size)]   # no headers to tell code from data
+        self._seg_starts = [s[0] for s in self.segments]
+
+    def close(self):
+        try:
+            self.view.release()
+            if self.mm is not None:
+                self.mm.close()
+        except BufferError:
+            pass   # arrays still point into the map; it goes when they do
+        self._file.close()
+
+    @property
+    def signature(self):
+        """(size, mtime, image base) identifying this version of the file,
+        mapped at these addresses, for caches (a flat dump moves with the
+        executable range)."""
+        return self.size, self.mtime_ns, self.image_base
+
+    # ---------------------------------------------------------- PE headers
+
+    def _parse_pe(self):
+        v = self.view
+        pe = struct.unpack_from("<I", v, 0x3C)[0]
+        if v[pe:pe + 4] != b"PE\0\0":
+            raise ValueError(f"{self.path}: MZ header without a PE signature.")
+
+        n_sections, opt_size = struct.unpack_from("<H12xH", v, pe + 6)
+        opt = pe + 24
+        magic = struct.unpack_from("<H", v, opt)[0]
+        if magic == 0x20B:      # PE32+
+            self.image_base = struct.unpack_from("<Q", v, opt + 24)[0]
+            self.ptr_size = 8
+            dirs = opt + 112
+        elif magic == 0x10B:    # PE32
+            self.image_base = struct.unpack_from("<I", v, opt + 28)[0]
+            self.ptr_size = 4
+            dirs = opt + 96
+        else:
+            raise ValueError(f"{self.path}: unknown optional header magic 0x{magic:X}.")
+
+        header_size = struct.unpack_from("<I", v, opt + 60)[0]
+        n_dirs = struct.unpack_from("<I", v, dirs - 4)[0]
+
+        segments = [(self.image_base, self.image_base + header_size, 0, min(header_size, self.size))]
+        table = opt + opt_size
+        for i in range(n_sections):
+            vsize, rva, raw_size, raw_ptr = struct.unpack_from("<4I", v, table + 40 * i + 8)
+            flags = struct.unpack_from("<I", v, table + 40 * i + 36)[0]
+            span = max(vsize, raw_size)
+            if span:
+                raw = max(0, min(raw_size, self.size - raw_ptr))
+                segments.append((self.image_base + rva, self.image_base + rva + span, raw_ptr, raw))
+                if flags & (_SCN_CODE | _SCN_EXECUTE):
+                    self.code.append((self.image_base + rva, self.image_base + rva + span))
+        self.segments = sorted(segments)
+        self.code.sort()
+        self._seg_starts = [s[0] for s in self.segments]
+        self.is_pe = True
+
+        if n_dirs > _DIR_BASERELOC:
+            rva, size = struct.unpack_from("<II", v, dirs + 8 * _DIR_BASERELOC)
+            if rva and size:
+                self._parse_relocs(self.image_base + rva, size)
+
+    def _parse_relocs(self, va, size):
+        off = self.va_to_offset(va)
+        if off is None:
+            return
+        end = min(off + size, self.size)
+
+        addrs, widths = [], []
+        while off + 8 <= end:
+            page, block = struct.unpack_from("<II", self.view, off)
+            if block < 8:
+                break
+            entries = np.frombuffer(self.view, dtype="<u2", count=(block - 8) // 2, offset=off + 8)
+            kinds = entries >> 12
+            for kind, width in _RELOC_WIDTH.items():
+                hit = kinds == kind
+                if hit.any():
+                    addrs.append(self.image_base + page + (entries[hit] & 0xFFF).astype(np.uint64))
+                    widths.append(np.full(int(hit.sum()), width, dtype=np.uint8))
+            off += block
+
+        if addrs:
+            addrs, widths = np.concatenate(addrs), np.concatenate(widths)
+            order = np.argsort(addrs, kind="stable")
+            self.reloc_addrs, self.reloc_widths = addrs[order], widths[order]
+
+    # ---------------------------------------------------------- addressing
+
+    def va_to_offset(self, va):
+        """File offset holding the byte at va, or None if no file data backs it."""
+        i = bisect_right(self._seg_starts, va) - 1
+        if i < 0:
+            return None
+        start, end, offset, raw = self.segments[i]
+        if va >= end or va - start >= raw:
+            return None
+        return offset + (va - start)
+
+    def spans(self, start, end):
+        """Split [start, end) into (va_start, va_end, file offset or None) pieces."""
+        out = []
+        i = max(bisect_right(self._seg_starts, start) - 1, 0)
+        cursor = start
+        while cursor < end:
+            while i < len(self.segments) and self.segments[i][1] <= cursor:
+                i += 1
+            if i == len(self.segments) or self.segments[i][0] >= end:
+                out.append((cursor, end, None))
+                break
+            s, e, offset, raw = self.segments[i]
+            if cursor < s:
+                out.append((cursor, s, None))
+                cursor = s
+            backed = min(end, e, s + raw)
+            if cursor < backed:
+                out.append((cursor, backed, offset + (cursor - s)))
+                cursor = backed
+            stop = min(end, e)
+            if cursor < stop:
+                out.append((cursor, stop, None))
+                cursor = stop
+            i += 1
+        return out
+
+    def relocs_in(self, start, end):
+        """(addresses, widths) of relocation fixups touching [start, end)."""
+        lo = np.searchsorted(self.reloc_addrs, max(start - 8, 0), side="left")
+        hi = np.searchsorted(self.reloc_addrs, end, side="left")
+        return self.reloc_addrs[lo:hi], self.reloc_widths[lo:hi]
+
+    def read(self, start, end, mask_relocations=False):
+        """Bytes of [start, end) as a NumPy array (zeros where unbacked),
+        relocation fixups zeroed if mask_relocations. Copies; prefer spans()
+        + view for large reads."""
+        buf = np.zeros(end - start, dtype=np.uint8)
+        for a, b, off in self.spans(start, end):
+            if off is not None:
+                buf[a - start:b - start] = np.frombuffer(self.view, dtype=np.uint8, count=b - a, offset=off)
+        if mask_relocations:
+            mask_fixups(buf, start, *self.relocs_in(start, end))
+        return buf
+
+
+def mask_fixups(buf, start, addrs, widths):
+    """Zero the relocated bytes of buf (which holds the bytes from start on)."""
+    if not len(addrs):
+        return
+    pos = (addrs.astype(np.int64) - start)[:, None] + np.arange(8)[None, :]
+    keep = np.arange(8)[None, :] < widths[:, None]
+    pos = pos[keep]
+    pos = pos[(pos >= 0) & (pos < len(buf))]
+    buf[pos] = 0
@@ -0,0 +1,130 @@
+import csv
+import json
+import os
+
+FORMATS = ("csv", "json", "jsonl")
+
+
+# =============================================================
+# ROWS (generators straight off the store, nothing formatted twice)
+# =============================================================
+
+def _addr(prefix, value):
+    """Raw integer plus its hex text, e.g. start / start_hex."""
+    return {prefix: value, f"{prefix}_hex": f"0x{value:X}"}
+
+
+def _span(start, end):
+    row = {}
+    row.update(_addr("start", start))
+    row.update(_addr("end", end))
+    row.update(_addr("size", end - start))
+    return row
+
+
+def section_hole_rows(store):
+    for a, b in store.compute_section_holes():
+        yield _span(a, b)
+
+
+def module_hole_rows(store):
+    for sec, a, b in store.compute_module_holes():
+        row = {"section": sec}
+        row.update(_span(a, b))
+        yield row
+
+
+def overlap_rows(store):
+    sections = store.project.sections
+    for A, B, rA, rB, size in store.compute_module_overlaps():
+        sec = sections.get(rA.section_id)
+        row = {"section": sec.name if sec else ""}
+        row["module_a"] = A.name
+        row.update(_addr("a_start", rA.start))
+        row.update(_addr("a_end", rA.end))
+        row["module_b"] = B.name
+        row.update(_addr("b_start", rB.start))
+        row.update(_addr("b_end", rB.end))
+        row.update(_addr("overlap_size", size))
+        yield row
+
+
+def range_rows(store):
+    sections = store.project.sections
+    for mod in store.project.modules.values():
+        for r in sorted(mod.ranges, key=lambda r: r.start):
+            sec = sections.get(r.section_id)
+            row = {"module": mod.name, "module_number": mod.number,
+                   "section": sec.name if sec else ""}
+            row.update(_span(r.start, r.end))
+            row["locked"] = r.locked
+            yield row
+
+
+# columns carrying an address/size, exported as raw int + hex text
+ADDR_COLUMNS = ("start", "end", "size", "a_", "b_", "overlap_size")
+
+
+def _cols(*names):
+    out = []
+    for n in names:
+        out.extend((n, f"{n}_hex") if n.startswith(ADDR_COLUMNS) else (n,))
+    return out
+
+# report name -> (row generator, CSV columns)
+REPORTS = {
+    "section_holes": (section_hole_rows, _cols("start", "end", "size")),
+    "module_holes":  (module_hole_rows,  _cols("section", "start", "end", "size")),
+    "overlaps":      (overlap_rows,      _cols("section", "module_a", "a_start", "a_end",
+                                               "module_b", "b_start", "b_end", "overlap_size")),
+    "ranges":        (range_rows,        _cols("module", "module_number", "section",
+                                               "start", "end", "size", "locked")),
+}
+
+
+# =============================================================
+# WRITERS (one row in memory at a time)
+# =============================================================
+
+def write_rows(rows, columns, f, fmt):
+    count = 0
+
+    if fmt == "csv":
+        writer = csv.DictWriter(f, fieldnames=columns)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+
+    elif fmt == "jsonl":
+        for row in rows:
+            f.write(json.dumps(row))
+            f.write("\n")
+            count += 1
+
+    elif fmt == "json":
+        f.write("[")
+        for row in rows:
+            f.write(",\n  " if count else "\n  ")
+            f.write(json.dumps(row))
+            count += 1
+        f.write("\n]\n" if count else "]\n")
+
+    else:
+        raise ValueError(f"Unknown export format '{fmt}', expected one of {FORMATS}.")
+
+    return count
+
+
+def export_report(store, kind, filename, fmt=None):
+    if kind not in REPORTS:
+        raise ValueError(f"Unknown report '{kind}', expected one of {tuple(REPORTS)}.")
+    if fmt is None:
+        fmt = os.path.splitext(filename)[1].lstrip(".").lower()
+
+    rows, columns = REPORTS[kind]
+    with open(filename, "w", newline="", encoding="utf-8") as f:
+        count = write_rows(rows(store), columns, f, fmt)
+
+    print(f"[EXPORT] {filename} — {count} {kind} rows written.")
+    return count
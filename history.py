@@ -0,0 +1,180 @@
+import json
+import os
+import struct
+import zlib
+from collections import deque
+
+# compressed bytes of undo history kept before the oldest steps are dropped
+DEFAULT_BUDGET = 8 << 20
+
+# step label from its first op that is not just an id counter bump
+LABELS = {
+    "project_set":  "set executable range",
+    "section_put":  "add section",
+    "section_del":  "delete section",
+    "section_set":  "edit section",
+    "module_put":   "add module",
+    "module_del":   "delete module",
+    "module_set":   "rename module",
+    "module_order": "move module",
+    "range_add":    "add range",
+    "range_del":    "delete range",
+    "range_set":    "edit range",
+    "symbols_put":  "add symbols",
+    "symbols_del":  "drop symbols",
+}
+
+_FORMAT = 1
+
+
+class Step:
+    """One undoable user action: its forward ops and their inverses, zlib'd."""
+
+    __slots__ = ("label", "blob")
+
+    def __init__(self, label, blob):
+        self.label = label
+        self.blob = blob
+
+    @classmethod
+    def pack(cls, label, redo, undo):
+        data = json.dumps({"redo": redo, "undo": undo}, separators=(",", ":"))
+        return cls(label, zlib.compress(data.encode("utf-8")))
+
+    def ops(self):
+        """(redo ops in order, undo ops in order of recording)."""
+        data = json.loads(zlib.decompress(self.blob))
+        return ([(name, tuple(args)) for name, args in data["redo"]],
+                [(name, tuple(args)) for name, args in data["undo"]])
+
+    def __len__(self):
+        return len(self.blob)
+
+
+class History:
+    """Undo / redo stacks of compressed steps, filled by ProjectStore._apply.
+
+    Every primitive op arrives here with its inverse, so a step stores
+    only what changed and undoing it replays just those inverses. Ops pile
+    up in `pending` until seal() turns them into one step (the store seals
+    at the end of each transaction, the UI once per frame). Once the
+    compressed steps exceed `budget` bytes the oldest are forgotten.
+
+    There are no periodic full snapshots between the steps. The inverses
+    are exact, so no undo needs one, and a snapshot of a big project would
+    use more than the whole budget (in lazy mode it would also have to page
+    every section in). So undoing n steps replays those n steps' ops, one
+    step at a time, and the oldest reachable state is the one just before
+    the oldest kept step. Once a step falls out of the budget there is no
+    snapshot to go back further with.
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET):
+        self.budget = budget
+        self.undo_steps = deque()
+        self.redo_steps = []
+        self.pending = []      # [(op, inverse)] of the step being recorded
+        self.replaying = False
+        self.size = 0
+
+    # ---------------------------------------------------------- recording
+
+    def record(self, op, inverse):
+        if not self.replaying:
+            self.pending.append((op, inverse))
+
+    def mark(self):
+        return len(self.pending)
+
+    def truncate(self, mark):
+        """Forget ops recorded after mark (a rolled back transaction)."""
+        del self.pending[mark:]
+
+    def seal(self):
+        if not self.pending:
+            return
+        ops = [op for op, inv in self.pending]
+        label = next((LABELS[name] for name, args in ops if name != "project_set"),
+                     LABELS[ops[0][0]])
+        step = Step.pack(label, ops, [inv for op, inv in self.pending])
+        self.pending = []
+
+        self.redo_steps = []
+        self._push_undo(step)
+
+    def _push_undo(self, step):
+        self.undo_steps.append(step)
+        self.size += len(step)
+        while self.size > self.budget and len(self.undo_steps) > 1:
+            self.size -= len(self.undo_steps.popleft())
+
+    def clear(self):
+        self.undo_steps.clear()
+        self.redo_steps = []
+        self.pending = []
+        self.size = 0
+
+    # ---------------------------------------------------------- undo / redo
+
+    def can_undo(self):
+        return bool(self.pending or self.undo_steps)
+
+    def can_redo(self):
+        return bool(self.redo_steps) and not self.pending
+
+    def take_undo(self):
+        self.seal()
+        if not self.undo_steps:
+            return None
+        step = self.undo_steps.pop()
+        self.size -= len(step)
+        self.redo_steps.append(step)
+        return step
+
+    def take_redo(self):
+        if self.pending or not self.redo_steps:
+            return None
+        step = self.redo_steps.pop()
+        self._push_undo(step)
+        return step
+
+    # ---------------------------------------------------------- persistence
+
+    def save(self, filename, project_hash):
+        """Write both stacks next to the project, tied to the saved file's hash."""
+        self.seal()
+        header = {"format": _FORMAT, "project_hash": project_hash,
+                  "undo": [s.label for s in self.undo_steps],
+                  "redo": [s.label for s in self.redo_steps]}
+        tmp = filename + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            for step in list(self.undo_steps) + self.redo_steps:
+                f.write(struct.pack("<I", len(step.blob)))
+                f.write(step.blob)
+        os.replace(tmp, filename)
+
+    def load(self, filename, project_hash):
+        """Restore the stacks if they were saved with this exact project file.
+
+        Returns False (history left empty) when the file is missing or the
+        project was changed by something else since.
+        """
+        self.clear()
+        if not os.path.exists(filename):
+            return False
+
+        with open(filename, "rb") as f:
+            header = json.loads(f.readline())
+            if header.get("format") != _FORMAT or header.get("project_hash") != project_hash:
+                return False
+            steps = []
+            for label in header["undo"] + header["redo"]:
+                size, = struct.unpack("<I", f.read(4))
+                steps.append(Step(label, f.read(size)))
+
+        n = len(header["undo"])
+        for step in steps[:n]:
+            self._push_undo(step)
+        self.redo_steps = steps[n:]
+        return True
@@ -0,0 +1,204 @@
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import groupby
+
+# =============================================================
+# ISSUE KINDS
+# =============================================================
+
+ORPHANED      = "orphaned"        # range points at a section that no longer exists
+OUT_OF_BOUNDS = "out_of_bounds"   # range is empty or sticks out of its section
+DUPLICATE     = "duplicate"       # module has more than one range in the section
+
+KINDS = (ORPHANED, OUT_OF_BOUNDS, DUPLICATE)
+
+
+@dataclass
+class Issue:
+    kind: str
+    module_id: int
+    module: str
+    section_id: int
+    start: int
+    end: int
+    locked: bool
+    message: str
+
+    @property
+    def key(self):
+        """(section_id, start, end), how store ops address the range."""
+        return (self.section_id, self.start, self.end)
+
+
+def section_label(project, section_id):
+    """Section name for display, also for ranges whose section is gone."""
+    sec = project.sections.get(section_id)
+    return sec.name if sec is not None else f"<deleted section #{section_id}>"
+
+
+def check_section(project, section_id, pairs):
+    """Issues among the (mod, rng) pairs that claim section_id."""
+    sec = project.sections.get(section_id)
+    out = []
+
+    def issue(kind, mod, r, message):
+        out.append(Issue(kind, mod.id, mod.name, section_id, r.start, r.end, r.locked, message))
+
+    if sec is None:
+        for mod, r in pairs:
+            issue(ORPHANED, mod, r, f"section #{section_id} was deleted")
+        return out
+
+    seen = set()
+    for mod, r in sorted(pairs, key=lambda p: (p[1].start, p[1].end)):
+        if r.start >= r.end:
+            issue(OUT_OF_BOUNDS, mod, r, "empty range")
+        elif r.start < sec.start or r.end > sec.end:
+            issue(OUT_OF_BOUNDS, mod, r, f"outside section '{sec.name}' "
+                                         f"(0x{sec.start:X}-0x{sec.end:X})")
+        if mod.id in seen:
+            issue(DUPLICATE, mod, r, f"second range of '{mod.name}' in '{sec.name}'")
+        seen.add(mod.id)
+    return out
+
+
+# =============================================================
+# CHECKER
+# =============================================================
+
+class IntegrityChecker:
+    """Orphaned, out-of-bounds and duplicate module ranges, kept per section.
+
+    The store marks the sections every op touched dirty (like the address
+    index), so after an edit only those sections are checked again; a
+    freshly loaded project is scanned in full once. Deleting a section
+    marks it dirty too, which is how its leftover ranges become orphans.
+    """
+
+    def __init__(self):
+        self.issues = {}        # section id -> [Issue]
+        self.dirty = set()
+        self.all_dirty = True
+
+    def invalidate(self, section_ids=None):
+        if section_ids is None:
+            self.all_dirty = True
+        else:
+            self.dirty.update(section_ids)
+
+    def refresh(self, store):
+        p = store.project
+        if self.all_dirty:
+            store.materialize()
+            todo = None
+        elif self.dirty:
+            todo = self.dirty
+            store.materialize(todo)
+        else:
+            return
+
+        groups = {} if todo is None else {sid: [] for sid in todo}
+        for mod in p.modules.values():
+            for r in mod.ranges:
+                if todo is None:
+                    groups.setdefault(r.section_id, []).append((mod, r))
+                else:
+                    bucket = groups.get(r.section_id)
+                    if bucket is not None:
+                        bucket.append((mod, r))
+
+        if todo is None:
+            self.issues = {}
+        for sid, pairs in groups.items():
+            found = check_section(p, sid, pairs)
+            if found:
+                self.issues[sid] = found
+            else:
+                self.issues.pop(sid, None)
+
+        self.dirty = set()
+        self.all_dirty = False
+
+    def all(self, store, section_ids=None):
+        """Current issues (of section_ids, None = all) by section, module, start."""
+        self.refresh(store)
+        wanted = self.issues if section_ids is None else section_ids
+        return sorted((i for sid in wanted for i in self.issues.get(sid, ())),
+                      key=lambda i: (i.section_id, i.module_id, i.start, i.end, i.kind))
+
+
+# =============================================================
+# FIXES
+# =============================================================
+
+def plan_fixes(store, issues, include_locked=False):
+    """Store ops repairing issues, per (module, section) they occur in.
+
+    - orphaned ranges move to the section now containing them if the
+      module has no range there yet, otherwise they are deleted;
+    - out-of-bounds ranges are clipped to their section (deleted if
+      nothing is left);
+    - a module's ranges in one section are merged into a single range
+      spanning them all (locked if any of them was).
+
+    Groups containing a locked range are left alone unless include_locked.
+    Returns (ops, skipped issues).
+    """
+    p = store.project
+    secs = sorted(p.sections.values(), key=lambda s: s.start)
+    starts = [s.start for s in secs]
+
+    def containing(start, end):
+        i = bisect_right(starts, start) - 1
+        if i >= 0 and secs[i].start <= start < end <= secs[i].end:
+            return secs[i]
+        return None
+
+    ops, skipped = [], []
+    claimed = set()   # (module id, section id) given a range by a fix
+    issues = sorted(issues, key=lambda i: (i.module_id, i.section_id))
+
+    for (mod_id, sid), group in groupby(issues, key=lambda i: (i.module_id, i.section_id)):
+        group = list(group)
+        if mod_id not in p.modules:
+            continue
+        ranges = [r for r in store.module_ranges(mod_id) if r.section_id == sid]
+        if not ranges:
+            continue   # already fixed
+        if not include_locked and any(r.locked for r in ranges):
+            skipped.extend(group)
+            continue
+
+        sec = p.sections.get(sid)
+        if sec is None:
+            taken = {r.section_id for r in store.module_ranges(mod_id)} | \
+                    {s for m, s in claimed if m == mod_id}
+            for r in ranges:
+                key = (r.section_id, r.start, r.end)
+                target = containing(r.start, r.end)
+                if target is not None and target.id not in taken:
+                    ops.append(("range_set", (mod_id, key, {"section_id": target.id})))
+                    taken.add(target.id)
+                    claimed.add((mod_id, target.id))
+                else:
+                    ops.append(("range_del", (mod_id, key)))
+            continue
+
+        clipped = [(max(r.start, sec.start), min(r.end, sec.end)) for r in ranges]
+        clipped = [(a, b) for a, b in clipped if a < b]
+
+        # deletes go first: an identical duplicate of the kept range may be
+        # the one removed, the set then lands on its twin
+        keep, rest = ranges[0], ranges[1:]
+        if not clipped:
+            keep, rest = None, ranges
+        for r in rest:
+            ops.append(("range_del", (mod_id, (sid, r.start, r.end))))
+
+        if keep is not None:
+            fields = {"start": min(a for a, b in clipped), "end": max(b for a, b in clipped),
+                      "locked": any(r.locked for r in ranges)}
+            if (keep.start, keep.end, keep.locked) != (fields["start"], fields["end"], fields["locked"]):
+                ops.append(("range_set", (mod_id, (sid, keep.start, keep.end), fields)))
+
+    return ops, skipped
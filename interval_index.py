@@ -0,0 +1,226 @@
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+import analysis
+
+
+class IntervalIndex:
+    """Static index over half-open intervals [start, end).
+
+    Intervals are kept sorted by start and read as an implicit balanced
+    tree (the middle of every slice is its root); each root carries the
+    largest end in its subtree. A query only descends into subtrees that
+    start before the window and reach past its start, so it costs
+    O(log n) per interval found however the intervals nest, and results
+    come out in start order.
+    """
+
+    def __init__(self, items=()):
+        items = sorted(items, key=lambda t: (t[0], t[1]))
+        self.starts   = [t[0] for t in items]
+        self.ends     = [t[1] for t in items]
+        self.payloads = [t[2] for t in items]
+
+        self.max_end = [None] * len(items)   # by subtree root
+        self._build(0, len(items))
+
+    def _build(self, lo, hi):
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        m = self.ends[mid]
+        for sub in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if sub is not None and sub > m:
+                m = sub
+        self.max_end[mid] = m
+        return m
+
+    def __len__(self):
+        return len(self.starts)
+
+    def query(self, start, end):
+        """Payloads of all intervals intersecting [start, end), by start."""
+        out = []
+        self._collect(0, len(self.starts), bisect_left(self.starts, end), start, out)
+        return out
+
+    def _collect(self, lo, hi, stop, start, out):
+        # in order over [lo, hi), skipping subtrees that start at or after
+        # stop (the window end) or all end at or before start
+        if lo >= hi or lo >= stop:
+            return
+        mid = (lo + hi) // 2
+        if self.max_end[mid] <= start:
+            return
+        self._collect(lo, mid, stop, start, out)
+        if mid < stop and self.ends[mid] > start:
+            out.append(self.payloads[mid])
+        self._collect(mid + 1, hi, stop, start, out)
+
+    def at(self, addr):
+        return self.query(addr, addr + 1)
+
+
+class AddressIndex:
+    """Interval indexes over a project, rebuilt per section on demand.
+
+    Sections and executable holes are cheap and rebuilt on any change;
+    module ranges and module holes are indexed per section and only the
+    sections the store marks dirty are rebuilt.
+    """
+
+    def __init__(self):
+        self.sections = None    # IntervalIndex of Section
+        self.exe_holes = None   # IntervalIndex of (start, end)
+        self.ranges = {}        # section id -> IntervalIndex of (mod, rng)
+        self.holes = {}         # section id -> IntervalIndex of (name, start, end)
+        self.layout = {}        # section id -> (starts, [(start, end, kind, payload)]) ranges + holes
+        self.all_dirty = True
+
+    def invalidate(self, section_ids=None):
+        self.sections = None
+        self.exe_holes = None
+        if section_ids is None:
+            self.all_dirty = True
+        else:
+            self.forget(section_ids)
+
+    def forget(self, section_ids):
+        """Drop the range / hole indexes of these sections only (their
+        ranges were paged out; the sections themselves did not change)."""
+        for sid in section_ids:
+            self.ranges.pop(sid, None)
+            self.holes.pop(sid, None)
+            self.layout.pop(sid, None)
+
+    def refresh(self, store, section_ids=None):
+        """Build whatever is missing for section_ids (None = all sections)."""
+        p = store.project
+        if self.all_dirty:
+            self.ranges.clear()
+            self.holes.clear()
+            self.layout.clear()
+            self.all_dirty = False
+
+        if self.sections is None:
+            self.sections = IntervalIndex((s.start, s.end, s) for s in p.sections.values())
+            self.exe_holes = IntervalIndex((a, b, (a, b)) for a, b in store.compute_section_holes())
+
+        wanted = p.sections if section_ids is None else section_ids
+        todo = {sid: [] for sid in wanted if sid in p.sections and sid not in self.ranges}
+        if not todo:
+            return
+
+        store.materialize(todo)
+
+        for mod in p.modules.values():
+            for r in mod.ranges:
+                bucket = todo.get(r.section_id)
+                if bucket is not None:
+                    bucket.append((mod, r))
+
+        for sid, pairs in todo.items():
+            sec = p.sections[sid]
+            self.ranges[sid] = IntervalIndex((r.start, r.end, (m, r)) for m, r in pairs)
+
+            holes = analysis.holes_worker((sec.start, sec.end, True, True,
+                                           [r.start for m, r in pairs],
+                                           [r.end for m, r in pairs]))
+            self.holes[sid] = IntervalIndex((a, b, (sec.name, a, b)) for a, b in holes)
+
+            entries = sorted([(r.start, r.end, "range", (m, r)) for m, r in pairs]
+                             + [(a, b, "hole", (sec.name, a, b)) for a, b in holes],
+                             key=lambda e: (e[0], e[1]))
+            self.layout[sid] = ([e[0] for e in entries], entries)
+
+    def query(self, store, start, end):
+        self.refresh(store, ())
+
+        secs = self.sections.query(start, end)
+        self.refresh(store, [s.id for s in secs])
+
+        ranges, holes = [], []
+        for sec in secs:
+            ranges.extend(self.ranges[sec.id].query(start, end))
+            holes.extend(self.holes[sec.id].query(start, end))
+
+        return {
+            "sections":  secs,
+            "ranges":    ranges,
+            "holes":     holes,
+            "exe_holes": self.exe_holes.query(start, end),
+        }
+
+    def locate(self, store, addr):
+        """What is at addr and what lies right before / after it.
+
+        Inside a section the neighbours are module ranges and holes of that
+        section, outside one they are the nearest sections. prev is the last
+        item ending at or before addr, next the first one starting after it;
+        both are (start, end, kind, payload) with kind "range" (payload
+        (mod, rng)), "hole" ((section_name, start, end)) or "section" (Section).
+        """
+        self.refresh(store, ())
+        secs = self.sections.at(addr)
+        out = {"section": secs[0] if secs else None, "ranges": [], "hole": None,
+               "exe_hole": None, "prev": None, "next": None}
+
+        if not secs:
+            holes = self.exe_holes.at(addr)
+            out["exe_hole"] = holes[0] if holes else None
+            entries = [(s.start, s.end, "section", s) for s in self.sections.payloads]
+            starts = self.sections.starts
+        else:
+            sid = secs[0].id
+            self.refresh(store, [sid])
+            out["ranges"] = self.ranges[sid].at(addr)
+            holes = self.holes[sid].at(addr)
+            out["hole"] = holes[0] if holes else None
+            starts, entries = self.layout[sid]
+
+        i = bisect_right(starts, addr)
+        if i < len(entries):
+            out["next"] = entries[i]
+
+        # overlapping items may still cover addr; walk back to one that ended
+        j = i - 1
+        while j >= 0 and entries[j][1] > addr:
+            j -= 1
+        if j >= 0:
+            out["prev"] = entries[j]
+        return out
+
+    def owners(self, store, addrs):
+        """The (mod, rng) locate() lists first at each of the ascending addrs,
+        or None where no module range holds one.
+
+        One sorted merge per section instead of a locate per address: the
+        first range by start that reaches past an address is found by
+        binary search over the running maximum of the range ends.
+        """
+        self.refresh(store, ())
+        addrs = np.asarray(addrs, dtype=np.uint64)
+        out = [None] * len(addrs)
+        if not len(addrs) or not len(self.sections):
+            return out
+
+        secs = self.sections
+        which = np.searchsorted(np.array(secs.starts, dtype=np.uint64), addrs, side="right") - 1
+        for i in np.unique(which[which >= 0]).tolist():
+            sec = secs.payloads[i]
+            lo, hi = np.searchsorted(which, [i, i + 1])
+            hi = lo + np.searchsorted(addrs[lo:hi], np.uint64(sec.end))   # past the section end
+            if lo == hi:
+                continue
+            self.refresh(store, [sec.id])
+            ranges = self.ranges[sec.id]
+            if not len(ranges):
+                continue
+            part = addrs[lo:hi]
+            begun = np.searchsorted(np.array(ranges.starts, dtype=np.uint64), part, side="right")
+            reach = np.maximum.accumulate(np.array(ranges.ends, dtype=np.uint64))
+            first = np.searchsorted(reach, part, side="right")
+            for k in np.flatnonzero(first < begun).tolist():
+                out[lo + k] = ranges.payloads[first[k]]
+        return out
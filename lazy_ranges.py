@@ -0,0 +1,171 @@
+from array import array
+from collections import OrderedDict
+
+from models import ModuleRange
+
+# default number of materialized ranges kept before LRU sections are paged out
+DEFAULT_BUDGET = 200_000
+
+
+class _Packed:
+    """Ranges of one section that are not materialized, as flat columns."""
+
+    __slots__ = ("mod_ids", "starts", "ends", "locked")
+
+    def __init__(self):
+        self.mod_ids = array("q")
+        self.starts  = array("Q")
+        self.ends    = array("Q")
+        self.locked  = array("b")
+
+    def __len__(self):
+        return len(self.starts)
+
+    def append(self, mod_id, start, end, locked):
+        self.mod_ids.append(mod_id)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.locked.append(1 if locked else 0)
+
+    def without_module(self, mod_id):
+        out = _Packed()
+        for i in range(len(self)):
+            if self.mod_ids[i] != mod_id:
+                out.append(self.mod_ids[i], self.starts[i], self.ends[i], self.locked[i])
+        return out
+
+
+class LazyRanges:
+    """Per-section range materialization with an LRU memory budget.
+
+    Sections start out packed: their ranges sit in compact arrays and no
+    ModuleRange exists for them. materialize() turns a section's ranges
+    into objects appended to their modules; once more than `budget` ranges
+    are resident, the least recently used sections are packed again from
+    their live objects, so edits survive eviction.
+
+    Paging a section out drops its ModuleRange objects; on_page_out(sid) is
+    called right after so whoever caches them can let go. Pinned sections
+    (the ones an edit in progress works on) are never paged out.
+    """
+
+    def __init__(self, budget=DEFAULT_BUDGET, on_page_out=None):
+        self.budget = budget
+        self.on_page_out = on_page_out
+        self.packed = {}             # section id -> _Packed
+        self.module_sections = {}    # module id -> section ids with packed ranges
+        self.resident = OrderedDict()  # section id -> resident range count, LRU first
+        self.pinned = set()
+
+    # ---------------------------------------------------------- loading
+
+    def add(self, mod_id, section_id, start, end, locked=False):
+        packed = self.packed.get(section_id)
+        if packed is None:
+            packed = self.packed[section_id] = _Packed()
+        packed.append(mod_id, start, end, locked)
+        self.module_sections.setdefault(mod_id, set()).add(section_id)
+
+    # ---------------------------------------------------------- queries
+
+    def is_resident(self, section_id):
+        return section_id not in self.packed
+
+    def sections_of_module(self, mod_id):
+        return set(self.module_sections.get(mod_id, ()))
+
+    def packed_range_dicts(self):
+        """{module id: [range dict]} for everything still packed (for saving)."""
+        out = {}
+        for sid, packed in self.packed.items():
+            for i in range(len(packed)):
+                out.setdefault(packed.mod_ids[i], []).append({
+                    "section_id": sid,
+                    "start":      packed.starts[i],
+                    "end":        packed.ends[i],
+                    "locked":     bool(packed.locked[i]),
+                })
+        return out
+
+    # ---------------------------------------------------------- paging
+
+    def materialize(self, project, section_ids=None):
+        """Make the given sections (None = all) resident, then trim to budget.
+
+        Returns the ids of sections that were actually materialized.
+        """
+        wanted = list(self.packed) if section_ids is None else list(section_ids)
+        loaded = []
+
+        for sid in wanted:
+            packed = self.packed.pop(sid, None)
+            if packed is not None:
+                self._unpack(project, sid, packed)
+                loaded.append(sid)
+            elif sid in self.resident:
+                self.resident.move_to_end(sid)
+
+        # a full materialization keeps everything until the next targeted one
+        if section_ids is not None:
+            self.trim(project, keep=wanted)
+        return loaded
+
+    def trim(self, project, keep=()):
+        keep = set(keep) | self.pinned
+        total = sum(self.resident.values())
+
+        for sid in list(self.resident):
+            if total <= self.budget:
+                break
+            if sid in keep:
+                continue
+            total -= self.resident[sid]
+            self._pack(project, sid)
+
+    def _unpack(self, project, sid, packed):
+        for i in range(len(packed)):
+            mod = project.modules.get(packed.mod_ids[i])
+            if mod is None:
+                continue
+            mod.ranges.append(ModuleRange(sid, packed.starts[i], packed.ends[i],
+                                          bool(packed.locked[i])))
+            secs = self.module_sections.get(mod.id)
+            if secs is not None:
+                secs.discard(sid)
+
+        self.resident[sid] = len(packed)
+
+    def _pack(self, project, sid):
+        packed = _Packed()
+        for mod in project.modules.values():
+            keep = []
+            for r in mod.ranges:
+                if r.section_id == sid:
+                    packed.append(mod.id, r.start, r.end, r.locked)
+                    self.module_sections.setdefault(mod.id, set()).add(sid)
+                else:
+                    keep.append(r)
+            if len(keep) != len(mod.ranges):
+                mod.ranges = keep
+
+        del self.resident[sid]
+        if len(packed):
+            self.packed[sid] = packed
+        if self.on_page_out is not None:
+            self.on_page_out(sid)
+
+    # ---------------------------------------------------------- mutations
+
+    def drop_module(self, mod_id):
+        for sid in self.module_sections.pop(mod_id, ()):
+            packed = self.packed.get(sid)
+            if packed is not None:
+                self.packed[sid] = packed.without_module(mod_id)
+
+    def range_added(self, sid):
+        self.resident[sid] = self.resident.get(sid, 0) + 1
+
+    def range_removed(self, sid):
+        count = self.resident.get(sid)
+        if count:
+            self.resident[sid] = count - 1
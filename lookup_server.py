@@ -0,0 +1,328 @@
+import argparse
+import asyncio
+import json
+import threading
+import time
+
+import export
+from store import ProjectStore
+from hex_utils import parse_hex
+from watcher import ProjectFileWatcher
+
+DEFAULT_PORT = 8765
+
+# publish() at most this often while the map is being edited
+MIN_PUBLISH_INTERVAL = 1.0
+
+MAX_BODY = 16 << 20
+
+# JSON-RPC 2.0 error codes
+PARSE_ERROR      = -32700
+INVALID_REQUEST  = -32600
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS   = -32602
+INTERNAL_ERROR   = -32603
+
+_REASONS = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+            405: "Method Not Allowed", 413: "Payload Too Large"}
+
+
+class RpcError(Exception):
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+
+
+def _addr(value):
+    """Addresses arrive as JSON numbers or hex strings (parse_hex rules)."""
+    if isinstance(value, bool):
+        raise RpcError(INVALID_PARAMS, f"Not an address: {value!r}")
+    if isinstance(value, int):
+        return value
+    try:
+        return parse_hex(value)
+    except (TypeError, ValueError):
+        raise RpcError(INVALID_PARAMS, f"Not an address: {value!r}")
+
+
+def _span(start, end, addr=None):
+    out = {"start": start, "end": end, "size": end - start}
+    if addr is not None:
+        out["offset"] = addr - start
+    return out
+
+
+class LookupServer:
+    """Local JSON-RPC 2.0 over HTTP/1.1 server answering address lookups.
+
+    Requests are POSTed to /rpc (single calls or batches) on keep-alive
+    connections and always run against an immutable snapshot of the store
+    (ProjectStore.snapshot()), so the owner of the live store keeps editing
+    on its own thread; publish() swaps in a fresh snapshot, publish_if_due()
+    only once the store's version moved on.
+
+    Methods:
+        resolve(address)            what is at one address
+        resolve_many(addresses)     the same for a list, in order
+        query(start, end)           everything intersecting [start, end)
+        report(kind, offset, limit) rows of an export report (export.REPORTS)
+        version()                   version of the snapshot being served
+    """
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_PORT):
+        self.host = host
+        self.port = port
+
+        self.snapshot = None
+        self.published_at = 0.0
+        self._reports = (None, {})   # (snapshot, {kind: rows}) cache
+
+        self.server = None
+        self._thread = None
+        self._loop = None
+
+    # ---------------------------------------------------------- snapshots
+
+    def publish(self, store):
+        """Serve a fresh copy of store from now on (call on the store's thread)."""
+        self.snapshot = store.snapshot()
+        self.published_at = time.monotonic()
+
+    def publish_if_due(self, store):
+        """publish() if the store changed since (its version moved on), but
+        not more than once per MIN_PUBLISH_INTERVAL so a burst of edits costs
+        one copy. Cheap enough to call every frame."""
+        if self.snapshot is not None and self.snapshot.version == store.version:
+            return
+        if time.monotonic() - self.published_at >= MIN_PUBLISH_INTERVAL:
+            self.publish(store)
+
+    # ---------------------------------------------------------- methods
+
+    def rpc_resolve(self, snap, address):
+        addr = _addr(address)
+        loc = snap.locate(addr)
+        sec = loc["section"]
+        return {
+            "address":  addr,
+            "section":  dict(name=sec.name, **_span(sec.start, sec.end, addr)) if sec else None,
+            "modules":  [dict(name=m.name, **_span(r.start, r.end, addr)) for m, r in loc["ranges"]],
+            "in_hole":  loc["hole"] is not None or loc["exe_hole"] is not None,
+        }
+
+    def rpc_resolve_many(self, snap, addresses):
+        if not isinstance(addresses, list):
+            raise RpcError(INVALID_PARAMS, "addresses must be a list.")
+        return [self.rpc_resolve(snap, a) for a in addresses]
+
+    def rpc_query(self, snap, start, end):
+        start, end = _addr(start), _addr(end)
+        if start >= end:
+            raise RpcError(INVALID_PARAMS, "Query start must be < end.")
+        result = snap.query(start, end)
+        sections = snap.project.sections
+        return {
+            "sections":  [dict(name=s.name, **_span(s.start, s.end)) for s in result["sections"]],
+            "ranges":    [dict(module=m.name, section=sections[r.section_id].name,
+                               **_span(r.start, r.end)) for m, r in result["ranges"]],
+            "holes":     [dict(section=n, **_span(a, b)) for n, a, b in result["holes"]],
+            "exe_holes": [_span(a, b) for a, b in result["exe_holes"]],
+        }
+
+    def rpc_report(self, snap, kind, offset=0, limit=1000):
+        if kind not in export.REPORTS:
+            raise RpcError(INVALID_PARAMS, f"Unknown report '{kind}', expected one of {tuple(export.REPORTS)}.")
+
+        cached_snap, cache = self._reports
+        if cached_snap is not snap:
+            cache = {}
+            self._reports = (snap, cache)
+        if kind not in cache:
+            cache[kind] = list(export.REPORTS[kind][0](snap))
+
+        rows = cache[kind]
+        return {"total": len(rows), "offset": offset, "rows": rows[offset:offset + limit]}
+
+    def rpc_version(self, snap):
+        return snap.version
+
+    # ---------------------------------------------------------- JSON-RPC
+
+    def _call(self, snap, request):
+        if not isinstance(request, dict) or request.get("jsonrpc") != "2.0" \
+                or not isinstance(request.get("method"), str):
+            return {"jsonrpc": "2.0", "id": None,
+                    "error": {"code": INVALID_REQUEST, "message": "Invalid request."}}
+
+        req_id = request.get("id")
+        method = getattr(self, "rpc_" + request["method"], None)
+        params = request.get("params", [])
+
+        try:
+            if method is None:
+                raise RpcError(METHOD_NOT_FOUND, f"Unknown method '{request['method']}'.")
+            if isinstance(params, dict):
+                result = method(snap, **params)
+            elif isinstance(params, list):
+                result = method(snap, *params)
+            else:
+                raise RpcError(INVALID_PARAMS, "params must be a list or object.")
+            response = {"jsonrpc": "2.0", "id": req_id, "result": result}
+        except RpcError as e:
+            response = {"jsonrpc": "2.0", "id": req_id, "error": {"code": e.code, "message": str(e)}}
+        except TypeError as e:
+            response = {"jsonrpc": "2.0", "id": req_id, "error": {"code": INVALID_PARAMS, "message": str(e)}}
+        except Exception as e:
+            # a bug in a handler must not drop the connection without an answer
+            print(f"[SERVE] {request['method']} failed: {e!r}")
+            response = {"jsonrpc": "2.0", "id": req_id,
+                        "error": {"code": INTERNAL_ERROR, "message": f"Internal error: {e}"}}
+
+        # notifications (no id) get no answer
+        return response if "id" in request else None
+
+    def handle_rpc(self, body):
+        """JSON text of the response for a request body, or None (all notifications)."""
+        try:
+            request = json.loads(body)
+        except ValueError:
+            return json.dumps({"jsonrpc": "2.0", "id": None,
+                               "error": {"code": PARSE_ERROR, "message": "Parse error."}})
+
+        snap = self.snapshot   # one snapshot for the whole batch
+        if isinstance(request, list) and request:
+            out = [r for r in (self._call(snap, req) for req in request) if r is not None]
+            return json.dumps(out) if out else None
+
+        response = self._call(snap, request)
+        return json.dumps(response) if response is not None else None
+
+    # ---------------------------------------------------------- HTTP
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, path, version = line.decode("latin-1").split()
+
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    self._respond(writer, 413, None, False)
+                    break
+                body = await reader.readexactly(length)
+
+                conn = headers.get("connection", "").lower()
+                keep_alive = conn == "keep-alive" or (version == "HTTP/1.1" and conn != "close")
+
+                if path.split("?", 1)[0] not in ("/", "/rpc"):
+                    self._respond(writer, 404, None, keep_alive)
+                elif method != "POST":
+                    self._respond(writer, 405, None, keep_alive)
+                else:
+                    text = self.handle_rpc(body)
+                    self._respond(writer, 200 if text is not None else 204, text, keep_alive)
+
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        except asyncio.CancelledError:
+            pass   # server shutting down
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _respond(writer, status, text, keep_alive):
+        body = text.encode("utf-8") if text is not None else b""
+        head = (f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+
+    # ---------------------------------------------------------- running
+
+    async def serve(self, ready=None):
+        self._loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        print(f"[SERVE] Lookup server on http://{self.host}:{self.port}/rpc")
+        if ready is not None:
+            ready.set()
+        async with self.server:
+            try:
+                await self.server.serve_forever()
+            except asyncio.CancelledError:
+                pass   # stop()
+
+    def start(self):
+        """Serve from a daemon thread (next to the UI); returns once listening."""
+        ready = threading.Event()
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.serve(ready)), daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self):
+        if self.server is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(self.server.close)
+
+
+# =============================================================
+# HEADLESS
+# =============================================================
+
+async def _follow_file(server, store, watcher):
+    """Merge outside edits of the project file and serve them (headless mode)."""
+    while True:
+        await asyncio.sleep(watcher.interval)
+        project = watcher.take_pending()
+        if project is not None and store.apply_external(project):
+            print(f"[SERVE] {watcher.filename} changed, now serving version {store.version}")
+            server.publish(store)
+
+
+async def _serve_headless(server, store, watcher):
+    if watcher is not None:
+        asyncio.get_running_loop().create_task(_follow_file(server, store, watcher))
+    await server.serve()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executable map lookup server")
+    parser.add_argument("project", nargs="?", default="project.json")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--watch-interval", type=float, default=1.0,
+                        help="seconds between checks of the project file for edits (0 = off)")
+    args = parser.parse_args()
+
+    store = ProjectStore()
+    store.load(args.project)
+
+    server = LookupServer(args.host, args.port)
+    server.publish(store)
+
+    watcher = None
+    if args.watch_interval > 0:
+        watcher = ProjectFileWatcher(args.project, interval=args.watch_interval)
+        watcher.start()
+
+    try:
+        asyncio.run(_serve_headless(server, store, watcher))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
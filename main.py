@@ -1,11 +1,21 @@
+import time
+STARTED = time.perf_counter()   # before the imports, for the startup timeline
+
+import argparse
 import os
+import threading
 import dearpygui.dearpygui as dpg
 
 from store import ProjectStore
+from events import EXE_DATA_READY, MAP_EVENTS, SYMBOLS_CHANGED
+from lazy_ranges import DEFAULT_BUDGET
+from watcher import ProjectFileWatcher
+from lookup_server import LookupServer
 from ui.ui_sections import SectionsUI
 from ui.ui_modules_by_name import ModulesNyNameUI
 from ui.ui_modules_by_section import ModulesBySectionUI
 from ui.ui_reports import ReportsUI
+from ui.ui_statistics import StatisticsUI
 from ui.ui_utils import parse_hex
 
 
@@ -14,123 +24,426 @@ SAVE_FILE = "project.json"   # single source of truth
 
 # ===============================================================
 
-def load_or_create_project():
-    store = ProjectStore()
+class StartupTimeline:
+    """How long each startup step took, printed once the project is on screen."""
+
+    def __init__(self, started):
+        self.started = started
+        self.last = started
+        self.steps = []   # (label, seconds, seconds since start at its end)
+
+    def mark(self, label, since=None):
+        """End a step begun at the previous mark, or at since for one that ran
+        alongside the others (the background load)."""
+        now = time.perf_counter()
+        self.steps.append((label, now - (self.last if since is None else since), now - self.started))
+        if since is None:
+            self.last = now
 
+    def report(self):
+        steps = sorted(self.steps, key=lambda s: s[2])
+        print("[STARTUP] " + ", ".join(f"{label} {took:.3f} s" for label, took, _ in steps)
+              + f"; ready after {steps[-1][2]:.3f} s")
+
+
+def load_project(store, lazy=False, budget=None, timeline=None):
+    """Read SAVE_FILE into store; runs on a background thread while the
+    window comes up, the tabs are built once it is done."""
+    t0 = time.perf_counter()
     if os.path.exists(SAVE_FILE):
         print(f"Loading project: {SAVE_FILE}")
         try:
-            store.load(SAVE_FILE)
+            if lazy:
+                store.load(SAVE_FILE, lazy=True, budget=budget)
+            else:
+                store.load(SAVE_FILE)
         except Exception as e:
             print(f"Failed to load project, creating new: {e}")
     else:
         print("No save file found, starting fresh.")
 
-    return store
+    if timeline is not None:
+        timeline.mark("load (background)", since=t0)
 
 # ===============================================================
 
 def save_project(store):
     print("Saving project...")
     store.save(SAVE_FILE)
+    if watcher is not None:
+        watcher.mark_saved()
+
+# ===============================================================
+
+def apply_external_changes(store):
+    """Merge edits made to SAVE_FILE by scripts / git; the tabs follow through events."""
+    project = watcher.take_pending()
+    if project is None:
+        return
+
+    changed = store.apply_external(project)
+    if changed:
+        print(f"[WATCH] {SAVE_FILE} changed on disk: {', '.join(sorted(changed))}")
+
+watcher = None
+
+# ===============================================================
+
+def on_store_events(store, batch):
+    # one save per frame of edits; changes read from disk are already saved
+    if not batch.external:
+        save_project(store)
+    # pointers were still being scanned when Where? last resolved
+    if ("xref index" in batch.ids(EXE_DATA_READY) and dpg.does_item_exist("where_popup")
+            and dpg.is_item_shown("where_popup")):
+        where_changed(store, where_input_id, where_label_id, where_table_id)
+
+server = None
+
+# ===============================================================
+
+def undo(store):
+    label = store.undo()
+    print(f"[HISTORY] Undo: {label}" if label else "[HISTORY] Nothing to undo")
+
+def redo(store):
+    label = store.redo()
+    print(f"[HISTORY] Redo: {label}" if label else "[HISTORY] Nothing to redo")
+
+def on_undo_key(store, redo_key):
+    if loader is not None:
+        return   # still loading
+    # leave Ctrl+Z / Ctrl+Y to a text field being edited
+    focused = dpg.get_focused_item()
+    if focused and dpg.get_item_type(focused) == "mvAppItemType::mvInputText":
+        return
+    if not (dpg.is_key_down(dpg.mvKey_LControl) or dpg.is_key_down(dpg.mvKey_RControl)):
+        return
+    redo(store) if redo_key else undo(store)
 
 # ===============================================================
 
+def ensure_built(store, ui):
+    """Build a tab's contents the first time it is needed; True if it was
+    built just now (and so already shows the current project)."""
+    if ui.tab_id in built_tabs:
+        return False
+    t0 = time.perf_counter()
+    with store.lock.read("build tab"):
+        ui.build()
+    built_tabs.add(ui.tab_id)
+    print(f"[STARTUP] {dpg.get_item_label(ui.tab_id)} tab built in {time.perf_counter() - t0:.3f} s")
+    return True
+
+built_tabs = set()
+tab_uis = {}   # tab id -> its UI object
+
 def on_tab_change(sender, app_data):
+    if ensure_built(store, tab_uis[app_data]):
+        return
     # app_data gives the tab *item id*, so we check its label
-    if dpg.get_item_label(app_data) == "Reports":
+    label = dpg.get_item_label(app_data)
+    if label == "Reports":
         reports_ui.refresh()
+    elif label == "Statistics":
+        statistics_ui.refresh()
 
 # ===============================================================
 
-def where_ok(store, input_id, label_id):
+def where_changed(store, input_id, label_id, table_id):
+    """Resolve the Where? address on every keystroke."""
+    for row in dpg.get_item_children(table_id).get(1, []):
+        dpg.delete_item(row)
+
     addr_str = dpg.get_value(input_id).strip()
+    if not addr_str:
+        return
     try:
         addr = parse_hex(addr_str)
     except ValueError:
         dpg.set_value(label_id, "Invalid address")
         return
 
-    # Find section
-    section_name = None
-    sec_id = None
-    for sec in store.project.sections.values():
-        if sec.start <= addr < sec.end:
-            section_name = sec.name
-            sec_id = sec.id
-            break
-
-    if not section_name:
-        dpg.set_value(label_id, "Address not in any section")
-        return
+    loc = store.locate(addr)
+    sec = loc["section"]
 
-    # Find module
-    module_name = None
-    for mod in store.project.modules.values():
-        for rng in mod.ranges:
-            if rng.section_id == sec_id and rng.start <= addr < rng.end:
-                module_name = mod.name
-                break
-        if module_name:
-            break
-
-    if module_name:
-        dpg.set_value(label_id, f"Section: {section_name}, Module: {module_name}")
+    rows = []
+    if sec is None:
+        text = "Address not in any section"
+        if loc["exe_hole"]:
+            a, b = loc["exe_hole"]
+            rows.append(("Exe Hole", "", a, b, addr - a, None))
     else:
-        dpg.set_value(label_id, f"Section: {section_name}, No module")
-
+        rows.append(("Section", sec.name, sec.start, sec.end, addr - sec.start, ("section", sec.id, sec.start)))
+        for mod, rng in loc["ranges"]:
+            rows.append(("Module", mod.name, rng.start, rng.end, addr - rng.start, ("range", mod.id, rng)))
+        if loc["hole"]:
+            _, a, b = loc["hole"]
+            rows.append(("Module Hole", "", a, b, addr - a, ("section", sec.id, a)))
+
+        modules = ", ".join(mod.name for mod, rng in loc["ranges"])
+        text = f"Section: {sec.name}, Module: {modules}" if modules else f"Section: {sec.name}, No module"
+
+    for label, entry in (("Previous", loc["prev"]), ("Next", loc["next"])):
+        if entry is None:
+            continue
+        a, b, kind, payload = entry
+        if kind == "range":
+            mod, rng = payload
+            rows.append((f"{label} Module", mod.name, a, b, None, ("range", mod.id, rng)))
+        elif kind == "hole":
+            rows.append((f"{label} Hole", payload[0], a, b, None, ("section", sec.id, a)))
+        else:
+            rows.append((f"{label} Section", payload.name, a, b, None, ("section", payload.id, a)))
+
+    symbol = store.resolve_symbol(addr)
+    if symbol:
+        name, offset = symbol
+        text += f", Symbol: {name}+0x{offset:X}" if offset else f", Symbol: {name}"
+
+    # pointers into the module range / hole at addr, by the module holding them
+    if loc["ranges"]:
+        span = loc["ranges"][0][1].start, loc["ranges"][0][1].end
+    elif loc["hole"]:
+        span = loc["hole"][1:]
+    else:
+        span = addr, addr + 1
+    try:
+        refs = store.incoming_refs(*span)
+    except ValueError:
+        refs = []   # no executable file
+    if refs is None:
+        text += ", scanning pointers..."
+    elif refs:
+        text += f", {sum(len(g[2]) for g in refs)} incoming pointer(s)"
+        for mod, rng, sources in refs:
+            target = ("range", mod.id, rng) if mod is not None else None
+            rows.append(("Referenced by", f"{mod.name if mod else '(no module)'} x{len(sources)}",
+                         sources[0], sources[-1], None, target))
+
+    dpg.set_value(label_id, text)
+
+    for kind, name, a, b, offset, target in rows:
+        with dpg.table_row(parent=table_id):
+            dpg.add_selectable(label=kind, span_columns=True, enabled=target is not None,
+                               user_data=target, callback=where_jump)
+            dpg.add_text(name)
+            dpg.add_text(f"0x{a:X}")
+            dpg.add_text(f"0x{b:X}")
+            dpg.add_text(f"+0x{offset:X}" if offset is not None else "")
+
+def where_jump(sender, app_data, target):
+    # target: ("range", mod_id, rng) or ("section", sec_id, start of the row's item)
+    dpg.set_value(sender, False)
+    if target[0] == "range":
+        _, mod_id, rng = target
+        ensure_built(store, modules_ui)
+        modules_ui.show_range(mod_id, rng)
+    else:
+        _, sec_id, start = target
+        ensure_built(store, inverted_ui)
+        inverted_ui.show_address(sec_id, start)
     dpg.hide_item("where_popup")
 
 # ===============================================================
 
+def query_ok(store, start_id, end_id, table_id, label_id):
+    for row in dpg.get_item_children(table_id).get(1, []):
+        dpg.delete_item(row)
+
+    try:
+        start = parse_hex(dpg.get_value(start_id))
+        end   = parse_hex(dpg.get_value(end_id))
+        result = store.query(start, end)
+    except ValueError as e:
+        dpg.set_value(label_id, str(e))
+        return
+
+    rows = []
+    for sec in result["sections"]:
+        rows.append(("Section", sec.name, sec.start, sec.end))
+    for mod, rng in result["ranges"]:
+        sec = store.project.sections[rng.section_id]
+        rows.append(("Module", f"{mod.name} ({sec.name})", rng.start, rng.end))
+    for sec_name, a, b in result["holes"]:
+        rows.append(("Module Hole", sec_name, a, b))
+    for a, b in result["exe_holes"]:
+        rows.append(("Exe Hole", "", a, b))
+
+    for kind, name, a, b in rows:
+        with dpg.table_row(parent=table_id):
+            dpg.add_text(kind)
+            dpg.add_text(name)
+            dpg.add_text(f"0x{a:X}")
+            dpg.add_text(f"0x{b:X}")
+            dpg.add_text(f"0x{b - a:X}")
+
+    dpg.set_value(label_id, f"{len(rows)} item(s) intersect [0x{start:X}, 0x{end:X})")
+
+# ===============================================================
+
+def show_where_popup(store):
+    """Open the Where? popup, creating it on first use."""
+    global where_input_id, where_table_id
+    if not dpg.does_item_exist("where_popup"):
+        with dpg.window(tag="where_popup", show=False, autosize=True, label="Where is this address?"):
+            where_input_id = dpg.add_input_text(label="Address (hex)")
+            with dpg.table(header_row=True, resizable=True, width=600,
+                           policy=dpg.mvTable_SizingStretchProp) as where_table_id:
+                dpg.add_table_column(label="What")
+                dpg.add_table_column(label="Name")
+                dpg.add_table_column(label="Start")
+                dpg.add_table_column(label="End")
+                dpg.add_table_column(label="Offset")
+            dpg.set_item_callback(where_input_id, lambda: where_changed(store, where_input_id,
+                                                                        where_label_id, where_table_id))
+            dpg.add_button(label="Close", callback=lambda: dpg.hide_item("where_popup"))
+    dpg.show_item("where_popup")
+
+def show_query_popup(store):
+    """Open the Query range popup, creating it on first use."""
+    if not dpg.does_item_exist("query_popup"):
+        with dpg.window(tag="query_popup", modal=True, show=False, autosize=True, label="What intersects this range?"):
+            query_start_id = dpg.add_input_text(label="Start (hex)")
+            query_end_id   = dpg.add_input_text(label="End (hex)")
+            query_label_id = dpg.add_text("")
+            with dpg.table(header_row=True, resizable=True, width=600,
+                           policy=dpg.mvTable_SizingStretchProp) as query_table_id:
+                dpg.add_table_column(label="Kind")
+                dpg.add_table_column(label="Name")
+                dpg.add_table_column(label="Start")
+                dpg.add_table_column(label="End")
+                dpg.add_table_column(label="Size")
+            with dpg.group(horizontal=True):
+                dpg.add_button(label="Query", callback=lambda: query_ok(store, query_start_id, query_end_id,
+                                                                        query_table_id, query_label_id))
+                dpg.add_button(label="Close", callback=lambda: dpg.hide_item("query_popup"))
+    dpg.show_item("query_popup")
+
+where_input_id = where_table_id = where_label_id = None
+
+# ===============================================================
+
+def show_project(store):
+    """The load finished: swap the loading indicator for the tabs and build the open one."""
+    global server
+    dpg.hide_item("loading")
+    dpg.show_item("toolbar")
+    dpg.show_item("main_tabs")
+    ensure_built(store, tab_uis.get(dpg.get_value("main_tabs"), sections_ui))
+
+    if args.serve:
+        server = LookupServer(port=args.serve)
+        server.publish(store)
+        server.start()
+
+loader = None   # thread reading the project until it is done
+
+# ===============================================================
+
 if __name__ == "__main__":
+    timeline = StartupTimeline(STARTED)
+    timeline.mark("imports")
+
+    parser = argparse.ArgumentParser(description="Executable Map Tool")
+    parser.add_argument("--lazy", action="store_true",
+                        help="materialize each section's ranges on first access")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help="ranges kept in memory in --lazy mode before paging out (LRU)")
+    parser.add_argument("--watch-interval", type=float, default=1.0,
+                        help="seconds between checks of the project file for outside edits (0 = off)")
+    parser.add_argument("--serve", type=int, default=0, metavar="PORT",
+                        help="also answer lookups over local JSON-RPC/HTTP on this port (0 = off)")
+    parser.add_argument("--keep-history", action="store_true",
+                        help="save undo/redo history next to the project and restore it on start")
+    args = parser.parse_args()
+
+    store = ProjectStore()
+    store.persist_history = args.keep_history
+    loader = threading.Thread(target=load_project, args=(store, args.lazy, args.budget, timeline),
+                              daemon=True)
+    loader.start()
 
-    store = load_or_create_project()
+    watcher = ProjectFileWatcher(SAVE_FILE, interval=args.watch_interval)
+    if args.watch_interval > 0:
+        watcher.start()
 
     dpg.create_context()
     dpg.create_viewport(title="Executable Map Tool", width=916, height=700)
+    timeline.mark("context")
 
     with dpg.font_registry():
         default_font = dpg.add_font("./JetBrainsMono-Regular.ttf", 16)
         dpg.bind_font(default_font)
+    timeline.mark("font")
 
 
     with dpg.window(label="Executable Map Tool", width=900, height=700, pos=(0,0)) as root:
 
         # Where? button and label above tabs
-        with dpg.group(horizontal=True):
-            dpg.add_button(label="Where?", callback=lambda: dpg.show_item("where_popup"))
+        with dpg.group(horizontal=True, tag="toolbar", show=False):
+            dpg.add_button(label="Where?", callback=lambda: show_where_popup(store))
+            dpg.add_button(label="Query range", callback=lambda: show_query_popup(store))
+            dpg.add_button(label="Undo", callback=lambda: undo(store))
+            dpg.add_button(label="Redo", callback=lambda: redo(store))
             where_label_id = dpg.add_text("", tag="where_label")
 
-        # Tabs container
-        with dpg.tab_bar(tag="main_tabs") as tabs:
+        with dpg.group(horizontal=True, tag="loading"):
+            dpg.add_loading_indicator(radius=2)
+            dpg.add_text(f"Loading {SAVE_FILE}...")
 
-            sections_ui = SectionsUI(store, change_callback=lambda: save_project(store))
-            modules_ui  = ModulesNyNameUI(store, change_callback=lambda: save_project(store))
-            inverted_ui = ModulesBySectionUI(store, change_callback=lambda: save_project(store))
+        # Tabs container; each tab is filled the first time it is opened
+        with dpg.tab_bar(tag="main_tabs", show=False) as tabs:
+
+            sections_ui = SectionsUI(store)
+            modules_ui  = ModulesNyNameUI(store)
+            inverted_ui = ModulesBySectionUI(store)
             reports_ui  = ReportsUI(store)
+            statistics_ui = StatisticsUI(store)
 
-            # Build UI
-            sections_ui.draw(tabs)
-            modules_ui.draw(tabs)
-            inverted_ui.draw(tabs)
-            reports_ui.draw(tabs)
+            for ui in (sections_ui, modules_ui, inverted_ui, reports_ui, statistics_ui):
+                ui.draw(tabs)
+                tab_uis[ui.tab_id] = ui
 
             dpg.set_item_callback("main_tabs", on_tab_change)
 
-        # Create the Where? popup
-        with dpg.window(tag="where_popup", modal=True, show=False, autosize=True, label="Where is this address?"):
-            where_input_id = dpg.add_input_text(label="Address (hex)")
-            with dpg.group(horizontal=True):
-                dpg.add_button(label="OK", callback=lambda: where_ok(store, where_input_id, where_label_id))
-                dpg.add_button(label="Cancel", callback=lambda: dpg.hide_item("where_popup"))
+        store.events.subscribe(lambda batch: on_store_events(store, batch), MAP_EVENTS + (SYMBOLS_CHANGED, EXE_DATA_READY))
 
-        # After building windows, force UI to refresh from loaded JSON
-        sections_ui.refresh()
-        modules_ui.refresh_modules()
-        inverted_ui.refresh_sections()
+        with dpg.handler_registry():
+            dpg.add_key_press_handler(dpg.mvKey_Z, callback=lambda: on_undo_key(store, False))
+            dpg.add_key_press_handler(dpg.mvKey_Y, callback=lambda: on_undo_key(store, True))
+    timeline.mark("window")
 
     dpg.setup_dearpygui()
     dpg.show_viewport()
-    dpg.start_dearpygui()
+    first_frame = shown = True
+    while dpg.is_dearpygui_running():
+        if loader is not None and not loader.is_alive():
+            loader = None
+            show_project(store)
+            shown = False
+
+        if loader is None:
+            # edits from the callback thread wait while the tabs catch up
+            with store.lock.write("frame"):
+                apply_external_changes(store)
+                store.history.seal()   # a frame's worth of UI edits is one undo step
+                store.events.flush()
+                if server is not None:
+                    server.publish_if_due(store)
+        dpg.render_dearpygui_frame()
+
+        if first_frame:
+            timeline.mark("first frame")
+            first_frame = False
+        if not shown:
+            timeline.mark("project shown")
+            timeline.report()
+            shown = True
+
+    for side, stats in store.lock.stats.items():
+        print(f"[STORE] {side.capitalize()} lock: {stats.summary()}")
+    watcher.stop()
+    if server is not None:
+        server.stop()
     dpg.destroy_context()
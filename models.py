@@ -1,3 +1,5 @@
+from array import array
+from bisect import bisect_right
 from dataclasses import dataclass, field
 
 @dataclass
@@ -37,9 +39,88 @@ class Module:
 class Project:
     exe_start: int | None = None
     exe_end:   int | None = None
+    exe_path:  str | None = None   # the executable itself, relative to the project file
 
     sections: dict = field(default_factory=dict)
     modules: dict = field(default_factory=dict)
 
     next_section_id: int = 1
     next_module_id: int = 1
+
+
+@dataclass
+class SectionSymbols:
+    starts: array = field(default_factory=lambda: array("Q"))
+    sizes:  array = field(default_factory=lambda: array("Q"))
+    names:  array = field(default_factory=lambda: array("I"))   # string table ids
+    in_order: bool = True
+
+    def sort(self):
+        if self.in_order:
+            return
+        order = sorted(range(len(self.starts)), key=self.starts.__getitem__)
+        # same typecodes as the fields: symbol_file writes them as raw bytes
+        self.starts = array(self.starts.typecode, (self.starts[i] for i in order))
+        self.sizes  = array(self.sizes.typecode, (self.sizes[i] for i in order))
+        self.names  = array(self.names.typecode, (self.names[i] for i in order))
+        self.in_order = True
+
+
+class SymbolTable:
+    """Function/symbol layer below modules.
+
+    Symbols live in flat per-section arrays (start, size, name id) with all
+    names interned in one shared string table, so millions of them cost a
+    few bytes each instead of one object each. Each section is sorted by
+    start on first lookup after a change.
+    """
+
+    def __init__(self):
+        self.strings = []      # shared string table
+        self.string_ids = {}   # name -> index into strings
+        self.sections = {}     # section id -> SectionSymbols
+        self.dirty = False
+
+    def __len__(self):
+        return sum(len(s.starts) for s in self.sections.values())
+
+    def intern(self, name):
+        sid = self.string_ids.get(name)
+        if sid is None:
+            sid = self.string_ids[name] = len(self.strings)
+            self.strings.append(name)
+        return sid
+
+    def add(self, section_id, name, start, size):
+        syms = self.sections.get(section_id)
+        if syms is None:
+            syms = self.sections[section_id] = SectionSymbols()
+        if syms.in_order and syms.starts and start < syms.starts[-1]:
+            syms.in_order = False
+        syms.starts.append(start)
+        syms.sizes.append(size)
+        syms.names.append(self.intern(name))
+        self.dirty = True
+
+    def drop_section(self, section_id):
+        if self.sections.pop(section_id, None) is not None:
+            self.dirty = True
+
+    def resolve(self, section_id, addr):
+        """(name, offset) of the symbol covering addr, or None.
+
+        A symbol of size 0 (size unknown) covers everything up to the next
+        symbol.
+        """
+        syms = self.sections.get(section_id)
+        if syms is None:
+            return None
+        syms.sort()
+
+        i = bisect_right(syms.starts, addr) - 1
+        if i < 0:
+            return None
+        start, size = syms.starts[i], syms.sizes[i]
+        if size and addr >= start + size:
+            return None
+        return self.strings[syms.names[i]], addr - start
@@ -0,0 +1,111 @@
+from bisect import bisect_left, insort
+from collections import Counter
+
+DEFAULT_LIMIT = 500
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class ModuleNameIndex:
+    """Case-insensitive module name lookup for type-ahead filtering.
+
+    Two structures are kept in step: a sorted list of (lower name, id) for
+    prefix matches by bisect, and a trigram → ids map for substring matches
+    (only the ids under the query's rarest trigram are checked with `in`).
+    When nothing matches at all, names sharing at least half of the query's
+    trigrams are offered as fuzzy matches (typos), best first.
+
+    Built on first use; the store updates single modules as they change and
+    invalidates the whole index when a project is (re)loaded.
+    """
+
+    def __init__(self):
+        self.sorted = None   # [(lower name, module id)]
+        self.names = {}      # module id -> lower name
+        self.grams = {}      # trigram -> set of module ids
+
+    def invalidate(self):
+        self.sorted = None
+
+    def _build(self, project):
+        self.names = {m.id: m.name.lower() for m in project.modules.values()}
+        self.sorted = sorted((n, mid) for mid, n in self.names.items())
+        self.grams = {}
+        for mid, n in self.names.items():
+            for g in trigrams(n):
+                self.grams.setdefault(g, set()).add(mid)
+
+    # ---------------------------------------------------------- maintenance
+
+    def update(self, project, module_ids):
+        """Re-index these modules (added, renamed or deleted)."""
+        if self.sorted is None:
+            return
+        for mid in module_ids:
+            self._remove(mid)
+            mod = project.modules.get(mid)
+            if mod is not None:
+                self._add(mid, mod.name.lower())
+
+    def _add(self, mid, name):
+        self.names[mid] = name
+        insort(self.sorted, (name, mid))
+        for g in trigrams(name):
+            self.grams.setdefault(g, set()).add(mid)
+
+    def _remove(self, mid):
+        name = self.names.pop(mid, None)
+        if name is None:
+            return
+        i = bisect_left(self.sorted, (name, mid))
+        if i < len(self.sorted) and self.sorted[i] == (name, mid):
+            del self.sorted[i]
+        for g in trigrams(name):
+            ids = self.grams.get(g)
+            if ids is not None:
+                ids.discard(mid)
+                if not ids:
+                    del self.grams[g]
+
+    # ---------------------------------------------------------- lookup
+
+    def search(self, project, query, limit=DEFAULT_LIMIT):
+        """Module ids matching query: prefix matches (alphabetical) first, then
+        other substring matches, then fuzzy ones; at most limit ids."""
+        if self.sorted is None:
+            self._build(project)
+
+        q = query.strip().lower()
+        if not q:
+            return [mid for _, mid in self.sorted[:limit]]
+
+        out = []
+        i = bisect_left(self.sorted, (q,))
+        while i < len(self.sorted) and len(out) < limit and self.sorted[i][0].startswith(q):
+            out.append(self.sorted[i][1])
+            i += 1
+
+        if len(q) < 3 or len(out) >= limit:
+            return out
+
+        # ---- substring: scan the rarest trigram's postings
+        q_grams = trigrams(q)
+        postings = [self.grams.get(g, ()) for g in q_grams]
+        rarest = min(postings, key=len)
+        seen = set(out)
+        substring = sorted((self.names[mid], mid) for mid in rarest
+                           if mid not in seen and q in self.names[mid])
+        out.extend(mid for _, mid in substring[:limit - len(out)])
+
+        if out or len(q_grams) < 2:
+            return out
+
+        # ---- fuzzy: most shared trigrams first, at least half of them
+        counts = Counter()
+        for ids in postings:
+            counts.update(ids)
+        need = (len(q_grams) + 1) // 2
+        fuzzy = sorted((-n, self.names[mid], mid) for mid, n in counts.items() if n >= need)
+        return [mid for _, _, mid in fuzzy[:limit]]
@@ -0,0 +1,222 @@
+import json
+import sys
+
+from models import Project, Section, Module, ModuleRange
+
+# Top-level keys holding one entry per section / module. Their entries are
+# decoded and materialized one at a time; everything else is a scalar.
+STREAMED_KEYS = ("sections", "modules")
+
+CHUNK_SIZE = 1 << 20
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+# =============================================================
+# MEMORY
+# =============================================================
+
+def peak_rss():
+    """Peak resident memory of this process in bytes, or None where unknown.
+
+    One system call, so unlike tracemalloc it is cheap enough for every load.
+    """
+    try:
+        import resource
+    except ImportError:
+        return _peak_working_set()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024   # bytes on macOS, KiB elsewhere
+
+
+def _peak_working_set():
+    # Windows: PROCESS_MEMORY_COUNTERS.PeakWorkingSetSize
+    try:
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD)] + [
+                (name, ctypes.c_size_t) for name in (
+                    "PeakWorkingSetSize", "WorkingSetSize", "QuotaPeakPagedPoolUsage",
+                    "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage",
+                    "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+
+        c = Counters()
+        c.cb = ctypes.sizeof(c)
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(ctypes.windll.kernel32.GetCurrentProcess(),
+                                                        ctypes.byref(c), c.cb):
+            return None
+        return c.PeakWorkingSetSize
+    except (AttributeError, OSError):
+        return None
+
+
+# =============================================================
+# MODEL BUILDERS
+# =============================================================
+
+def section_from_dict(s):
+    return Section(
+        id=s["id"],
+        name=s["name"],
+        start=s["start"],
+        end=s["end"],
+        locked=s.get("locked", False)
+    )
+
+
+def module_from_dict(m, lazy=None):
+    """Build a Module; with a LazyRanges its ranges are packed there instead."""
+    mod = Module(
+        id=m["id"],
+        name=m["name"],
+        number=m.get("number", 0)
+    )
+
+    if lazy is not None:
+        for r in m.get("ranges", []):
+            lazy.add(mod.id, r["section_id"], r["start"], r["end"], r.get("locked", False))
+        return mod
+
+    for r in m.get("ranges", []):
+        mod.ranges.append(ModuleRange(
+            section_id=r["section_id"],
+            start=r["start"],
+            end=r["end"],
+            locked=r.get("locked", False)
+        ))
+
+    return mod
+
+
+# =============================================================
+# INCREMENTAL READER
+# =============================================================
+
+class _Reader:
+    """Sliding window over a JSON text file.
+
+    Only the unread tail plus one chunk is buffered; a value that does not
+    fit yet is retried with a doubled read until it decodes.
+    """
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size=None):
+        data = self.f.read(size or self.chunk_size)
+        if not data:
+            self.eof = True
+            return
+        self.buf = self.buf[self.pos:] + data
+        self.pos = 0
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                raise ValueError("Unexpected end of JSON file.")
+            self._fill()
+
+    def take(self, expected):
+        ch = self.peek()
+        if ch not in expected:
+            raise ValueError(f"Expected one of {expected!r} at offset {self.pos}, got {ch!r}.")
+        self.pos += 1
+        return ch
+
+    def value(self):
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                val, end = _DECODER.raw_decode(self.buf, self.pos)
+                # a number running into the end of the buffer may be cut short
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return val
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill(size)
+            size *= 2
+
+
+def _entries(r):
+    """Values of an id-keyed { "1": {...} } dict (what save() writes), or
+    entries of a plain list."""
+    ch = r.peek()
+    if ch not in "[{":
+        value = r.value()
+        if value is not None:
+            raise ValueError(f"Expected a list or dict, got {type(value).__name__}.")
+        return
+
+    keyed = r.take("[{") == "{"
+    close = "}" if keyed else "]"
+
+    if r.peek() == close:
+        r.take(close)
+        return
+
+    while True:
+        if keyed:
+            r.value()
+            r.take(":")
+        yield r.value()
+        if r.take("," + close) == close:
+            return
+
+
+def iter_project_file(f, chunk_size=CHUNK_SIZE):
+    """Yield (key, value) for every top-level field of a project file.
+
+    "sections" and "modules" are yielded once per entry instead of as a
+    whole, so the decoded dict tree of the file never exists in memory.
+    """
+    r = _Reader(f, chunk_size)
+    r.take("{")
+
+    if r.peek() == "}":
+        return
+
+    while True:
+        key = r.value()
+        r.take(":")
+
+        if key in STREAMED_KEYS:
+            for entry in _entries(r):
+                yield key, entry
+        else:
+            yield key, r.value()
+
+        if r.take(",}") == "}":
+            return
+
+
+def load_project(filename, chunk_size=CHUNK_SIZE, lazy=None):
+    p = Project()
+
+    with open(filename, "r", encoding="utf-8") as f:
+        for key, value in iter_project_file(f, chunk_size):
+            if key == "sections":
+                section = section_from_dict(value)
+                p.sections[section.id] = section
+            elif key == "modules":
+                mod = module_from_dict(value, lazy)
+                p.modules[mod.id] = mod
+            elif key in ("exe_start", "exe_end", "exe_path"):
+                setattr(p, key, value)
+            elif key in ("next_section_id", "next_module_id"):
+                setattr(p, key, value if value is not None else 1)
+
+    return p
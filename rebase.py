@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+SHIFT = "shift"   # every range moves by the change of the section start
+SCALE = "scale"   # ranges keep their relative position in the resized section
+
+MODES = (SHIFT, SCALE)
+
+
+@dataclass
+class RangeMove:
+    """Where one range of the section ends up."""
+    module_id: int
+    module: str
+    start: int
+    end: int
+    new_start: int
+    new_end: int
+    locked: bool
+    spill: bool      # new span leaves the section (or collapses to nothing)
+
+    @property
+    def key(self):
+        return self.start, self.end
+
+
+@dataclass
+class RebasePlan:
+    section_id: int
+    section: str
+    start: int
+    end: int
+    new_start: int
+    new_end: int
+    mode: str
+    moves: list
+
+    @property
+    def spills(self):
+        return [m for m in self.moves if m.spill]
+
+
+def plan_rebase(store, sec_id, new_start, new_end, mode=SHIFT):
+    """New bounds for every range of a section moved to [new_start, new_end).
+
+    All ranges go through NumPy in one pass: SHIFT adds the start delta,
+    SCALE maps offsets by new size / old size (starts rounded down, ends
+    up, so nothing shrinks to zero). Ranges ending up outside the new
+    bounds are flagged as spills; nothing is changed.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown rebase mode '{mode}', expected one of {MODES}.")
+    if new_start >= new_end:
+        raise ValueError("Section start must be < end.")
+
+    sec = store.project.sections[sec_id]
+    pairs = store.section_ranges(sec_id)
+    n = len(pairs)
+
+    starts = np.fromiter((r.start for m, r in pairs), dtype=np.int64, count=n)
+    ends   = np.fromiter((r.end for m, r in pairs), dtype=np.int64, count=n)
+
+    if mode == SHIFT:
+        delta = new_start - sec.start
+        new_starts, new_ends = starts + delta, ends + delta
+    else:
+        old_size, new_size = sec.end - sec.start, new_end - new_start
+        new_starts = new_start + (starts - sec.start) * new_size // old_size
+        new_ends   = new_start - (-(ends - sec.start) * new_size // old_size)
+
+    spill = (new_starts < new_start) | (new_ends > new_end) | (new_starts >= new_ends)
+
+    moves = [RangeMove(m.id, m.name, r.start, r.end, a, b, r.locked, s)
+             for (m, r), a, b, s in zip(pairs, new_starts.tolist(), new_ends.tolist(), spill.tolist())]
+    moves.sort(key=lambda mv: (mv.start, mv.end))
+
+    return RebasePlan(sec_id, sec.name, sec.start, sec.end, new_start, new_end, mode, moves)
@@ -0,0 +1,99 @@
+import heapq
+
+from integrity import section_label
+
+# reports that can be ranked and paged, and what their items are
+KINDS = ("section_holes", "module_holes", "overlaps")
+SORTS = ("size", "address", "section")
+
+
+def item_size(kind, item):
+    if kind == "section_holes":
+        a, b = item
+        return b - a
+    if kind == "module_holes":
+        _, a, b = item
+        return b - a
+    return item[4]   # overlaps: (A, B, rA, rB, size)
+
+
+def _sort_key(kind, by, project):
+    """key(item) ordering the items of a report by size, address or section
+    (section, then address; holes outside any section have none)."""
+    if kind == "section_holes":
+        if by == "size":
+            return lambda h: (h[1] - h[0], h[0])
+        return lambda h: h[0]
+    if kind == "module_holes":
+        if by == "size":
+            return lambda h: (h[2] - h[1], h[1])
+        if by == "section":
+            return lambda h: (h[0].lower(), h[1])
+        return lambda h: h[1]
+    if by == "size":
+        return lambda o: (o[4], o[2].start)
+    if by == "section":
+        return lambda o: (section_label(project, o[2].section_id).lower(), o[2].start)
+    return lambda o: (o[2].start, o[3].start)
+
+
+class ReportCache:
+    """Hole / overlap analysis results of one store version, and their orders.
+
+    The analysis runs once per version of the project; ranking (heap) and
+    paging (one sort per order, then slices) work on the cached items, so
+    turning pages or sorting by another column never recomputes it.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.items = {}    # kind -> list of report items
+        self.orders = {}   # (kind, by, descending) -> sorted list
+
+    def clear(self):
+        """Forget everything (the items hold range objects that went stale)."""
+        self.version = None
+        self.items.clear()
+        self.orders.clear()
+
+    def _check(self, store):
+        if self.version != store.version:
+            self.version = store.version
+            self.items.clear()
+            self.orders.clear()
+
+    def get(self, store, kind):
+        """All items of a report, computed on first use in this version."""
+        if kind not in KINDS:
+            raise ValueError(f"Unknown report '{kind}', expected one of {KINDS}.")
+        self._check(store)
+        items = self.items.get(kind)
+        if items is None:
+            if kind == "section_holes":
+                items = store.compute_section_holes()
+            elif kind == "module_holes":
+                items = store.compute_module_holes()
+            else:
+                items = store.compute_module_overlaps()
+            self.items[kind] = items
+        return items
+
+    def top(self, store, kind, n):
+        """The n largest items, biggest first (heap select, no full sort)."""
+        items = self.get(store, kind)
+        return heapq.nlargest(n, items, key=_sort_key(kind, "size", store.project))
+
+    def page(self, store, kind, by="size", descending=True, offset=0, limit=100):
+        """(total, items[offset:offset + limit]) in the given order."""
+        if by not in SORTS:
+            raise ValueError(f"Unknown sort '{by}', expected one of {SORTS}.")
+        items = self.get(store, kind)
+
+        order = self.orders.get((kind, by, descending))
+        if order is None:
+            if by == "size" and descending and offset == 0 and limit < len(items):
+                # the default view: the first page is a top-N, no sort needed
+                return len(items), self.top(store, kind, limit)
+            order = sorted(items, key=_sort_key(kind, by, store.project), reverse=descending)
+            self.orders[(kind, by, descending)] = order
+        return len(items), order[offset:offset + limit]
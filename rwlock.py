@@ -0,0 +1,134 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+
+@dataclass
+class LockStats:
+    """Contention counters of one side (read or write) of an RWLock."""
+    acquired: int = 0
+    contended: int = 0        # acquisitions that had to wait
+    wait_total: float = 0.0   # seconds spent waiting
+    wait_max: float = 0.0
+    hold_max: float = 0.0     # longest single hold (outermost acquisition)
+    hold_max_by: str = ""     # what held it that long
+
+    def summary(self):
+        return (f"{self.acquired} taken, {self.contended} waited "
+                f"({self.wait_total * 1000:.1f} ms total, {self.wait_max * 1000:.1f} ms max), "
+                f"longest hold {self.hold_max * 1000:.1f} ms{' by ' + self.hold_max_by if self.hold_max_by else ''}")
+
+
+class RWLock:
+    """Many readers or one writer, both reentrant per thread.
+
+    A writer may also read (the store's mutators call its queries), but a
+    reader cannot upgrade to writing: that raises RuntimeError instead of
+    deadlocking against a second upgrading reader. Turns alternate: new
+    readers queue behind a waiting writer, and the readers that queued
+    during a write go before the next one, so neither side starves the
+    other. A thread already reading is let through regardless.
+
+    Every outermost acquisition is counted in stats ("read" / "write"):
+    how often it had to wait, for how long, and the longest hold.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0              # threads holding the read side
+        self._writer = None            # ident of the thread holding the write side
+        self._waiting_writers = 0
+        self._waiting_readers = 0
+        self._readers_turn = False     # readers queued during a write go next
+        self._local = threading.local()
+        self.stats = {"read": LockStats(), "write": LockStats()}
+
+    def _depth(self):
+        return getattr(self._local, "depth", 0)
+
+    def _count(self, side, t0, waited, acquired_at):
+        # called with _cond held
+        s = self.stats[side]
+        s.acquired += 1
+        if waited:
+            s.contended += 1
+            s.wait_total += acquired_at - t0
+            s.wait_max = max(s.wait_max, acquired_at - t0)
+
+    def _held(self, side, acquired_at, what):
+        # called with _cond held
+        held = time.perf_counter() - acquired_at
+        s = self.stats[side]
+        if held > s.hold_max:
+            s.hold_max, s.hold_max_by = held, what or ""
+
+    @contextmanager
+    def read(self, what=None):
+        me = threading.get_ident()
+        if self._writer == me or self._depth():
+            self._local.depth = self._depth() + 1
+            try:
+                yield
+            finally:
+                self._local.depth -= 1
+            return
+
+        t0 = time.perf_counter()
+        waited = False
+        with self._cond:
+            self._waiting_readers += 1
+            try:
+                while self._writer is not None or (self._waiting_writers and not self._readers_turn):
+                    waited = True
+                    self._cond.wait()
+            finally:
+                self._waiting_readers -= 1
+            if not self._waiting_readers:
+                self._readers_turn = False
+            self._readers += 1
+            acquired_at = time.perf_counter()
+            self._count("read", t0, waited, acquired_at)
+
+        self._local.depth = 1
+        try:
+            yield
+        finally:
+            self._local.depth = 0
+            with self._cond:
+                self._readers -= 1
+                self._held("read", acquired_at, what)
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self, what=None):
+        me = threading.get_ident()
+        if self._writer == me:
+            yield
+            return
+        if self._depth():
+            raise RuntimeError(f"{what or 'write'}: cannot write while holding the read lock.")
+
+        t0 = time.perf_counter()
+        waited = False
+        with self._cond:
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers or self._readers_turn:
+                    waited = True
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            acquired_at = time.perf_counter()
+            self._count("write", t0, waited, acquired_at)
+
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = None
+                self._readers_turn = self._waiting_readers > 0
+                self._held("write", acquired_at, what)
+                self._cond.notify_all()
@@ -1,176 +1,807 @@
+import functools
+import heapq
 import json
+import os
+import time
+import threading
+import tracemalloc
+from contextlib import contextmanager
 from dataclasses import asdict
-from models import Project, Section, Module, ModuleRange
+import numpy as np
+from models import Project, Section, Module, ModuleRange, SymbolTable
+from byte_map import ByteMap
+import analysis
+import boundaries
+import bulk_import
+import export
+import content_hash
+from content_hash import HashCache
+from coverage import CoverageCache
+import events
+from events import EventBus
+from exe_image import ExeImage
+from hex_utils import parse_hex
+from history import History
+import integrity
+from integrity import IntegrityChecker
+from interval_index import AddressIndex
+from lazy_ranges import DEFAULT_BUDGET, LazyRanges
+from name_index import DEFAULT_LIMIT, ModuleNameIndex
+from project_loader import load_project, peak_rss
+import rebase
+from report_cache import ReportCache
+from rwlock import RWLock
+from symbol_file import load_symbols, save_symbols
+from transaction import Transaction, check_sections, check_ranges, check_module_names
+from watcher import file_hash
+from xref import XrefIndex
+
+
+# ops that add, drop or rename modules (kept in step with the name index)
+NAME_OPS = ("module_put", "module_del", "module_set")
+
+
+# =============================================================
+# LOCKING
+# =============================================================
+#
+# The UI edits from the DearPyGui callback thread while the render loop,
+# exports and the lookup server read. Public methods take the store's
+# RWLock: mutators the write side (a transaction holds it until commit or
+# rollback), queries the read side. Queries that refresh a shared cache
+# (address index, coverage, lazy paging, the mapped image) also take the
+# cache lock, so two readers never rebuild the same cache at once.
+
+def _writes(method):
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock.write(method.__name__):
+            return method(self, *args, **kwargs)
+    return locked
+
+
+def _reads(method):
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock.read(method.__name__):
+            if self.lazy is None:
+                return method(self, *args, **kwargs)
+            # reading pages ranges in and out of a lazy project
+            with self._cache_lock:
+                return method(self, *args, **kwargs)
+    return locked
+
+
+def _caches(method):
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock.read(method.__name__), self._cache_lock:
+            return method(self, *args, **kwargs)
+    return locked
 
 
 class ProjectStore:
     def __init__(self):
         self.project = Project()
+        self.lock = RWLock()
+        self._cache_lock = threading.RLock()
+        self.coverage = CoverageCache()
+        self.index = AddressIndex()
+        self.module_names = ModuleNameIndex()
+        self.integrity = IntegrityChecker()
+        self.reports = ReportCache()
+
+        # symbols live in a side file next to the project and are only read
+        # the first time somebody asks for them
+        self.symbols_file = None
+        self._symbols = None
+
+        # the executable (Project.exe_path) is mapped on first use; content
+        # hashes of it are cached in <project>.hashes
+        self.project_file = None
+        self._image = None
+        self._hash_cache = HashCache()
+        self._hashing = set()           # hash cache keys a background thread is computing
+        # per-binary summaries (byte map, xrefs) built in the background
+        self._summaries = {}            # kind -> built summary
+        self._summary_waiters = {}      # kind -> callbacks while a build runs
+        self._summary_lock = threading.Lock()
+
+        self.load_stats = None
+
+        # set when the project was opened in lazy mode
+        self.lazy = None
+
+        self._tx = None
+        self._renumber = False   # module order changed, numbers are recomputed once at the end
+
+        # typed change events for the UI, flushed once per frame
+        self.events = EventBus()
+
+        # bumped on every change, for readers holding a snapshot()
+        self.version = 0
+
+        # undo / redo; persisted to <project>.history when persist_history is set
+        self.history = History()
+        self.persist_history = False
 
+    def _paged_out(self, sec_id):
+        # lazy mode dropped this section's range objects: caches holding
+        # them would keep them alive and hand out copies edits never reach
+        self.index.forget([sec_id])
+        self.reports.clear()
+
+    def _invalidate(self, section_ids=None):
+        """Drop cached results for the given sections (None = everything)."""
+        self.coverage.invalidate(section_ids)
+        self.index.invalidate(section_ids)
+        self.integrity.invalidate(section_ids)
+
+    @_writes
     def renumber_modules(self):
         for index, mod in enumerate(self.project.modules.values(), start=1):
             mod.number = index
+        self._renumber = False
+
+    # =============================================================
+    # LAZY RANGES
+    # =============================================================
+
+    @_caches
+    def materialize(self, section_ids=None):
+        """Make sure the ranges of these sections (None = all) exist as objects.
+
+        A no-op unless the project was loaded with lazy=True. Anything that
+        walks mod.ranges directly must call this (or use section_ranges /
+        module_ranges) first.
+        """
+        if self.lazy is not None:
+            self.lazy.materialize(self.project, section_ids)
+
+    @_caches
+    def section_ranges(self, sec_id):
+        """[(module, range)] of one section, materializing it if needed."""
+        self.materialize([sec_id])
+        return [(m, r) for m in self.project.modules.values()
+                for r in m.ranges if r.section_id == sec_id]
+
+    @_caches
+    def module_ranges(self, mod_id):
+        """All ranges of one module (a copy of the list), materializing the
+        sections they are in."""
+        if self.lazy is not None:
+            self.materialize(self.lazy.sections_of_module(mod_id)
+                             | {r.section_id for r in self.project.modules[mod_id].ranges})
+        return list(self.project.modules[mod_id].ranges)
 
     # =============================================================
     # SAVE PROJECT → JSON
     # =============================================================
 
+    @_writes
     def save(self, filename="project.json"):
         self.renumber_modules()
+        data = asdict(self.project)
+
+        # ranges of paged-out sections are written from their packed form
+        if self.lazy is not None:
+            for mod_id, ranges in self.lazy.packed_range_dicts().items():
+                if mod_id in data["modules"]:
+                    data["modules"][mod_id]["ranges"].extend(ranges)
+
         with open(filename, "w", encoding="utf-8") as f:
-            json.dump(asdict(self.project), f, indent=4)
+            json.dump(data, f, indent=4)
         print(f"[STORE] Saved {filename}")
 
+        self._set_project_file(filename)
+        self.symbols_file = symbols_filename(filename)
+        if self._symbols is not None and self._symbols.dirty:
+            save_symbols(self._symbols, self.symbols_file)
+
+        if self.persist_history:
+            self.history.save(history_filename(filename), file_hash(filename))
+
+    # =============================================================
+    # SNAPSHOT (read-only copy for other threads)
+    # =============================================================
+
+    @_reads
+    def snapshot(self):
+        """An independent ProjectStore holding a copy of the current project.
+
+        Nothing is shared with this store, so another thread can query the
+        copy (with its own indexes) while this one keeps editing. The copy
+        carries the version it was taken at.
+        """
+        self.materialize()
+        p = self.project
+
+        snap = ProjectStore()
+        snap.project = Project(
+            exe_start=p.exe_start,
+            exe_end=p.exe_end,
+            exe_path=p.exe_path,
+            sections={sid: Section(s.id, s.name, s.start, s.end, s.locked)
+                      for sid, s in p.sections.items()},
+            modules={mid: Module(m.id, m.name, m.number,
+                                 [ModuleRange(r.section_id, r.start, r.end, r.locked)
+                                  for r in m.ranges])
+                     for mid, m in p.modules.items()},
+            next_section_id=p.next_section_id,
+            next_module_id=p.next_module_id,
+        )
+        snap.version = self.version
+        snap.project_file = self.project_file
+        return snap
+
     # =============================================================
     # LOAD PROJECT ← JSON
     # =============================================================
 
-    def load(self, filename="project.json"):
-        with open(filename, "r", encoding="utf-8") as f:
-            data = json.load(f)
+    @_writes
+    def load(self, filename="project.json", trace_memory=False, lazy=False, budget=DEFAULT_BUDGET):
+        """Load a project file, streaming sections and modules one by one.
 
-        p = Project()
+        Accepts the { "1": {...} } id-keyed layout save() writes as well
+        as plain lists of sections and modules. Time and the process' peak resident
+        memory are always recorded in load_stats; trace_memory also measures
+        the peak Python allocation of the load itself (slower).
 
-        p.exe_start = data.get("exe_start", None)
-        p.exe_end   = data.get("exe_end", None)
+        lazy=True only builds sections and modules up front; each section's
+        ranges are materialized on first access (see materialize()) and paged
+        out again once more than `budget` ranges are resident.
+        """
+        if trace_memory:
+            tracemalloc.start()
+        t0 = time.perf_counter()
 
-        p.next_section_id = data.get("next_section_id", 1)
-        p.next_module_id  = data.get("next_module_id", 1)
+        lazy_ranges = LazyRanges(budget, on_page_out=self._paged_out) if lazy else None
+        p = load_project(filename, lazy=lazy_ranges)
 
-        # =============== Sections ================================
-        sec_data = data.get("sections", {})
+        elapsed = time.perf_counter() - t0
+        peak = None
+        if trace_memory:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.load_stats = {"seconds": elapsed, "peak_rss_bytes": peak_rss(), "peak_bytes": peak}
 
-        # support legacy dict { "1":{...}, ... }
-        if isinstance(sec_data, dict):
-            sec_data = sec_data.values()
+        self.project = p
+        self.lazy = lazy_ranges
+        self.renumber_modules()
+        self._invalidate()
+        self.module_names.invalidate()
+        self.version += 1
+        self._set_project_file(filename)
+        self.symbols_file = symbols_filename(filename)
+        self._symbols = None
 
-        for s in sec_data:
-            section = Section(
-                id=s["id"],
-                name=s["name"],
-                start=s["start"],
-                end=s["end"],
-                locked=s.get("locked", False)
-            )
-            p.sections[section.id] = section
+        self.history.clear()
+        if self.persist_history and self.history.load(history_filename(filename), file_hash(filename)):
+            print(f"[STORE] Restored {len(self.history.undo_steps)} undo step(s)")
+        self.events.emit(events.PROJECT_RELOADED, external=True)
 
-        # =============== Modules + ranges ========================
-        mod_data = data.get("modules", {})
+        rss = self.load_stats["peak_rss_bytes"]
+        mem = f", peak RSS {rss / (1 << 20):.1f} MiB" if rss is not None else ""
+        if peak is not None:
+            mem += f", peak allocation {peak / (1 << 20):.1f} MiB"
+        print(f"[STORE] Loaded {filename} in {elapsed:.3f} s{mem}")
 
-        if isinstance(mod_data, dict):
-            mod_data = mod_data.values()
+        # full scan up front, except in lazy mode where it would page in everything
+        if lazy_ranges is None:
+            issues = self.check_integrity()
+            if issues:
+                print(f"[STORE] {len(issues)} integrity issue(s) in {filename}, see Reports")
 
-        for m in mod_data:
-            mod = Module(
-                id=m["id"],
-                name=m["name"],
-                number=m.get("number", 0)
-            )
+    # =============================================================
+    # EXTERNAL CHANGES → apply only what differs
+    # =============================================================
 
-            for r in m.get("ranges", []):
-                mod.ranges.append(ModuleRange(
-                    section_id=r["section_id"],
-                    start=r["start"],
-                    end=r["end"],
-                    locked=r.get("locked", False)
-                ))
+    @_writes
+    def apply_external(self, new):
+        """Merge a Project re-read from disk into the live one.
 
-            p.modules[mod.id] = mod
+        Sections and modules are compared by id; only the ones that were
+        added, removed or changed are touched (changed ones are updated in
+        place, so objects held by the UI stay valid). Returns a dict
+        describing what changed, empty if nothing did.
+        """
+        p = self.project
+        self.materialize()
+        changed = {}
+        touched = set()
 
-        self.project = p
-        self.renumber_modules()
-        print(f"[STORE] Loaded {filename}")
+        # ---- sections
+        added   = [sid for sid in new.sections if sid not in p.sections]
+        removed = [sid for sid in p.sections if sid not in new.sections]
+        updated = [sid for sid, sec in new.sections.items()
+                   if sid in p.sections and p.sections[sid] != sec]
+
+        for sid in removed:
+            del p.sections[sid]
+        for sid in updated:
+            old, sec = p.sections[sid], new.sections[sid]
+            old.name, old.start, old.end, old.locked = sec.name, sec.start, sec.end, sec.locked
+        for sid in added:
+            p.sections[sid] = new.sections[sid]
+
+        self._emit_external(events.SECTION_ADDED, added, added)
+        self._emit_external(events.SECTION_UPDATED, updated, updated)
+        self._emit_external(events.SECTION_DELETED, removed, removed)
+
+        if added or removed or updated:
+            changed["sections"] = set(added) | set(removed) | set(updated)
+            touched |= changed["sections"]
+            if list(p.sections) != list(new.sections):
+                p.sections = {sid: p.sections[sid] for sid in new.sections}
+
+        # ---- modules
+        added   = [mid for mid in new.modules if mid not in p.modules]
+        removed = [mid for mid in p.modules if mid not in new.modules]
+        updated = [mid for mid, mod in new.modules.items()
+                   if mid in p.modules and p.modules[mid] != mod]
+
+        for mid in removed:
+            secs = {r.section_id for r in p.modules.pop(mid).ranges}
+            self._emit_external(events.MODULE_DELETED, [mid], secs)
+            touched |= secs
+        for mid in updated:
+            old, mod = p.modules[mid], new.modules[mid]
+            secs = {r.section_id for r in old.ranges} | {r.section_id for r in mod.ranges}
+            if old.name != mod.name:
+                self._emit_external(events.MODULE_UPDATED, [mid], ())
+            if old.ranges != mod.ranges:
+                self._emit_external(events.RANGE_CHANGED, [mid], secs)
+            touched |= secs
+            old.name, old.number, old.ranges = mod.name, mod.number, mod.ranges
+        for mid in added:
+            p.modules[mid] = new.modules[mid]
+            secs = {r.section_id for r in new.modules[mid].ranges}
+            self._emit_external(events.MODULE_ADDED, [mid], secs)
+            touched |= secs
+
+        if added or removed or updated:
+            changed["modules"] = set(added) | set(removed) | set(updated)
+        if list(p.modules) != list(new.modules):
+            p.modules = {mid: p.modules[mid] for mid in new.modules}
+            changed["module_order"] = True
+            self._emit_external(events.MODULE_REORDERED, (), ())
+
+        # ---- scalars
+        if (p.exe_start, p.exe_end) != (new.exe_start, new.exe_end):
+            p.exe_start, p.exe_end = new.exe_start, new.exe_end
+            changed["exe_range"] = True
+            self._emit_external(events.EXE_RANGE_CHANGED, (), ())
+        if p.exe_path != new.exe_path:
+            p.exe_path = new.exe_path
+            changed["exe_path"] = True
+            self._emit_external(events.EXE_RANGE_CHANGED, (), ())
+        p.next_section_id = max(p.next_section_id, new.next_section_id)
+        p.next_module_id  = max(p.next_module_id, new.next_module_id)
+
+        if changed:
+            # the journal no longer describes how the project got here
+            self.history.clear()
+            self.version += 1
+            self.renumber_modules()
+            self._invalidate(touched)
+            if "modules" in changed:
+                self.module_names.update(p, changed["modules"])
+        return changed
+
+    def _emit_external(self, kind, ids, sections):
+        if ids or kind in (events.MODULE_REORDERED, events.EXE_RANGE_CHANGED):
+            self.events.emit(kind, ids, sections, external=True)
 
     # =============================================================
-    # -----   SECTION MANAGEMENT   ---------------------------------
+    # -----   TRANSACTIONS   ---------------------------------------
     # =============================================================
 
-    def add_section(self, name, start, end, locked=False):
-        # validation
-        if start >= end:
-            raise ValueError("Section start must be < end.")
+    @contextmanager
+    def transaction(self, validate=True):
+        """Group many mutations into one validated, all-or-nothing change.
 
-        # must be within EXE range if defined
-        if self.project.exe_start is not None and self.project.exe_end is not None:
-            if start < self.project.exe_start or end > self.project.exe_end:
-                raise ValueError("Section must lie inside executable range.")
+        Inside the block the per-call validation of the store methods is
+        skipped; on exit what the journal added or changed is validated
+        once. If validation (or the block) fails, the journal of inverse
+        operations is replayed backwards, restoring the previous state
+        without copying the project. Module numbers are recomputed once, on
+        exit. Nested transactions join the outer one.
+        Change events are held back until commit and dropped on rollback.
+        The write lock is held for the whole block, so no reader sees it
+        half done. validate=False skips the commit-time checks (integrity fixes, which
+        may leave unrelated problems in the sections they touch).
+        """
+        with self.lock.write("transaction"):
+            if self._tx is not None:
+                yield self
+                return
 
-        # no overlaps allowed
-        for sec in self.project.sections.values():
-            if not (end <= sec.start or start >= sec.end):  # overlap check
-                raise ValueError(f"Section '{name}' overlaps existing section '{sec.name}'.")
+            self._tx = Transaction()
+            self.events.hold()
+            mark = self.history.mark()
+            try:
+                yield self
+                if validate:
+                    self._validate(self._tx)
+            except BaseException:
+                self._rollback(self._tx)
+                self._tx = None
+                self._unpin()
+                self.events.release(discard=True)
+                self.history.truncate(mark)
+                raise
 
-        # commit after validation
+            self._tx = None
+            self._unpin()
+            if self._renumber:
+                self.renumber_modules()
+            self.events.release()
+            self.history.seal()   # one undo step per transaction
+
+    def _unpin(self):
+        if self.lazy is not None:
+            self.lazy.pinned.clear()
+
+    def _rollback(self, tx):
+        # the inverse ops must not be journaled themselves
+        self._tx = None
+        self._replay(reversed(tx.undo))
+
+    def _replay(self, ops):
+        self.history.replaying = True
+        try:
+            for op in ops:
+                self._apply(op)
+        finally:
+            self.history.replaying = False
+            if self._renumber:
+                self.renumber_modules()
+
+    def _validate(self, tx):
+        """Check everything a transaction touched, raise ValueError if broken."""
         p = self.project
-        sec = Section(p.next_section_id, name, start, end, locked)
-        p.sections[sec.id] = sec
-        p.next_section_id += 1
-        return sec
 
-    def update_section(self, sec_id, name, start, end):
+        if tx.sections_moved:
+            check_sections(p)
+
+        if tx.ranges:
+            self.materialize({sid for _, sid, _, _ in tx.ranges if sid in p.sections})
+            check_ranges(p, tx.ranges)
+
+        if tx.modules:
+            check_module_names(p, tx.modules)
+
+    # =============================================================
+    # -----   UNDO / REDO   ----------------------------------------
+    # =============================================================
+
+    @_writes
+    def undo(self):
+        """Revert the last step (one transaction, or one frame of UI edits).
+
+        Only the step's recorded inverse ops are replayed. Returns the step's
+        label, or None if there is nothing to undo.
+        """
+        if self._tx is not None:
+            raise ValueError("Cannot undo inside a transaction.")
+        step = self.history.take_undo()
+        if step is None:
+            return None
+        redo, undo = step.ops()
+        self._replay(reversed(undo))
+        return step.label
+
+    @_writes
+    def redo(self):
+        """Re-apply the last undone step; returns its label or None."""
+        if self._tx is not None:
+            raise ValueError("Cannot redo inside a transaction.")
+        step = self.history.take_redo()
+        if step is None:
+            return None
+        redo, undo = step.ops()
+        self._replay(redo)
+        return step.label
+
+    # =============================================================
+    # -----   PRIMITIVE OPERATIONS   -------------------------------
+    # =============================================================
+    #
+    # Every mutation of the model goes through _apply(("op", args)). Each
+    # _op_* method changes the project and returns (inverse op, touched
+    # section ids, touched module ids). Ranges are addressed by their
+    # (section_id, start, end) value, which stays valid while lazy mode
+    # pages sections in and out (identical duplicates are interchangeable).
+    # Every op also emits the matching change event (see events.py).
+
+    def _apply(self, op):
+        name, args = op
+        inverse, sections, modules = getattr(self, "_op_" + name)(*args)
+
+        self.version += 1
+        self.history.record(op, inverse)
+        self._invalidate(sections)
+        if name in NAME_OPS:
+            self.module_names.update(self.project, modules)
+        event = events.event_for_op(name, args, sections, modules)
+        if event is not None:
+            self.events.emit(*event)
+        if self._tx is not None:
+            self._tx.record(op, inverse, sections, modules)
+            if self.lazy is not None:
+                # the transaction's ranges stay resident until it ends
+                self.lazy.pinned.update(sections)
+        elif self._renumber and not self.history.replaying:
+            self.renumber_modules()
+        return inverse
+
+    def _op_project_set(self, fields):
+        p = self.project
+        old = {k: getattr(p, k) for k in fields}
+        for k, v in fields.items():
+            setattr(p, k, v)
+        return ("project_set", (old,)), (), ()
+
+    def _op_section_put(self, sec_id, name, start, end, locked, index):
+        p = self.project
+        sec = Section(sec_id, name, start, end, locked)
+        items = list(p.sections.items())
+        if index is None or index >= len(items):
+            p.sections[sec_id] = sec
+        else:
+            items.insert(index, (sec_id, sec))
+            p.sections = dict(items)
+        return ("section_del", (sec_id,)), [sec_id], ()
+
+    def _op_section_del(self, sec_id):
+        p = self.project
+        index = list(p.sections).index(sec_id)
+        s = p.sections.pop(sec_id)
+        return ("section_put", (s.id, s.name, s.start, s.end, s.locked, index)), [sec_id], ()
+
+    def _op_section_set(self, sec_id, fields):
+        sec = self.project.sections[sec_id]
+        old = {k: getattr(sec, k) for k in fields}
+        for k, v in fields.items():
+            setattr(sec, k, v)
+        return ("section_set", (sec_id, old)), [sec_id], ()
+
+    def _op_module_put(self, mod_id, name, ranges, index):
+        p = self.project
+        mod = Module(mod_id, name)
+        mod.ranges = [ModuleRange(*r) for r in ranges]
+        if self.lazy is not None and ranges:
+            # objects only ever live in resident sections
+            self.materialize({r.section_id for r in mod.ranges})
+            for r in mod.ranges:
+                self.lazy.range_added(r.section_id)
+        items = list(p.modules.items())
+        if index is None or index >= len(items):
+            p.modules[mod_id] = mod
+        else:
+            items.insert(index, (mod_id, mod))
+            p.modules = dict(items)
+        self._renumber = True
+        return ("module_del", (mod_id,)), {r.section_id for r in mod.ranges}, [mod_id]
+
+    def _op_module_del(self, mod_id):
+        p = self.project
+        if self.lazy is not None:
+            for r in self.module_ranges(mod_id):
+                self.lazy.range_removed(r.section_id)
+            self.lazy.drop_module(mod_id)
+        index = list(p.modules).index(mod_id)
+        mod = p.modules.pop(mod_id)
+        self._renumber = True
+        ranges = [(r.section_id, r.start, r.end, r.locked) for r in mod.ranges]
+        return (("module_put", (mod_id, mod.name, ranges, index)),
+                {r.section_id for r in mod.ranges}, [mod_id])
+
+    def _op_module_set(self, mod_id, fields):
+        mod = self.project.modules[mod_id]
+        old = {k: getattr(mod, k) for k in fields}
+        for k, v in fields.items():
+            setattr(mod, k, v)
+        return ("module_set", (mod_id, old)), (), [mod_id]
+
+    def _op_module_order(self, module_ids):
+        p = self.project
+        old = list(p.modules)
+        p.modules = {mid: p.modules[mid] for mid in module_ids}
+        self._renumber = True
+        return ("module_order", (old,)), (), ()
+
+    def _op_range_add(self, mod_id, section_id, start, end, locked, index):
+        self.materialize([section_id])
+        ranges = self.project.modules[mod_id].ranges
+        rng = ModuleRange(section_id, start, end, locked)
+        if index is None or index >= len(ranges):
+            ranges.append(rng)
+        else:
+            ranges.insert(index, rng)
+        if self.lazy is not None:
+            self.lazy.range_added(section_id)
+        return ("range_del", (mod_id, (section_id, start, end))), [section_id], [mod_id]
+
+    def _op_range_del(self, mod_id, key):
+        self.materialize([key[0]])
+        ranges = self.project.modules[mod_id].ranges
+        index = self._find_range(ranges, key)
+        r = ranges.pop(index)
+        if self.lazy is not None:
+            self.lazy.range_removed(r.section_id)
+        return (("range_add", (mod_id, r.section_id, r.start, r.end, r.locked, index)),
+                [r.section_id], [mod_id])
+
+    def _op_range_set(self, mod_id, key, fields):
+        self.materialize([key[0]] + ([fields["section_id"]] if "section_id" in fields else []))
+        ranges = self.project.modules[mod_id].ranges
+        r = ranges[self._find_range(ranges, key)]
+        old = {k: getattr(r, k) for k in fields}
+        for k, v in fields.items():
+            setattr(r, k, v)
+        if self.lazy is not None and r.section_id != key[0]:
+            self.lazy.range_removed(key[0])
+            self.lazy.range_added(r.section_id)
+        new_key = (r.section_id, r.start, r.end)
+        return ("range_set", (mod_id, new_key, old)), {key[0], r.section_id}, [mod_id]
+
+    def _op_symbols_del(self, sec_id):
+        table = self.symbols
+        syms = table.sections.get(sec_id)
+        rows = []
+        if syms is not None:
+            rows = [[table.strings[n], a, size] for a, size, n in zip(syms.starts, syms.sizes, syms.names)]
+            table.drop_section(sec_id)
+        return ("symbols_put", (sec_id, rows)), (), ()
+
+    def _op_symbols_put(self, sec_id, rows):
+        table = self.symbols
+        for name, start, size in rows:
+            table.add(sec_id, name, start, size)
+        return ("symbols_del", (sec_id,)), (), ()
+
+    @staticmethod
+    def _find_range(ranges, key):
+        for i, r in enumerate(ranges):
+            if (r.section_id, r.start, r.end) == tuple(key):
+                return i
+        raise KeyError(f"No range {key} in module.")
+
+    # =============================================================
+    # -----   SECTION MANAGEMENT   ---------------------------------
+    # =============================================================
+
+    def _check_section(self, name, start, end, skip_id=None):
         if start >= end:
             raise ValueError("Section start must be < end.")
 
+        # deferred to commit inside a transaction
+        if self._tx is not None:
+            return
+
         # must be within EXE range if defined
         if self.project.exe_start is not None and self.project.exe_end is not None:
             if start < self.project.exe_start or end > self.project.exe_end:
                 raise ValueError("Section must lie inside executable range.")
 
-        # cannot overlap other existing sections
+        # no overlaps allowed
         for sid, sec in self.project.sections.items():
-            if sid == sec_id:
+            if sid == skip_id:
                 continue
-            if not (end <= sec.start or start >= sec.end):
+            if not (end <= sec.start or start >= sec.end):  # overlap check
                 raise ValueError(f"Section '{name}' overlaps existing section '{sec.name}'.")
 
-        # commit
-        s = self.project.sections[sec_id]
-        s.name = name
-        s.start = start
-        s.end = end
+    @_writes
+    def add_section(self, name, start, end, locked=False):
+        self._check_section(name, start, end)
+
+        # commit after validation
+        sec_id = self.project.next_section_id
+        self._apply(("project_set", ({"next_section_id": sec_id + 1},)))
+        self._apply(("section_put", (sec_id, name, start, end, locked, None)))
+        return self.project.sections[sec_id]
+
+    @_writes
+    def update_section(self, sec_id, name, start, end):
+        self._check_section(name, start, end, skip_id=sec_id)
+        self._apply(("section_set", (sec_id, {"name": name, "start": start, "end": end})))
 
+    @_writes
     def delete_section(self, sec_id):
-        del self.project.sections[sec_id]
+        self._apply(("section_del", (sec_id,)))
+        if self.has_symbols():
+            self._apply(("symbols_del", (sec_id,)))
 
+    @_writes
     def set_section_lock(self, sec_id, state):
-        self.project.sections[sec_id].locked = bool(state)
+        self._apply(("section_set", (sec_id, {"locked": bool(state)})))
+
+    @_reads
+    def plan_section_rebase(self, sec_id, start, end, mode=rebase.SHIFT):
+        """Preview moving a section and its ranges (see rebase.plan_rebase)."""
+        return rebase.plan_rebase(self, sec_id, start, end, mode)
+
+    @_writes
+    def rebase_section(self, sec_id, start, end, mode=rebase.SHIFT, clip=False):
+        """Move a section to [start, end) and every range in it along.
+
+        One transaction: one validation, one save, one undo step. Range
+        locks are kept. Ranges that would spill out of the new bounds make
+        it fail with ValueError, unless clip=True (clipped, or deleted when
+        nothing is left). Returns the RebasePlan that was applied.
+        """
+        plan = rebase.plan_rebase(self, sec_id, start, end, mode)
+        spills = plan.spills
+        if spills and not clip:
+            raise ValueError(f"{len(spills)} range(s) would spill out of section '{plan.section}', "
+                             f"first: '{spills[0].module}' 0x{spills[0].start:X}-0x{spills[0].end:X}.")
+
+        # moving up, go from the top so a moved range never takes the key
+        # of one still waiting (a module with two ranges in the section)
+        moves = reversed(plan.moves) if start > plan.start else plan.moves
+
+        with self.transaction():
+            self._apply(("section_set", (sec_id, {"start": start, "end": end})))
+            for mv in moves:
+                a, b = mv.new_start, mv.new_end
+                if mv.spill:
+                    a, b = max(a, start), min(b, end)
+                key = (sec_id, mv.start, mv.end)
+                if a >= b:
+                    self._apply(("range_del", (mv.module_id, key)))
+                elif (a, b) != (mv.start, mv.end):
+                    self._apply(("range_set", (mv.module_id, key, {"start": a, "end": b})))
+        return plan
 
     # =============================================================
     # -----   MODULE MANAGEMENT   ----------------------------------
     # =============================================================
 
+    def _check_module_name(self, name, skip_id=None):
+        if not name.strip():
+            raise ValueError("Module name cannot be empty.")
+
+        # deferred to commit inside a transaction
+        if self._tx is not None:
+            return
+
+        # unique without regard to case
+        lower = name.lower()
+        for mid, mod in self.project.modules.items():
+            if mid != skip_id and mod.name.lower() == lower:
+                raise ValueError(f"Module '{mod.name}' already exists.")
+
+    @_writes
     def add_module(self, name, before_module_id=None):
         """Add a new module.
 
         If before_module_id is provided and exists, the new module is inserted
         immediately before that module in the current ordering.
         """
+        self._check_module_name(name)
         p = self.project
-        mod = Module(p.next_module_id, name)
-        p.next_module_id += 1
+        mod_id = p.next_module_id
+        self._apply(("project_set", ({"next_module_id": mod_id + 1},)))
 
-        if before_module_id is None or before_module_id not in p.modules:
-            # Default: append at end
-            p.modules[mod.id] = mod
-        else:
+        index = None
+        if before_module_id is not None and before_module_id in p.modules:
             # Insert in dict order immediately before the given module
-            new_modules = {}
-            for mid, existing in p.modules.items():
-                if mid == before_module_id:
-                    new_modules[mod.id] = mod
-                new_modules[mid] = existing
-            p.modules = new_modules
+            index = list(p.modules).index(before_module_id)
 
-        self.renumber_modules()
-        return mod
+        self._apply(("module_put", (mod_id, name, [], index)))
+        return p.modules[mod_id]
 
+    @_writes
     def update_module(self, mod_id, new_name):
-        self.project.modules[mod_id].name = new_name
+        self._check_module_name(new_name, skip_id=mod_id)
+        self._apply(("module_set", (mod_id, {"name": new_name})))
 
+    @_writes
     def delete_module(self, mod_id):
-        del self.project.modules[mod_id]
-        self.renumber_modules()
+        self._apply(("module_del", (mod_id,)))
 
+    @_writes
     def move_module(self, mod_id, offset):
         module_ids = list(self.project.modules.keys())
 
@@ -184,38 +815,404 @@ class ProjectStore:
             return False
 
         module_ids[index], module_ids[target_index] = module_ids[target_index], module_ids[index]
-        self.project.modules = {module_id: self.project.modules[module_id] for module_id in module_ids}
-        self.renumber_modules()
+        self._apply(("module_order", (module_ids,)))
         return True
 
     # =============================================================
     # ----- MODULE RANGES ------------------------------------------
     # =============================================================
 
+    @_writes
     def set_module_range(self, mod_id, section_id, start, end, locked=False):
-        mod = self.project.modules[mod_id]
-        mod.ranges.append(ModuleRange(section_id, start, end, locked))
+        self._apply(("range_add", (mod_id, section_id, start, end, bool(locked), None)))
         return True
 
+    @_writes
+    def update_module_range(self, mod_id, rng, section_id, start, end, new_mod_id=None):
+        """Edit a range; new_mod_id hands it over to another module.
+
+        rng may be a stale copy (lazy mode pages ranges out and back in as
+        new objects): it is only used for its (section_id, start, end).
+        """
+        key = (rng.section_id, rng.start, rng.end)
+        # old and new section resident together, so neither is paged out mid-edit
+        self.materialize({key[0], section_id})
+
+        if new_mod_id is not None and new_mod_id != mod_id:
+            ranges = self.project.modules[mod_id].ranges
+            locked = ranges[self._find_range(ranges, key)].locked
+            self._apply(("range_del", (mod_id, key)))
+            self._apply(("range_add", (new_mod_id, section_id, start, end, locked, None)))
+        else:
+            self._apply(("range_set", (mod_id, key, {"section_id": section_id,
+                                                     "start": start, "end": end})))
+
+    @_writes
+    def delete_module_range(self, mod_id, rng):
+        key = (rng.section_id, rng.start, rng.end)
+        self.materialize([key[0]])
+        if not any((r.section_id, r.start, r.end) == key for r in self.project.modules[mod_id].ranges):
+            return False
+        self._apply(("range_del", (mod_id, key)))
+        return True
+
+    @_writes
+    def set_range_lock(self, mod_id, rng, state):
+        self._apply(("range_set", (mod_id, (rng.section_id, rng.start, rng.end),
+                                   {"locked": bool(state)})))
+
+    @_writes
     def remove_module_range(self, mod_id, section_id):
-        mod = self.project.modules[mod_id]
-        mod.ranges = [r for r in mod.ranges if r.section_id != section_id]
+        for r in list(self.module_ranges(mod_id)):
+            if r.section_id == section_id:
+                self._apply(("range_del", (mod_id, (r.section_id, r.start, r.end))))
+
+    @_caches
+    def plan_range_import(self, text, default_module_id=None):
+        """Parse pasted 'start end [module]' lines and check them, changing nothing.
+
+        Returns (planned, errors): PlannedRange per parsed line (sorted by
+        start, each with its error / warning) and (line, message) per line
+        that could not be parsed.
+        """
+        entries, errors = bulk_import.parse_range_lines(text)
+        return bulk_import.plan_ranges(self, entries, default_module_id), errors
+
+    @_writes
+    def apply_range_import(self, planned):
+        """Add every error-free planned range (creating missing modules) as
+        one transaction. Returns the number of ranges added."""
+        added = 0
+        with self.transaction():
+            created = {}
+            for e in planned:
+                if not e.ok:
+                    continue
+                mod_id = e.module_id
+                if mod_id is None:
+                    key = e.module.lower()
+                    if key not in created:
+                        created[key] = self.add_module(e.module).id
+                    mod_id = created[key]
+                self.set_module_range(mod_id, e.section_id, e.start, e.end)
+                added += 1
+        return added
+
+    # =============================================================
+    # ----- INTEGRITY ----------------------------------------------
+    # =============================================================
+
+    @_caches
+    def check_integrity(self, section_ids=None):
+        """Orphaned, out-of-bounds and duplicate ranges (integrity.Issue).
+
+        Only sections touched since the last call are checked again.
+        """
+        return self.integrity.all(self, section_ids)
+
+    @_writes
+    def fix_integrity(self, issues=None, include_locked=False):
+        """Repair issues (None = all current ones) as one transaction.
+
+        See integrity.plan_fixes for what each fix does. Returns
+        (ops applied, issues skipped because a range is locked).
+        """
+        if issues is None:
+            issues = self.check_integrity()
+        ops, skipped = integrity.plan_fixes(self, issues, include_locked)
+        if ops:
+            with self.transaction(validate=False):
+                for op in ops:
+                    self._apply(op)
+        return len(ops), skipped
 
     # =============================================================
     # ----- EXECUTABLE RANGE ---------------------------------------
     # =============================================================
 
+    @_writes
     def set_executable_range(self, start, end):
         if start >= end:
             return False
-        self.project.exe_start = start
-        self.project.exe_end   = end
+        self._apply(("project_set", ({"exe_start": start, "exe_end": end},)))
         return True
 
+    # =============================================================
+    # ----- EXECUTABLE FILE + CONTENT HASHES -----------------------
+    # =============================================================
+
+    def _set_project_file(self, filename):
+        if filename != self.project_file:
+            self.project_file = filename
+            self._hash_cache = HashCache(hashes_filename(filename))
+
+    @_writes
+    def set_executable_file(self, path):
+        """Point the project at its executable (stored as given; relative
+        paths are taken from the project file's folder)."""
+        self._apply(("project_set", ({"exe_path": path or None},)))
+
+    @_reads
+    def executable_path(self):
+        path = self.project.exe_path
+        if path and not os.path.isabs(path) and self.project_file:
+            path = os.path.join(os.path.dirname(os.path.abspath(self.project_file)), path)
+        return path
+
+    @_caches
+    def executable_image(self):
+        """The executable as a mapped ExeImage, reopened if the file changed."""
+        path = self.executable_path()
+        if not path:
+            raise ValueError("No executable file set for this project.")
+        try:
+            st = os.stat(path)
+        except OSError:
+            raise ValueError(f"Executable not found: {path}")
+
+        base = self.project.exe_start or 0
+        img = self._image
+        if img is not None and (img.path, img.size, img.mtime_ns, img.base) != (path, st.st_size, st.st_mtime_ns, base):
+            img.close()
+            img = self._image = None
+        if img is None:
+            img = self._image = ExeImage(path, base=base)
+        return img
+
+    @_caches
+    def hash_spans(self, spans, mask_relocations=False, workers=None):
+        """Hex content digests of the executable's bytes at [start, end) spans."""
+        digests = content_hash.hash_spans(self.executable_image(), spans, mask_relocations,
+                                          self._hash_cache, workers)
+        self._hash_cache.save()
+        return digests
+
+    @_caches
+    def cached_hashes(self, spans, mask_relocations=False):
+        """{(start, end): hex digest} of the spans already in the hash cache.
+
+        Never reads the executable on the calling thread: the missing spans
+        are hashed on a background thread without holding the store's locks,
+        which then emits EXE_DATA_READY ("hashes") for views to ask again.
+        Raises ValueError when there is no readable executable.
+        """
+        img = self.executable_image()
+        cache = self._hash_cache
+        cache.bind(img)
+
+        known, todo = {}, []
+        for a, b in spans:
+            key = HashCache.key(a, b, mask_relocations)
+            digest = cache.digests.get(key)
+            if digest is not None:
+                known[(a, b)] = digest
+            elif key not in self._hashing:
+                self._hashing.add(key)
+                todo.append((a, b))
+        if not todo:
+            return known
+
+        def run():
+            try:
+                digests = content_hash.hash_spans(img, todo, mask_relocations)
+            except (OSError, ValueError) as e:   # the file changed under us
+                print(f"[STORE] Hashing {img.path} failed: {e}")
+                digests = None
+            with self._cache_lock:
+                self._hashing.difference_update(HashCache.key(a, b, mask_relocations) for a, b in todo)
+                if digests is None or self._image is not img:
+                    return
+                for (a, b), digest in zip(todo, digests):
+                    cache.digests[HashCache.key(a, b, mask_relocations)] = digest
+                cache.dirty = True
+                cache.save()
+            with self.lock.write("hashes ready"):
+                self.events.emit(events.EXE_DATA_READY, ["hashes"], external=True)
+
+        threading.Thread(target=run, daemon=True).start()
+        return known
+
+    @_reads
+    def hash_ranges(self, ranges=None, mask_relocations=False, workers=None):
+        """{(section_id, start, end): hex digest} of the bytes of module ranges
+        (ranges = iterable of such keys, None = every range in the project).
+
+        Relocation masking and caching as in content_hash.hash_spans.
+        """
+        if ranges is None:
+            self.materialize()
+            ranges = {(r.section_id, r.start, r.end)
+                      for m in self.project.modules.values() for r in m.ranges}
+        keys = list(ranges)
+        digests = self.hash_spans([(k[1], k[2]) for k in keys], mask_relocations, workers)
+        return dict(zip(keys, digests))
+
+    @_reads
+    def hash_sections(self, section_ids=None, mask_relocations=False, workers=None):
+        """{section id: hex digest} of whole sections (None = all)."""
+        p = self.project
+        ids = list(p.sections if section_ids is None else section_ids)
+        digests = self.hash_spans([(p.sections[sid].start, p.sections[sid].end) for sid in ids],
+                             mask_relocations, workers)
+        return dict(zip(ids, digests))
+
+    def _image_summary(self, kind, cls, filename_func, on_ready):
+        """A summary (cls: build(image) / save / load) of the executable.
+
+        Comes from memory or the side file when it matches the file;
+        otherwise it is built on a background thread and None is returned.
+        Once it is done the thread emits EXE_DATA_READY with the kind as id,
+        delivered on the next flush, and calls on_ready(summary) itself (for
+        scripts; UI code must listen for the event instead).
+        Raises ValueError when there is no readable executable.
+        """
+        img = self.executable_image()
+        summary = self._summaries.get(kind)
+        if summary is not None and summary.signature == img.signature:
+            return summary
+
+        filename = filename_func(self.project_file) if self.project_file else None
+        if filename:
+            summary = cls.load(filename, img.signature)
+            if summary is not None:
+                self._summaries[kind] = summary
+                return summary
+
+        with self._summary_lock:
+            if kind in self._summary_waiters:
+                if on_ready is not None:
+                    self._summary_waiters[kind].append(on_ready)
+                return None
+            self._summary_waiters[kind] = [on_ready] if on_ready is not None else []
+
+        def build():
+            summary = None
+            try:
+                t0 = time.perf_counter()
+                summary = cls.build(img)
+                print(f"[STORE] {kind.capitalize()} of {os.path.basename(img.path)} built in "
+                      f"{time.perf_counter() - t0:.2f} s")
+                if filename:
+                    summary.save(filename)
+                self._summaries[kind] = summary
+            except (OSError, ValueError) as e:
+                print(f"[STORE] {kind.capitalize()} of {img.path} failed: {e}")
+            finally:
+                with self._summary_lock:
+                    waiters = self._summary_waiters.pop(kind)
+            if summary is not None:
+                with self.lock.write(kind + " ready"):
+                    self.events.emit(events.EXE_DATA_READY, [kind], external=True)
+                for callback in waiters:
+                    callback(summary)
+
+        threading.Thread(target=build, daemon=True).start()
+        return None
+
+    @_reads
+    def byte_map(self, on_ready=None):
+        """Entropy / zero / 0xCC summary of the executable (byte_map.ByteMap),
+        cached in <project>.bytemap.npz. None while it is being built; see
+        _image_summary for on_ready."""
+        return self._image_summary("byte map", ByteMap, bytemap_filename, on_ready)
+
+    # =============================================================
+    # ----- CROSS REFERENCES ---------------------------------------
+    # =============================================================
+
+    @_reads
+    def xref_index(self, on_ready=None):
+        """Pointers from data into code of the executable (xref.XrefIndex),
+        cached in <project>.xrefs.npz. None while it is being built; see
+        _image_summary for on_ready."""
+        return self._image_summary("xref index", XrefIndex, xrefs_filename, on_ready)
+
+    @_caches
+    def incoming_refs(self, start, end, on_ready=None):
+        """Pointers into [start, end) grouped by the module range holding
+        them, most first: [(module or None, range or None, sources)].
+        Pointers stored outside any module range come last with None.
+        None while the xref index is being built.
+        """
+        index = self.xref_index(on_ready)
+        if index is None:
+            return None
+        _, sources = index.refs_to(start, end)
+
+        sources = np.unique(sources)
+        groups = {}
+        for src, owner in zip(sources.tolist(), self.index.owners(self, sources)):
+            mod, rng = owner or (None, None)
+            key = (rng.section_id, rng.start, rng.end) if rng is not None else None
+            groups.setdefault(key, (mod, rng, []))[2].append(src)
+
+        out = sorted((g for k, g in groups.items() if k is not None), key=lambda g: (-len(g[2]), g[2][0]))
+        if None in groups:
+            out.append(groups[None])
+        return out
+
+    # =============================================================
+    # ----- BOUNDARY SUGGESTIONS -----------------------------------
+    # =============================================================
+
+    @_reads
+    def suggest_boundaries(self, section_ids=None, min_run=boundaries.MIN_RUN, limit=None):
+        """Likely module starts after padding runs in the module holes of the
+        given sections (None = all), best first (see boundaries.suggest_boundaries)."""
+        holes = self.compute_module_holes()
+        if section_ids is not None:
+            names = {self.project.sections[sid].name for sid in section_ids}
+            holes = [h for h in holes if h[0] in names]
+        return boundaries.suggest_boundaries(self, holes, min_run, limit)
+
+    @_writes
+    def create_suggested_range(self, boundary, name=None):
+        """Add a module (default name mod_<address>) owning a suggested
+        boundary's span, [address, end), as one undoable step."""
+        if self.query(boundary.address, boundary.end)["ranges"]:
+            raise ValueError(f"0x{boundary.address:X}-0x{boundary.end:X} is no longer unowned.")
+        with self.transaction():
+            mod = self.add_module(name or f"mod_{boundary.address:X}")
+            self.set_module_range(mod.id, boundary.section_id, boundary.address, boundary.end)
+        return mod
+
+    # =============================================================
+    # ----- MODULE SEARCH ------------------------------------------
+    # =============================================================
+
+    @_caches
+    def search_modules(self, query, limit=DEFAULT_LIMIT):
+        """Modules whose name matches query (case-insensitive): prefix matches
+        first, then substring, then fuzzy (typo) matches if nothing else hit."""
+        ids = self.module_names.search(self.project, query, limit)
+        return [self.project.modules[mid] for mid in ids]
+
+    # =============================================================
+    # ----- RANGE QUERIES ------------------------------------------
+    # =============================================================
+
+    @_caches
+    def query(self, start, end):
+        """Everything intersecting the window [start, end).
+
+        Returns a dict with "sections" (Section), "ranges" ((module, range)),
+        "holes" ((section_name, start, end) module holes) and "exe_holes"
+        ((start, end) space outside any section), each sorted by start.
+        """
+        if start >= end:
+            raise ValueError("Query start must be < end.")
+        return self.index.query(self, start, end)
+
+    @_caches
+    def locate(self, addr):
+        """Everything at one address plus its neighbours (see AddressIndex.locate)."""
+        return self.index.locate(self, addr)
+
     # =============================================================
     # ----- ANALYSIS (Holes + Overlaps) ----------------------------
     # =============================================================
 
+    @_reads
     def compute_section_holes(self):
         p = self.project
         if not (p.exe_start is not None and p.exe_end is not None):
@@ -234,7 +1231,18 @@ class ProjectStore:
 
         return holes
 
-    def compute_module_holes(self):
+    @_reads
+    def compute_module_holes(self, workers=None, chunk_size=analysis.DEFAULT_CHUNK_SIZE):
+        """Unowned space inside sections as (section_name, start, end).
+
+        workers=None scans serially; any other value (0 = one per CPU) fans
+        the sections out over a process pool, splitting sections larger than
+        chunk_size. Both paths return identical lists.
+        """
+        self.materialize()
+        if workers is not None:
+            return analysis.parallel_module_holes(self.project, workers or None, chunk_size)
+
         holes = []
         for sec in sorted(self.project.sections.values(), key=lambda s: s.start):
             used = [(r.start, r.end)
@@ -258,7 +1266,16 @@ class ProjectStore:
 
         return holes
 
-    def compute_module_overlaps(self):
+    @_reads
+    def compute_module_overlaps(self, workers=None, chunk_size=analysis.DEFAULT_CHUNK_SIZE):
+        """Pairs of modules claiming the same bytes as (A, B, rA, rB, size).
+
+        workers works as in compute_module_holes.
+        """
+        self.materialize()
+        if workers is not None:
+            return analysis.parallel_module_overlaps(self.project, workers or None, chunk_size)
+
         overlaps = []
         mods = list(self.project.modules.values())
 
@@ -274,3 +1291,164 @@ class ProjectStore:
                             overlaps.append((A, B, rA, rB,
                                              min(rA.end, rB.end) - max(rA.start, rB.start)))
         return overlaps
+
+    # ----- ranked / paged views (analysis cached per version) -----
+
+    @_caches
+    def report_items(self, kind):
+        """Cached compute_section_holes / compute_module_holes /
+        compute_module_overlaps result for kind (report_cache.KINDS)."""
+        return self.reports.get(self, kind)
+
+    @_caches
+    def top_report_items(self, kind, n=10):
+        """The n largest holes / overlaps of a report, biggest first."""
+        return self.reports.top(self, kind, n)
+
+    @_caches
+    def report_page(self, kind, by="size", descending=True, offset=0, limit=100):
+        """(total, items) of one page of a report sorted by "size",
+        "address" or "section"; later pages reuse the cached sort."""
+        return self.reports.page(self, kind, by, descending, offset, limit)
+
+    # =============================================================
+    # ----- SYMBOLS ------------------------------------------------
+    # =============================================================
+
+    @_caches
+    def has_symbols(self):
+        """True if symbols are loaded or a symbol file exists (no I/O beyond stat)."""
+        if self._symbols is not None:
+            return len(self._symbols) > 0
+        return self.symbols_file is not None and os.path.exists(self.symbols_file)
+
+    @property
+    def symbols(self):
+        if self._symbols is None:
+            if self.symbols_file and os.path.exists(self.symbols_file):
+                self._symbols = load_symbols(self.symbols_file)
+            else:
+                self._symbols = SymbolTable()
+        return self._symbols
+
+    @_writes
+    def add_symbols(self, symbols):
+        """Attach (name, start, size) symbols to the sections containing them.
+
+        Returns (added, skipped); symbols outside every section are skipped.
+        """
+        self.index.refresh(self)
+        table = self.symbols
+        added = skipped = 0
+
+        for name, start, size in symbols:
+            secs = self.index.sections.at(start)
+            if not secs:
+                skipped += 1
+                continue
+            table.add(secs[0].id, name, start, size)
+            added += 1
+
+        if added:
+            self.events.emit(events.SYMBOLS_CHANGED)
+        return added, skipped
+
+    def import_symbols_text(self, filename):
+        """Read 'start size name' lines (hex, parse_hex rules); '#' starts a comment."""
+        def parse():
+            with open(filename, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.split("#", 1)[0].strip()
+                    if not line:
+                        continue
+                    start, size, name = line.split(None, 2)
+                    yield name.strip(), parse_hex(start), parse_hex(size)
+
+        return self.add_symbols(parse())
+
+    @_caches
+    def resolve_symbol(self, addr):
+        """(name, offset) of the symbol at addr, or None. Never loads symbols
+        for projects that have none."""
+        if not self.has_symbols():
+            return None
+        self.index.refresh(self)
+        secs = self.index.sections.at(addr)
+        if not secs:
+            return None
+        return self.symbols.resolve(secs[0].id, addr)
+
+    # =============================================================
+    # ----- EXPORT -------------------------------------------------
+    # =============================================================
+
+    def export_report(self, kind, filename, fmt=None):
+        """Stream a report straight from the model to CSV / JSON / JSONL.
+
+        kind: "section_holes", "module_holes", "overlaps" or "ranges".
+        fmt defaults to the file extension. Returns the number of rows.
+        Runs on a snapshot, so edits go on while a big export is written.
+        """
+        # copy under the read lock, then write the file without holding it
+        return export.export_report(self.snapshot(), kind, filename, fmt)
+
+    # =============================================================
+    # ----- COVERAGE STATISTICS ------------------------------------
+    # =============================================================
+
+    def _refresh_coverage(self):
+        self.materialize()
+        self.coverage.refresh(self.project)
+
+    @_caches
+    def coverage_by_section(self):
+        """SectionCoverage for every section, sorted by start."""
+        self._refresh_coverage()
+        return sorted(self.coverage.sections.values(), key=lambda c: c.start)
+
+    @_caches
+    def coverage_by_module(self):
+        """(module, owned bytes) for every module, in module order."""
+        self._refresh_coverage()
+        return [(m, self.coverage.module_bytes.get(m.id, 0))
+                for m in self.project.modules.values()]
+
+    @_caches
+    def coverage_totals(self):
+        """(section bytes, owned bytes, overlapped bytes) over all sections."""
+        self._refresh_coverage()
+        total = owned = overlapped = 0
+        for c in self.coverage.sections.values():
+            total += c.size
+            owned += c.owned
+            overlapped += c.overlapped
+        return total, owned, overlapped
+
+    @_caches
+    def largest_holes(self, n=10):
+        """The n biggest unclaimed regions as (section_name, start, end)."""
+        self._refresh_coverage()
+        candidates = ((c.name, a, b)
+                      for c in self.coverage.sections.values()
+                      for a, b in c.holes)
+        return heapq.nlargest(n, candidates, key=lambda h: h[2] - h[1])
+
+
+def symbols_filename(project_filename):
+    return os.path.splitext(project_filename)[0] + ".symbols"
+
+
+def history_filename(project_filename):
+    return os.path.splitext(project_filename)[0] + ".history"
+
+
+def hashes_filename(project_filename):
+    return os.path.splitext(project_filename)[0] + ".hashes"
+
+
+def bytemap_filename(project_filename):
+    return os.path.splitext(project_filename)[0] + ".bytemap.npz"
+
+
+def xrefs_filename(project_filename):
+    return os.path.splitext(project_filename)[0] + ".xrefs.npz"
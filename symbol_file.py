@@ -0,0 +1,57 @@
+import json
+import sys
+
+from models import SectionSymbols, SymbolTable
+
+# Layout: one JSON header line, the string table as NUL-separated UTF-8,
+# then for every section its raw start / size / name-id arrays.
+VERSION = 1
+
+
+def save_symbols(table, filename):
+    blob = "\0".join(table.strings).encode("utf-8")
+    header = {
+        "version":   VERSION,
+        "byteorder": sys.byteorder,
+        "strings":   len(blob),
+        "names":     len(table.strings),   # [""] and [] both encode as b""
+        "sections":  [[sid, len(s.starts)] for sid, s in table.sections.items()],
+    }
+
+    with open(filename, "wb") as f:
+        f.write(json.dumps(header).encode("utf-8") + b"\n")
+        f.write(blob)
+        for syms in table.sections.values():
+            syms.sort()
+            f.write(syms.starts.tobytes())
+            f.write(syms.sizes.tobytes())
+            f.write(syms.names.tobytes())
+
+    table.dirty = False
+    print(f"[STORE] Saved {len(table)} symbols to {filename}")
+
+
+def load_symbols(filename):
+    table = SymbolTable()
+
+    with open(filename, "rb") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != VERSION:
+            raise ValueError(f"Unsupported symbol file version {header.get('version')}")
+        swap = header["byteorder"] != sys.byteorder
+
+        blob = f.read(header["strings"]).decode("utf-8")
+        count = header.get("names", 1 if blob else 0)
+        table.strings = blob.split("\0") if count else []
+        table.string_ids = {name: i for i, name in enumerate(table.strings)}
+
+        for sid, count in header["sections"]:
+            syms = SectionSymbols()
+            for col in (syms.starts, syms.sizes, syms.names):
+                col.frombytes(f.read(count * col.itemsize))
+                if swap:
+                    col.byteswap()
+            table.sections[sid] = syms
+
+    print(f"[STORE] Loaded {len(table)} symbols from {filename}")
+    return table
@@ -0,0 +1,88 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import analysis
+from models import Module, ModuleRange, Project, Section
+from store import ProjectStore
+
+
+def random_store(rng):
+    """Small project with the awkward cases: empty ranges, ranges sticking out
+    of their section, equal starts, ranges of a deleted section."""
+    p = Project()
+    cursor = rng.randrange(0, 0x100)
+    for sid in range(1, rng.randint(1, 4) + 1):
+        start = cursor + rng.randrange(0, 0x40)
+        end = start + rng.randrange(1, 0x400)
+        p.sections[sid] = Section(sid, f"s{sid}", start, end)
+        cursor = end
+    points = [x for s in p.sections.values() for x in (s.start, s.end)]
+
+    for mid in range(1, rng.randint(1, 6) + 1):
+        mod = Module(mid, f"m{mid}", mid)
+        for _ in range(rng.randint(0, 6)):
+            sid = rng.choice(list(p.sections) + [99])
+            sec = p.sections.get(sid, p.sections[1])
+            a = rng.choice([rng.randrange(sec.start - 8, sec.end + 8), rng.choice(points)])
+            b = a + rng.choice([0, 0, rng.randrange(1, 0x20), rng.randrange(1, 0x200)])
+            mod.ranges.append(ModuleRange(sid, max(a, 0), max(b, 0)))
+        p.modules[mid] = mod
+
+    store = ProjectStore()
+    store.project = p
+    return store
+
+
+def overlap_key(found):
+    return [(A.id, B.id, rA.start, rA.end, rB.start, rB.end, size) for A, B, rA, rB, size in found]
+
+
+@pytest.fixture
+def thread_pool(monkeypatch):
+    # same chunking and merging, without forking a pool per case
+    monkeypatch.setattr(analysis, "ProcessPoolExecutor", ThreadPoolExecutor)
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_parallel_matches_serial(thread_pool, seed):
+    rng = random.Random(seed)
+    store = random_store(rng)
+    chunk = rng.choice([1, 3, 0x10, 0x40, 0x1000])
+
+    assert store.compute_module_holes(workers=2, chunk_size=chunk) == store.compute_module_holes()
+    assert (overlap_key(store.compute_module_overlaps(workers=2, chunk_size=chunk))
+            == overlap_key(store.compute_module_overlaps()))
+
+
+def test_empty_range_on_chunk_border(thread_pool):
+    p = Project()
+    p.sections[1] = Section(1, "text", 0x0, 0x40)
+    p.modules[1] = Module(1, "a", 1, [ModuleRange(1, 0x20, 0x20)])   # splits the hole at 0x20
+    store = ProjectStore()
+    store.project = p
+
+    serial = store.compute_module_holes()
+    assert serial == [("text", 0x0, 0x20), ("text", 0x20, 0x40)]
+    assert store.compute_module_holes(workers=2, chunk_size=0x20) == serial
+
+
+def test_empty_range_inside_another(thread_pool):
+    p = Project()
+    p.sections[1] = Section(1, "text", 0x0, 0x40)
+    p.modules[1] = Module(1, "a", 1, [ModuleRange(1, 0x10, 0x30)])
+    p.modules[2] = Module(2, "b", 2, [ModuleRange(1, 0x10, 0x10), ModuleRange(1, 0x20, 0x20)])
+    store = ProjectStore()
+    store.project = p
+
+    serial = overlap_key(store.compute_module_overlaps())
+    assert serial == [(1, 2, 0x10, 0x30, 0x20, 0x20, 0)]   # only the one strictly inside
+    assert overlap_key(store.compute_module_overlaps(workers=2, chunk_size=0x20)) == serial
+
+
+def test_process_pool():
+    store = random_store(random.Random(7))
+    assert store.compute_module_holes(workers=2, chunk_size=0x10) == store.compute_module_holes()
+    assert (overlap_key(store.compute_module_overlaps(workers=2, chunk_size=0x10))
+            == overlap_key(store.compute_module_overlaps()))
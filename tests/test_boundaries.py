@@ -0,0 +1,47 @@
+import random
+
+import numpy as np
+import pytest
+
+from boundaries import CC, NOP, ZERO, padding_runs
+
+
+def brute_force(buf, min_run):
+    out, i = [], 0
+    while i < len(buf):
+        j = i
+        while j < len(buf) and buf[j] == buf[i]:
+            j += 1
+        if j - i >= max(min_run, 2) and buf[i] in (CC, ZERO, NOP):
+            out.append((i, j, buf[i]))
+        i = j
+    return out
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_padding_runs_match_brute_force(seed):
+    rng = random.Random(seed)
+    buf = bytearray()
+    for _ in range(rng.randint(0, 60)):
+        if rng.random() < 0.5:
+            buf += bytes([rng.choice([CC, ZERO, NOP, 0x41])]) * rng.randint(1, 40)
+        else:
+            buf += bytes(rng.randrange(256) for _ in range(rng.randint(1, 20)))
+    min_run = rng.choice([0, 1, 2, 8, 16])
+
+    starts, ends, fills = padding_runs(np.frombuffer(bytes(buf), dtype=np.uint8), min_run)
+    assert list(zip(starts.tolist(), ends.tolist(), fills.tolist())) == brute_force(buf, min_run)
+
+
+def test_run_at_both_ends():
+    buf = bytes([CC] * 8) + b"\x55\x8b\xec" + bytes(8)
+    starts, ends, fills = padding_runs(np.frombuffer(buf, dtype=np.uint8), 8)
+    assert starts.tolist() == [0, 11]
+    assert ends.tolist() == [8, 19]
+    assert fills.tolist() == [CC, ZERO]
+
+
+def test_short_buffers():
+    for buf in (b"", b"\xcc"):
+        starts, ends, fills = padding_runs(np.frombuffer(buf, dtype=np.uint8), 1)
+        assert len(starts) == len(ends) == len(fills) == 0
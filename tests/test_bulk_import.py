@@ -0,0 +1,38 @@
+import pytest
+
+from store import ProjectStore
+
+
+@pytest.fixture
+def store():
+    s = ProjectStore()
+    text = s.add_section(".text", 0x1000, 0x2000)
+    s.add_section(".data", 0x2000, 0x3000)
+    a = s.add_module("a")
+    s.set_module_range(a.id, text.id, 0x1000, 0x1100)
+    return s
+
+
+def plan(store, text, default=None):
+    planned, errors = store.plan_range_import(text, default)
+    assert errors == []
+    return {(e.start, e.end): e for e in planned}
+
+
+def test_warnings_for_new_modules_and_pasted_overlaps(store):
+    p = plan(store, "10c0 1200 new\n1180 1300 other\n2000 2100 a\n2400 2500 a")
+    assert p[0x10C0, 0x1200].warning == "new module; overlaps a, other"
+    assert p[0x1180, 0x1300].warning == "new module; overlaps new"
+    assert p[0x2000, 0x2100].warning == ""
+    assert p[0x2400, 0x2500].error == "module already has a range in '.data'"
+
+
+def test_preview_matches_import(store):
+    store.update_section(1, ".text", 0x1000, 0x1080)   # leaves a's range broken
+    planned, _ = store.plan_range_import("1000 1050 b\n1040 1080 B\n2000 2100 b\n0 10 c")
+    ok = [e for e in planned if e.ok]
+    assert [(e.start, e.end) for e in ok] == [(0x1000, 0x1050), (0x2000, 0x2100)]
+
+    assert store.apply_range_import(planned) == len(ok)
+    b = next(m for m in store.project.modules.values() if m.name == "b")
+    assert [(r.start, r.end) for r in b.ranges] == [(e.start, e.end) for e in ok]
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from interval_index import IntervalIndex
+
+
+def brute_force(items, start, end):
+    return [t[2] for t in sorted(items, key=lambda t: (t[0], t[1])) if t[0] < end and t[1] > start]
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_query_matches_brute_force(seed):
+    rng = random.Random(seed)
+    items = []
+    for i in range(rng.randint(0, 200)):
+        a = rng.randrange(0, 0x1000)
+        b = a + rng.choice([0, 1, rng.randrange(1, 0x20), rng.randrange(1, 0x800)])
+        items.append((a, b, i))
+    ix = IntervalIndex(items)
+    assert len(ix) == len(items)
+
+    for _ in range(100):
+        a = rng.randrange(-0x10, 0x1100)
+        b = a + rng.randrange(0, 0x100)
+        assert ix.query(a, b) == brute_force(items, a, b)
+        assert ix.at(a) == brute_force(items, a, a + 1)
+
+
+def test_long_interval_in_front():
+    # one interval spanning everything must not make the others expensive to find
+    items = [(0, 1 << 40, "long")] + [(i * 16, i * 16 + 8, i) for i in range(1, 2000)]
+    ix = IntervalIndex(items)
+    assert ix.query(0x100, 0x101) == ["long", 16]
+    assert ix.query(0x108, 0x110) == ["long"]
+    assert ix.query(1 << 40, (1 << 40) + 1) == []
+
+
+def test_empty():
+    ix = IntervalIndex()
+    assert ix.query(0, 100) == []
+    assert ix.at(5) == []
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_owners_match_locate(seed):
+    from store import ProjectStore
+
+    rng = random.Random(seed)
+    store = ProjectStore()
+    secs = [store.add_section(f"s{i}", 0x1000 * i, 0x1000 * i + 0xC00) for i in range(1, 5)]
+    for i in range(rng.randint(0, 60)):
+        sec = rng.choice(secs)
+        a = rng.randrange(sec.start, sec.end)
+        b = min(sec.end, a + rng.choice([0, 1, rng.randrange(1, 0x40), rng.randrange(1, 0x800)]))
+        store.set_module_range(store.add_module(f"m{i}").id, sec.id, a, b)
+
+    addrs = sorted({rng.randrange(0, 0x5800) for _ in range(300)})
+    expected = [(store.locate(a)["ranges"] or [None])[0] for a in addrs]
+    assert store.index.owners(store, addrs) == expected
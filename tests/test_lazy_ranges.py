@@ -0,0 +1,102 @@
+from store import ProjectStore
+
+
+def lazy_store(tmp_path, budget=4):
+    """Three sections of four ranges each, reopened lazily with room for one section."""
+    store = ProjectStore()
+    with store.transaction():
+        sections = [store.add_section(f"s{i}", i * 0x1000, (i + 1) * 0x1000) for i in range(3)]
+        for m in range(4):
+            mod = store.add_module(f"m{m}")
+            for sec in sections:
+                store.set_module_range(mod.id, sec.id, sec.start + m * 0x100, sec.start + m * 0x100 + 0x80)
+    filename = str(tmp_path / "project.json")
+    store.save(filename)
+
+    lazy = ProjectStore()
+    lazy.load(filename, lazy=True, budget=budget)
+    return lazy, filename
+
+
+def page_out(store, sec_id):
+    for other in store.project.sections:
+        if other != sec_id:
+            store.section_ranges(other)
+    assert not store.lazy.is_resident(sec_id)
+
+
+def test_page_out_drops_indexed_objects(tmp_path):
+    store, _ = lazy_store(tmp_path)
+    found = store.query(0x0, 0x80)["ranges"]
+    assert len(found) == 1
+    stale = found[0][1]
+
+    page_out(store, 1)
+    store.index.refresh(store, ())
+    assert 1 not in store.index.ranges
+
+    fresh = store.query(0x0, 0x80)["ranges"][0][1]
+    assert fresh is not stale
+    assert (fresh.section_id, fresh.start, fresh.end) == (stale.section_id, stale.start, stale.end)
+
+
+def test_edits_through_stale_ranges(tmp_path):
+    store, filename = lazy_store(tmp_path)
+    mod = next(iter(store.project.modules.values()))
+    stale = [r for r in store.module_ranges(mod.id) if r.section_id == 1][0]
+
+    page_out(store, 1)
+    store.update_module_range(mod.id, stale, 1, 0x10, 0x20)
+    page_out(store, 1)
+    moved = [r for r in store.module_ranges(mod.id) if r.section_id == 1][0]
+    assert (moved.start, moved.end) == (0x10, 0x20)
+
+    page_out(store, 1)
+    assert store.delete_module_range(mod.id, moved)
+    assert all(r.section_id != 1 for r in store.module_ranges(mod.id))
+
+    store.save(filename)
+    reloaded = ProjectStore()
+    reloaded.load(filename)
+    ranges = reloaded.project.modules[mod.id].ranges
+    assert sorted(r.section_id for r in ranges) == [2, 3]
+
+
+def test_transaction_pins_its_sections(tmp_path):
+    store, _ = lazy_store(tmp_path)
+    mod = next(iter(store.project.modules.values()))
+    with store.transaction():
+        store.set_range_lock(mod.id, store.section_ranges(1)[0][1], True)
+        store.section_ranges(2)
+        store.section_ranges(3)
+        assert store.lazy.is_resident(1)
+    assert not store.lazy.pinned
+    assert [r.locked for m, r in store.section_ranges(1) if m.id == mod.id] == [True]
+
+
+def test_resident_counts_follow_deletes_and_moves(tmp_path):
+    store, _ = lazy_store(tmp_path, budget=100)
+
+    def check():
+        actual = {}
+        for mod in store.project.modules.values():
+            for r in mod.ranges:
+                actual[r.section_id] = actual.get(r.section_id, 0) + 1
+        assert {sid: n for sid, n in store.lazy.resident.items() if n} == actual
+
+    store.materialize()
+    check()
+
+    m0, m1, m2, m3 = store.project.modules
+    assert store.delete_module_range(m0, store.module_ranges(m0)[0])
+    check()
+    rng = [r for r in store.module_ranges(m1) if r.section_id == 1][0]
+    store.update_module_range(m1, rng, 2, 0x1F00, 0x1F80)   # into another section
+    check()
+    store.delete_module(m2)
+    check()
+    for _ in range(3):
+        store.history.seal()
+        store.undo()
+        check()
+    assert store.lazy.resident[1] == 4
@@ -0,0 +1,54 @@
+import json
+
+import lookup_server
+from lookup_server import INTERNAL_ERROR, INVALID_PARAMS, LookupServer
+from store import ProjectStore
+
+
+def make_server():
+    store = ProjectStore()
+    sec = store.add_section(".text", 0x1000, 0x2000)
+    mod = store.add_module("a")
+    store.set_module_range(mod.id, sec.id, 0x1100, 0x1200)
+    server = LookupServer(port=0)
+    server.publish(store)
+    return store, server
+
+
+def call(server, method, params, req_id=1):
+    return json.loads(server.handle_rpc(json.dumps(
+        {"jsonrpc": "2.0", "id": req_id, "method": method, "params": params})))
+
+
+def test_resolve():
+    _, server = make_server()
+    result = call(server, "resolve", ["0x1104"])["result"]
+    assert result["section"]["name"] == ".text"
+    assert result["modules"] == [{"name": "a", "start": 0x1100, "end": 0x1200, "size": 0x100, "offset": 4}]
+
+
+def test_handler_errors_are_answered(monkeypatch):
+    _, server = make_server()
+    assert call(server, "resolve", [True])["error"]["code"] == INVALID_PARAMS
+    assert call(server, "resolve", [])["error"]["code"] == INVALID_PARAMS
+
+    def broken(self, snap):
+        raise KeyError("boom")
+    monkeypatch.setattr(LookupServer, "rpc_version", broken)
+    response = call(server, "version", [])
+    assert response["id"] == 1
+    assert response["error"]["code"] == INTERNAL_ERROR
+
+
+def test_publish_only_after_a_change(monkeypatch):
+    store, server = make_server()
+    monkeypatch.setattr(lookup_server, "MIN_PUBLISH_INTERVAL", 0.0)
+    snap = server.snapshot
+
+    server.publish_if_due(store)
+    assert server.snapshot is snap
+
+    store.add_module("b")
+    server.publish_if_due(store)
+    assert server.snapshot is not snap
+    assert call(server, "version", [])["result"] == store.version
@@ -0,0 +1,66 @@
+import random
+
+import pytest
+
+from report_cache import ReportCache, _sort_key
+from store import ProjectStore
+
+
+@pytest.fixture
+def store():
+    rng = random.Random(7)
+    s = ProjectStore()
+    s.set_executable_range(0x1000, 0x20000)
+    secs = [s.add_section(f"s{i}", 0x1000 + 0x4000 * i, 0x1000 + 0x4000 * i + rng.randrange(0x1000, 0x3000))
+            for i in range(4)]
+    for i in range(80):
+        sec = rng.choice(secs)
+        a = rng.randrange(sec.start, sec.end)
+        s.set_module_range(s.add_module(f"m{i}").id, sec.id, a, min(sec.end, a + rng.randrange(1, 0x300)))
+    return s
+
+
+@pytest.mark.parametrize("kind", ["section_holes", "module_holes", "overlaps"])
+@pytest.mark.parametrize("by", ["size", "address", "section"])
+@pytest.mark.parametrize("descending", [True, False])
+def test_page_matches_sorted(store, kind, by, descending):
+    cache = ReportCache()
+    items = cache.get(store, kind)
+    expected = sorted(items, key=_sort_key(kind, by, store.project), reverse=descending)
+    for offset, limit in ((0, 5), (0, 1000), (3, 7), (len(items), 10)):
+        total, page = cache.page(store, kind, by, descending, offset, limit)
+        assert total == len(items)
+        assert page == expected[offset:offset + limit]
+
+
+@pytest.mark.parametrize("kind", ["module_holes", "overlaps"])
+def test_top_matches_sorted(store, kind):
+    cache = ReportCache()
+    items = cache.get(store, kind)
+    assert items
+    expected = sorted(items, key=_sort_key(kind, "size", store.project), reverse=True)
+    for n in (1, 5, len(items) + 3):
+        assert cache.top(store, kind, n) == expected[:n]
+
+
+def test_recomputed_on_new_version(store):
+    cache = ReportCache()
+    before = cache.get(store, "module_holes")
+    assert cache.get(store, "module_holes") is before   # same version: cached
+    cache.page(store, "module_holes", "address")
+
+    sec = next(iter(store.project.sections.values()))
+    store.set_module_range(store.add_module("new").id, sec.id, sec.start, sec.end)
+    after = cache.get(store, "module_holes")
+    assert after is not before
+    assert not [h for h in after if h[0] == sec.name]
+    assert cache.page(store, "module_holes", "address", False, 0, 1000)[1] == \
+        sorted(after, key=lambda h: h[1])
+
+
+def test_unknown_kind_and_sort(store):
+    cache = ReportCache()
+    with pytest.raises(ValueError):
+        cache.get(store, "nope")
+    with pytest.raises(ValueError):
+        cache.page(store, "module_holes", by="nope")
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from rwlock import RWLock
+
+
+def test_reentrant():
+    lock = RWLock()
+    with lock.write("outer"):
+        with lock.write("inner"):
+            with lock.read():   # a writer may read
+                pass
+    with lock.read():
+        with lock.read():
+            pass
+    assert lock.stats["write"].acquired == 1
+    assert lock.stats["read"].acquired == 1   # only outermost acquisitions count
+
+
+def test_read_cannot_upgrade():
+    lock = RWLock()
+    with lock.read():
+        with pytest.raises(RuntimeError):
+            with lock.write("upgrade"):
+                pass
+    with lock.write():   # the failed upgrade left nothing held
+        pass
+
+
+def test_readers_share_writer_excludes():
+    lock = RWLock()
+    inside, peak, active = threading.Barrier(3), [0], [0]
+    guard = threading.Lock()
+
+    def reader():
+        with lock.read():
+            with guard:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            inside.wait(timeout=5)   # all three readers hold the lock at once
+            with guard:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=reader) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    assert peak[0] == 3
+
+    log = []
+
+    def writer(name):
+        with lock.write(name):
+            log.append(("in", name))
+            time.sleep(0.01)
+            log.append(("out", name))
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=5)
+    # never two writers inside: every "in" is followed by its own "out"
+    assert [e[0] for e in log] == ["in", "out"] * 4
+    assert all(log[i][1] == log[i + 1][1] for i in range(0, 8, 2))
+
+
+def test_writer_waits_for_reader_and_is_counted():
+    lock = RWLock()
+    reading, done = threading.Event(), []
+
+    def reader():
+        with lock.read("slow read"):
+            reading.set()
+            time.sleep(0.05)
+            done.append("read")
+
+    t = threading.Thread(target=reader)
+    t.start()
+    reading.wait(timeout=5)
+    with lock.write("edit"):
+        done.append("write")
+    t.join(timeout=5)
+
+    assert done == ["read", "write"]
+    w, r = lock.stats["write"], lock.stats["read"]
+    assert (w.acquired, w.contended) == (1, 1)
+    assert w.wait_total >= 0.01 and w.wait_max == w.wait_total
+    assert r.hold_max >= 0.04 and r.hold_max_by == "slow read"
+    assert "1 taken, 1 waited" in w.summary()
@@ -0,0 +1,58 @@
+from models import SymbolTable
+from symbol_file import load_symbols, save_symbols
+
+
+def _table(symbols):
+    table = SymbolTable()
+    for section_id, name, start, size in symbols:
+        table.add(section_id, name, start, size)
+    return table
+
+
+def test_round_trip_out_of_order(tmp_path):
+    # added out of order, so the section is sorted (and its arrays rebuilt) before saving
+    table = _table([(1, "a", 0x9000, 0x10), (1, "d", 0x9100, 0x10),
+                    (1, "b", 0x8000, 0x10), (1, "c", 0x9200, 0x10),
+                    (2, "e", 0x20000, 0)])
+    assert table.resolve(1, 0x9102) == ("d", 2)
+
+    filename = tmp_path / "project.symbols"
+    save_symbols(table, str(filename))
+    loaded = load_symbols(str(filename))
+
+    assert len(loaded) == len(table)
+    for section_id, addr in ((1, 0x9102), (1, 0x8000), (1, 0x920F), (1, 0x9210), (2, 0x20123)):
+        assert loaded.resolve(section_id, addr) == table.resolve(section_id, addr)
+    assert loaded.resolve(1, 0x9210) is None
+    assert loaded.resolve(2, 0x20123) == ("e", 0x123)
+
+
+def test_sort_keeps_typecodes():
+    table = _table([(1, "b", 0x20, 4), (1, "a", 0x10, 4)])
+    syms = table.sections[1]
+    before = (syms.starts.typecode, syms.sizes.typecode, syms.names.typecode)
+    syms.sort()
+    assert (syms.starts.typecode, syms.sizes.typecode, syms.names.typecode) == before
+    assert list(syms.starts) == [0x10, 0x20]
+
+
+def test_interned_names_survive(tmp_path):
+    table = _table([(1, "same", 0x10, 4), (3, "same", 0x30, 4), (1, "", 0x20, 4)])
+    filename = tmp_path / "project.symbols"
+    save_symbols(table, str(filename))
+    loaded = load_symbols(str(filename))
+    assert loaded.strings == table.strings
+    assert loaded.resolve(3, 0x31) == ("same", 1)
+
+
+def test_only_empty_name(tmp_path):
+    # a string table of just "" writes no string bytes at all
+    table = _table([(1, "", 0x10, 4), (2, "", 0x40, 0)])
+    assert table.strings == [""]
+
+    filename = tmp_path / "project.symbols"
+    save_symbols(table, str(filename))
+    loaded = load_symbols(str(filename))
+    assert loaded.strings == [""]
+    assert loaded.resolve(1, 0x12) == ("", 2)
+    assert loaded.resolve(2, 0x48) == ("", 8)
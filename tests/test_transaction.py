@@ -0,0 +1,105 @@
+import pytest
+
+from store import ProjectStore
+
+
+def state(store):
+    p = store.project
+    return ([(s.id, s.name, s.start, s.end, s.locked) for s in p.sections.values()],
+            [(m.id, m.name, m.number, [(r.section_id, r.start, r.end, r.locked) for r in m.ranges])
+             for m in p.modules.values()],
+            (p.next_section_id, p.next_module_id))
+
+
+@pytest.fixture
+def store():
+    s = ProjectStore()
+    text = s.add_section(".text", 0x1000, 0x2000)
+    s.add_section(".data", 0x2000, 0x3000)
+    a = s.add_module("a")
+    s.add_module("b")
+    s.set_module_range(a.id, text.id, 0x1000, 0x1100)
+    s.history.seal()
+    return s
+
+
+def test_rollback_on_validation_error(store):
+    before = state(store)
+    with pytest.raises(ValueError):
+        with store.transaction():
+            store.add_module("c", before_module_id=1)
+            store.update_section(1, ".text", 0x1000, 0x1800)
+            store.set_module_range(2, 1, 0x1700, 0x1900)   # sticks out of the shrunk .text
+    assert state(store) == before
+    assert store.history.pending == []
+
+
+def test_rollback_on_exception(store):
+    before = state(store)
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.delete_module(1)
+            store.delete_section(2)
+            raise RuntimeError("abort")
+    assert state(store) == before
+
+
+def test_commit_is_one_undo_step(store):
+    before = state(store)
+    with store.transaction():
+        for i in range(5):
+            store.add_module(f"n{i}", before_module_id=1)
+        with store.transaction():   # joins the outer one
+            store.delete_module(2)
+    after = state(store)
+    assert [m[2] for m in after[1]] == list(range(1, len(after[1]) + 1))
+
+    assert store.undo() is not None
+    assert state(store) == before
+    store.redo()
+    assert state(store) == after
+
+
+def test_delete_section_keeps_symbols_for_undo(store, tmp_path):
+    store.save(str(tmp_path / "project.json"))
+    store.add_symbols([("f", 0x1010, 0x10), ("g", 0x2010, 0x10)])
+    store.history.seal()
+
+    store.delete_section(1)
+    assert store.resolve_symbol(0x1014) is None
+    store.undo()
+    assert store.resolve_symbol(0x1014) == ("f", 4)
+
+    with pytest.raises(RuntimeError):
+        with store.transaction():
+            store.delete_section(2)
+            raise RuntimeError("abort")
+    assert store.resolve_symbol(0x2018) == ("g", 8)
+
+
+def test_old_problems_do_not_fail_unrelated_edits(store):
+    # .text shrinks under a's range: broken, but not this transaction's doing
+    store.update_section(1, ".text", 0x1000, 0x1080)
+    planned, errors = store.plan_range_import("2000 2100 b")
+    assert store.apply_range_import(planned) == 1
+
+    # touching the broken range itself still has to leave it valid
+    with pytest.raises(ValueError, match="outside section"):
+        with store.transaction():
+            store.update_module_range(1, store.project.modules[1].ranges[0], 1, 0x1010, 0x1100)
+
+
+def test_module_names_unique_with_and_without_transaction(store):
+    store.add_module("c")
+    with pytest.raises(ValueError, match="already exists"):
+        store.update_module(2, "C")
+    with pytest.raises(ValueError, match="already exists"):
+        with store.transaction():
+            store.update_module(2, "C")
+    with pytest.raises(ValueError, match="already exists"):
+        store.add_module("A")
+    with pytest.raises(ValueError, match="empty"):
+        store.add_module("  ")
+
+    store.update_module(2, "B")   # its own name in another case is fine
+    assert [m.name for m in store.project.modules.values()] == ["a", "B", "c"]
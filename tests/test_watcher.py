@@ -0,0 +1,30 @@
+import os
+
+from store import ProjectStore
+from watcher import ProjectFileWatcher
+
+
+def test_baseline_taken_at_first_poll(tmp_path):
+    filename = str(tmp_path / "project.json")
+    store = ProjectStore()
+    store.add_section(".text", 0x1000, 0x2000)
+    store.save(filename)
+
+    watcher = ProjectFileWatcher(filename)
+    assert watcher.hash is None   # nothing read on the caller's thread
+    assert watcher.poll() is None
+    assert watcher.hash is not None
+
+    # same content written again: not a change
+    os.utime(filename, ns=(1, 1))
+    assert watcher.poll() is None
+
+    store.add_section(".data", 0x2000, 0x3000)
+    store.save(filename)
+    project = watcher.poll()
+    assert [s.name for s in project.sections.values()] == [".text", ".data"]
+
+    store.add_section(".bss", 0x3000, 0x4000)
+    store.save(filename)
+    watcher.mark_saved()   # our own write
+    assert watcher.poll() is None
@@ -0,0 +1,42 @@
+import json
+import os
+
+from store import ProjectStore
+from workspace import Workspace
+
+
+def make_build(filename, offset):
+    store = ProjectStore()
+    sec = store.add_section(".text", 0x1000 + offset, 0x2000 + offset)
+    mod = store.add_module("a")
+    store.set_module_range(mod.id, sec.id, 0x1100 + offset, 0x1200 + offset)
+    store.save(str(filename))
+
+
+def test_save_and_load_from_other_folders(tmp_path, monkeypatch):
+    (tmp_path / "builds").mkdir()
+    (tmp_path / "ws").mkdir()
+    (tmp_path / "elsewhere").mkdir()
+
+    # builds named relative to the folder the workspace is saved from
+    monkeypatch.chdir(tmp_path / "builds")
+    make_build("old.json", 0)
+    make_build("new.json", 0x40)
+    ws = Workspace()
+    ws.load_build("old", "old.json")
+    ws.load_build("new", "new.json")
+    ws.add_anchor("old", "new", 0x1100, 0x1140)
+    ws.save(str(tmp_path / "ws" / "builds.workspace"))
+
+    saved = json.loads((tmp_path / "ws" / "builds.workspace").read_text())
+    assert saved["builds"]["old"] == os.path.join("..", "builds", "old.json")
+
+    monkeypatch.chdir(tmp_path / "elsewhere")
+    loaded = Workspace.load(os.path.join("..", "ws", "builds.workspace"))
+    assert set(loaded.builds) == {"old", "new"}
+    assert loaded.anchors[("old", "new")] == [(0x1100, 0x1140)]
+    assert list(loaded.builds["new"].project.sections.values())[0].start == 0x1040
+
+    # and saving the loaded one again keeps the same relative paths
+    loaded.save(os.path.join("..", "ws", "again.workspace"))
+    assert json.loads((tmp_path / "ws" / "again.workspace").read_text())["builds"] == saved["builds"]
@@ -0,0 +1,88 @@
+# ops that can move section bounds (or the executable range around them)
+GEOMETRY_OPS = ("project_set", "section_put", "section_set")
+
+
+class Transaction:
+    """Journal of one ProjectStore.transaction(): inverse ops + what was touched."""
+
+    def __init__(self):
+        self.undo = []
+        self.sections = set()
+        self.modules = set()
+        self.ranges = set()      # (module id, section id, start, end) added or moved
+        self.sections_moved = False
+
+    def record(self, op, inverse, sections, modules):
+        name, args = op
+        self.undo.append(inverse)
+        self.sections.update(sections)
+        self.modules.update(modules)
+        if name in GEOMETRY_OPS:
+            self.sections_moved = True
+
+        if name == "range_add":
+            self.ranges.add(tuple(args[:4]))
+        elif name == "range_set" and set(args[2]) - {"locked"}:
+            self.ranges.add((args[0], *inverse[1][1]))   # the inverse holds the new key
+        elif name == "module_put":
+            self.ranges.update((args[0], *r[:3]) for r in args[2])
+
+
+# =============================================================
+# COMMIT-TIME VALIDATION (one sorted pass each)
+# =============================================================
+
+def check_sections(project):
+    """Sections are non-empty, inside the executable range and disjoint."""
+    secs = sorted(project.sections.values(), key=lambda s: s.start)
+    has_exe = project.exe_start is not None and project.exe_end is not None
+
+    prev = None
+    for sec in secs:
+        if sec.start >= sec.end:
+            raise ValueError(f"Section '{sec.name}': start must be < end.")
+        if has_exe and (sec.start < project.exe_start or sec.end > project.exe_end):
+            raise ValueError(f"Section '{sec.name}' must lie inside executable range.")
+        if prev is not None and sec.start < prev.end:
+            raise ValueError(f"Section '{sec.name}' overlaps existing section '{prev.name}'.")
+        prev = sec
+
+
+def check_ranges(project, ranges):
+    """The given (module id, section id, start, end) ranges are non-empty,
+    inside their section and their module's only range in it.
+
+    Only what a transaction added or moved is checked, so problems that were
+    there before (a section shrunk under a range) do not fail an unrelated
+    edit; the integrity check reports those. Ranges removed again, or whose
+    module or section is gone, are skipped.
+    """
+    for mod_id, sid, start, end in sorted(ranges, key=lambda t: (t[2], t[3], t[0])):
+        mod, sec = project.modules.get(mod_id), project.sections.get(sid)
+        if mod is None or sec is None:
+            continue
+        mine = [r for r in mod.ranges if r.section_id == sid]
+        if not any(r.start == start and r.end == end for r in mine):
+            continue
+        if start >= end:
+            raise ValueError(f"Module '{mod.name}': range start must be < end.")
+        if not (sec.start <= start and end <= sec.end):
+            raise ValueError(f"Module '{mod.name}': range 0x{start:X}-0x{end:X} "
+                             f"outside section '{sec.name}'.")
+        if len(mine) > 1:
+            raise ValueError(f"Module '{mod.name}' already has a range in section '{sec.name}'.")
+
+
+def check_module_names(project, module_ids):
+    """Touched modules have non-empty names unique without regard to case."""
+    names = sorted((m.name.lower(), m.id) for m in project.modules.values())
+    touched = set(module_ids)
+
+    for (a, a_id), (b, b_id) in zip(names, names[1:]):
+        if a == b and (a_id in touched or b_id in touched):
+            raise ValueError(f"Module '{project.modules[b_id].name}' already exists.")
+
+    for mid in touched:
+        mod = project.modules.get(mid)
+        if mod is not None and not mod.name.strip():
+            raise ValueError("Module name cannot be empty.")
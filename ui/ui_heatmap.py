@@ -0,0 +1,67 @@
+import dearpygui.dearpygui as dpg
+import numpy as np
+
+# ============================================================
+# HEAT COLORS (per column of a byte_map.ByteMap summary)
+# ============================================================
+CC_COLOR    = (255,150,40,255)    # mostly 0xCC: int3 padding between functions
+ZERO_COLOR  = (20,20,20,255)      # mostly zeros: alignment / bss
+NO_EXE_TEXT = (160,160,160,255)
+
+# entropy (bits per byte) -> color, linear between stops
+_STOPS = ((0.0, (50,80,50)), (4.0, (70,170,90)), (6.0, (70,140,255)), (7.5, (230,80,230)))
+
+LEGEND = "Bytes: green data, blue code, magenta packed, orange 0xCC, black zeros"
+
+
+def heat_color(entropy, zero, cc):
+    if cc >= 0.5:
+        return CC_COLOR
+    if zero >= 0.5:
+        return ZERO_COLOR
+    for (e0, c0), (e1, c1) in zip(_STOPS, _STOPS[1:]):
+        if entropy <= e1:
+            t = max(0.0, (entropy - e0) / (e1 - e0))
+            return tuple(int(a + (b - a) * t) for a, b in zip(c0, c1)) + (255,)
+    return _STOPS[-1][1] + (255,)
+
+
+def draw_heat_strip(drawlist, byte_map, start, end, x0, x1, y0, y1, px=2):
+    """Fill [x0, x1) of drawlist with the bytes of [start, end), px pixels per column.
+
+    Neighbouring columns of one color are drawn as one rectangle.
+    """
+    columns = max(1, int((x1 - x0) // px))
+    entropy, zero, cc = byte_map.summary(start, end, columns)
+    w = (x1 - x0) / columns
+
+    run_start, run_color = None, None
+    for i in range(columns + 1):
+        color = None
+        if i < columns and not np.isnan(entropy[i]):
+            color = heat_color(float(entropy[i]), float(zero[i]), float(cc[i]))
+        if color != run_color:
+            if run_color is not None:
+                dpg.draw_rectangle((x0 + run_start * w, y0), (x0 + i * w, y1),
+                                   color=(0,0,0,0), fill=run_color, parent=drawlist)
+            run_start, run_color = i, color
+
+
+def draw_heat_row(drawlist, store, start, end, x0, x1, y0, y1):
+    """Clear drawlist and draw the heat strip of [start, end) into it, or a
+    note why it cannot yet. A byte map still being built is announced by
+    EXE_DATA_READY ("byte map"); callers redraw then."""
+    dpg.delete_item(drawlist, children_only=True)
+    if not store.project.exe_path:
+        dpg.draw_text((x0, y0), "Set the executable file (Sections > Set Executable Range) for a byte heatmap",
+                      color=NO_EXE_TEXT, parent=drawlist)
+        return
+    try:
+        byte_map = store.byte_map()
+    except ValueError as e:
+        dpg.draw_text((x0, y0), str(e), color=NO_EXE_TEXT, parent=drawlist)
+        return
+    if byte_map is None:
+        dpg.draw_text((x0, y0), "Scanning executable...", color=NO_EXE_TEXT, parent=drawlist)
+        return
+    draw_heat_strip(drawlist, byte_map, start, end, x0, x1, y0, y1)
@@ -1,16 +1,24 @@
 import dearpygui.dearpygui as dpg
+import events
+from integrity import section_label
 from models import ModuleRange
+from ui.ui_theme import ROW_HEIGHT, highlight_row
 from ui.ui_utils import parse_hex
 
 class ModulesNyNameUI:
-    def __init__(self, store, change_callback):
+    def __init__(self, store):
         self.store = store
-        self.on_change = change_callback
         self.selected_module_id = None
+        self.shown_module_id = None   # module whose ranges are in the table
+        self.shown_sections = set()   # sections named in the range table
+        self.shown_ranges = []        # ranges in table row order
+        self.highlighted_row = None
+        self.tab_id = None
 
         # POPUP INTERNALS
         self.module_popup_id            = "module_popup"
         self.range_popup_id             = "range_popup"
+        self.bulk_popup_id              = "bulk_range_popup"
         self.error_popup_id             = "module_error_popup"
         self.last_range_module_name     = ""
 
@@ -19,11 +27,18 @@ class ModulesNyNameUI:
         self.range_start_input   = None
         self.range_end_input     = None
 
+        self.bulk_text_input     = None
+        self.bulk_table_id       = None
+        self.bulk_status_id      = None
+        self.bulk_plan           = []
+
         self.editing_new_module  = False
         self.editing_range_old_sec = None  # None = adding new
 
         # THEMES -----------------------------
         self.locked_text_theme = self._create_locked_text_theme()
+        self.error_theme = self._create_text_theme((255, 110, 110, 255))
+        self.warning_theme = self._create_text_theme((255, 255, 128, 255))
 
     # ========================================================= THEMES
 
@@ -33,12 +48,22 @@ class ModulesNyNameUI:
                 dpg.add_theme_color(dpg.mvThemeCol_Text, (0, 200, 0, 255))
         return t
 
+    def _create_text_theme(self, color):
+        with dpg.theme() as t:
+            with dpg.theme_component(dpg.mvText):
+                dpg.add_theme_color(dpg.mvThemeCol_Text, color)
+        return t
+
     # ========================================================= UI BUILD
 
     def draw(self, parent):
+        # only the tab itself; build() fills it the first time it is shown
+        self.tab_id = dpg.add_tab(label="Modules by Name", parent=parent)
+
+    def build(self):
         self._create_popups()
 
-        with dpg.tab(label="Modules by Name", parent=parent):
+        with dpg.group(parent=self.tab_id):
 
             with dpg.group(horizontal=True):
                 dpg.add_button(label="Add",    callback=self._add_module_clicked)
@@ -54,15 +79,20 @@ class ModulesNyNameUI:
                 # ---------------- LEFT (Modules)
                 with dpg.child_window(width=240, height=500):
                     dpg.add_text("Modules")
+                    self.filter_input_id = dpg.add_input_text(
+                        hint="Filter...", width=-1,
+                        callback=lambda s, a, u: self._refresh_module_list()
+                    )
                     self.module_list_id = dpg.add_listbox(
                         items=[],
-                        num_items=22,  # fills entire height available
+                        num_items=20,  # fills entire height available
                         width=-1,
                         callback=self._select_module
                     )
 
                 # ---------------- RIGHT (Ranges)
-                with dpg.child_window(width=-1, height=500):
+                with dpg.child_window(width=-1, height=500) as w:
+                    self.range_window_id = w
                     dpg.add_text("Ranges")
 
                     with dpg.table(header_row=True, resizable=True,
@@ -72,17 +102,28 @@ class ModulesNyNameUI:
                         dpg.add_table_column(label="Start")
                         dpg.add_table_column(label="End")
                         dpg.add_table_column(label="Size")
+                        dpg.add_table_column(label="Hash")
                         dpg.add_table_column(label="Locked")     # <<< NEW
                         dpg.add_table_column(label="Edit")
                         dpg.add_table_column(label="Delete")
 
                     dpg.add_spacer(height=6)
-                    dpg.add_button(label="Add Range",
-                                   callback=self._add_range_clicked)
+                    with dpg.group(horizontal=True):
+                        dpg.add_button(label="Add Range",
+                                       callback=self._add_range_clicked)
+                        dpg.add_button(label="Bulk Paste",
+                                       callback=lambda: self._open_bulk_popup(""))
 
         with dpg.handler_registry(tag="global_handlers"):
             dpg.add_key_press_handler(dpg.mvKey_V, callback=self._handle_paste_request)
 
+        self.store.events.subscribe(self._on_store_events,
+                                    events.MODULE_EVENTS + (events.RANGE_CHANGED,
+                                                            events.SECTION_UPDATED,
+                                                            events.SECTION_DELETED,
+                                                            events.EXE_RANGE_CHANGED,
+                                                            events.EXE_DATA_READY,
+                                                            events.PROJECT_RELOADED))
         self.refresh_modules()
 
     # ========================================================= POPUPS
@@ -111,6 +152,29 @@ class ModulesNyNameUI:
                 dpg.add_button(label="Save",   callback=self._save_range)
                 dpg.add_button(label="Cancel", callback=lambda s,a,u: dpg.hide_item(self.range_popup_id))
 
+        # BULK PASTE popup ---------------------------------------
+        with dpg.window(tag=self.bulk_popup_id, modal=False,
+                        show=False, autosize=True, label="Bulk Paste Ranges"):
+            dpg.add_text("One 'start end [module]' per line (hex); no module = selected module.")
+            self.bulk_text_input = dpg.add_input_text(multiline=True, width=600, height=150,
+                                                      callback=self._preview_bulk)
+            self.bulk_status_id = dpg.add_text("")
+
+            with dpg.child_window(width=600, height=220):
+                with dpg.table(header_row=True, resizable=True,
+                               policy=dpg.mvTable_SizingStretchProp) as t:
+                    self.bulk_table_id = t
+                    dpg.add_table_column(label="Line")
+                    dpg.add_table_column(label="Start")
+                    dpg.add_table_column(label="End")
+                    dpg.add_table_column(label="Module")
+                    dpg.add_table_column(label="Section")
+                    dpg.add_table_column(label="Status")
+
+            with dpg.group(horizontal=True):
+                dpg.add_button(label="Import", callback=self._import_bulk)
+                dpg.add_button(label="Cancel", callback=lambda s,a,u: dpg.hide_item(self.bulk_popup_id))
+
         # ERROR popup --------------------------------------------
         with dpg.window(tag=self.error_popup_id, modal=True,
                         autosize=True, show=False, label="Error"):
@@ -161,21 +225,43 @@ class ModulesNyNameUI:
     # ========================================================= MODULE MGMT
 
     def refresh_modules(self):
-        modules = list(self.store.project.modules.values())
+        self._refresh_module_list()
+        self.refresh_ranges()
+
+    def _refresh_module_list(self):
+        query = dpg.get_value(self.filter_input_id).strip()
+        if query:
+            modules = self.store.search_modules(query)
+        else:
+            modules = list(self.store.project.modules.values())
         names = [m.name for m in modules]
         dpg.configure_item(self.module_list_id, items=names)
 
         # auto-select something if nothing is selected
         if self.selected_module_id not in self.store.project.modules:
+            self.selected_module_id = None
             if names:
                 first = modules[0]
                 self.selected_module_id = first.id
                 dpg.set_value(self.module_list_id, first.name)
         elif self.selected_module_id is not None:
+            # the selection stays even when the filter hides it
             selected = self.store.project.modules[self.selected_module_id]
             dpg.set_value(self.module_list_id, selected.name)
 
-        self.refresh_ranges()
+    def _on_store_events(self, batch):
+        if events.PROJECT_RELOADED in batch:
+            return self.refresh_modules()
+
+        if batch.kinds & set(events.MODULE_EVENTS):
+            self._refresh_module_list()
+
+        if (self.selected_module_id != self.shown_module_id
+                or self.selected_module_id in batch.ids(events.RANGE_CHANGED)
+                or self.shown_sections & batch.ids(events.SECTION_UPDATED, events.SECTION_DELETED)
+                or events.EXE_RANGE_CHANGED in batch
+                or "hashes" in batch.ids(events.EXE_DATA_READY)):
+            self.refresh_ranges()
 
     def _select_module(self, s, name, u):
         # listbox returns name (DPG 2.x)
@@ -200,9 +286,6 @@ class ModulesNyNameUI:
     def _delete_module_clicked(self):
         if not self.selected_module_id: return self._err("No module selected")
         self.store.delete_module(self.selected_module_id)
-        self.selected_module_id = None
-        self.on_change()
-        self.refresh_modules()
 
     def _move_module_up_clicked(self):
         self._move_selected_module(-1)
@@ -214,9 +297,7 @@ class ModulesNyNameUI:
         if not self.selected_module_id:
             return self._err("No module selected")
 
-        if self.store.move_module(self.selected_module_id, offset):
-            self.on_change()
-            self.refresh_modules()
+        self.store.move_module(self.selected_module_id, offset)
 
     def _save_module(self, sender=None, app_data=None, user_data=None):
         name = dpg.get_value(self.module_name_input).strip()
@@ -239,32 +320,38 @@ class ModulesNyNameUI:
             self.store.update_module(self.selected_module_id, name)
 
         # ----- finalize -----
-        self.on_change()
         dpg.hide_item(self.module_popup_id)
-        self.refresh_modules()
 
     # ========================================================= RANGES
 
     def refresh_ranges(self):
+        if self.highlighted_row is not None:
+            dpg.unhighlight_table_row(self.range_table_id, self.highlighted_row)
+            self.highlighted_row = None
+
         rows = dpg.get_item_children(self.range_table_id).get(1,[])
         for r in rows: dpg.delete_item(r)
+        self.shown_module_id = self.selected_module_id
+        self.shown_sections = set()
+        self.shown_ranges = []
 
         if not self.selected_module_id: return
 
-        mod = self.store.project.modules[self.selected_module_id]
-
         # <<<<<<<<<<<<<<<<<<<<<< SORT BY START >>>>>>>>>>>>>>>>>>>>>>
-        ranges = sorted(mod.ranges, key=lambda r: r.start)
+        ranges = sorted(self.store.module_ranges(self.selected_module_id), key=lambda r: r.start)
+        self.shown_sections = {r.section_id for r in ranges}
+        self.shown_ranges = ranges
+        hashes = self._range_hashes(ranges)
 
         for rng in ranges:
-            sec = self.store.project.sections[rng.section_id]
             with dpg.table_row(parent=self.range_table_id) as row:
 
-                # name + values
-                txt_sec = dpg.add_text(sec.name)
+                # name + values (orphaned ranges stay listed, see Reports)
+                txt_sec = dpg.add_text(section_label(self.store.project, rng.section_id))
                 txt_start = dpg.add_text(f"0x{rng.start:X}")
                 txt_end = dpg.add_text(f"0x{rng.end:X}")
                 txt_size = dpg.add_text(f"0x{rng.size:X}")
+                txt_hash = dpg.add_text(hashes.get((rng.start, rng.end), "")[:12])
 
                 # LOCK TOGGLE
                 dpg.add_checkbox(label="", default_value=rng.locked,
@@ -279,7 +366,7 @@ class ModulesNyNameUI:
                                callback=self._delete_range_clicked)
 
                 # color text if locked
-                text_items = [txt_sec, txt_start, txt_end, txt_size]
+                text_items = [txt_sec, txt_start, txt_end, txt_size, txt_hash]
                 if rng.locked:
                     for item in text_items:
                         dpg.bind_item_theme(item, self.locked_text_theme)
@@ -288,14 +375,42 @@ class ModulesNyNameUI:
                     for item in text_items:
                         dpg.bind_item_theme(item, 0)
 
+    def _range_hashes(self, ranges):
+        """Relocation-masked content hashes (same bytes in another build, same
+        hash) by (start, end), if the project has an executable. Only what the
+        store has cached; the rest is hashed in the background and the table
+        redrawn on EXE_DATA_READY."""
+        if not self.store.project.exe_path or not ranges:
+            return {}
+        try:
+            return self.store.cached_hashes([(r.start, r.end) for r in ranges], mask_relocations=True)
+        except (ValueError, OSError):
+            return {}
+
+    # ------------------------- JUMP (from Where?)
+
+    def show_range(self, mod_id, rng):
+        """Switch to this tab with mod_id selected and rng's row highlighted."""
+        self.selected_module_id = mod_id
+        dpg.set_value(self.filter_input_id, "")
+        self._refresh_module_list()
+        self.refresh_ranges()
+        dpg.set_value(dpg.get_item_parent(self.tab_id), self.tab_id)
+
+        for i, r in enumerate(self.shown_ranges):
+            if r is rng:
+                self.highlighted_row = highlight_row(self.range_table_id, i)
+                dpg.set_y_scroll(self.range_window_id, i * ROW_HEIGHT)
+                return
+
     # ------------------------- ADD RANGE
 
     def _add_range_clicked(self):
         if not self.selected_module_id: return self._err("Select module first")
-        mod = self.store.project.modules[self.selected_module_id]
+        mod_ranges = self.store.module_ranges(self.selected_module_id)
 
         # Filter sections that don't have range for this module
-        available_secs = [s for s in self.store.project.sections.values() if not any(r.section_id == s.id for r in mod.ranges)]
+        available_secs = [s for s in self.store.project.sections.values() if not any(r.section_id == s.id for r in mod_ranges)]
         if not available_secs: return self._err("Module already has ranges in all sections")
 
         sec_names = [s.name for s in available_secs]
@@ -330,11 +445,11 @@ class ModulesNyNameUI:
         sections = list(self.store.project.sections.values())
         sec_names = [s.name for s in sections]
 
-        # Find current section
-        sec = self.store.project.sections[rng.section_id]
+        # Find current section (gone for an orphaned range: pick a new one)
+        sec = self.store.project.sections.get(rng.section_id)
 
         dpg.configure_item(self.range_sec_combo, items=sec_names)
-        dpg.set_value(self.range_sec_combo, sec.name)
+        dpg.set_value(self.range_sec_combo, sec.name if sec else "")
         dpg.set_value(self.range_start_input, f"0x{rng.start:X}")
         dpg.set_value(self.range_end_input, f"0x{rng.end:X}")
         dpg.set_value(self.range_size_input, f"0x{rng.size:X}")
@@ -346,7 +461,8 @@ class ModulesNyNameUI:
 
     def _save_range(self):
         sec_name = dpg.get_value(self.range_sec_combo)
-        target = next(s for s in self.store.project.sections.values() if s.name==sec_name)
+        target = next((s for s in self.store.project.sections.values() if s.name==sec_name), None)
+        if target is None: return self._err("Pick a section")
 
         try:
             start = parse_hex(dpg.get_value(self.range_start_input))
@@ -363,24 +479,18 @@ class ModulesNyNameUI:
 
         # adding new
         if self.editing_range_old_sec is None:
-            for r in mod.ranges:
+            for r in self.store.module_ranges(mod.id):
                 if r.section_id == target.id:
                     return self._err("Module already has range in this section")
 
-            mod.ranges.append(ModuleRange(
-                section_id=target.id, start=start, end=end, locked=False
-            ))
+            self.store.set_module_range(mod.id, target.id, start, end)
 
         # editing existing
         else:
-            rng = next(r for r in mod.ranges if r.section_id == self.editing_range_old_sec)
-            rng.section_id = target.id
-            rng.start = start
-            rng.end = end
+            rng = next(r for r in self.store.module_ranges(mod.id) if r.section_id == self.editing_range_old_sec)
+            self.store.update_module_range(mod.id, rng, target.id, start, end)
 
-        self.on_change()
         dpg.hide_item(self.range_popup_id)
-        self.refresh_ranges()
 
     # ------------------- DELETE RANGE
 
@@ -388,22 +498,54 @@ class ModulesNyNameUI:
         if not self.selected_module_id or rng is None:
             return
 
-        mod = self.store.project.modules[self.selected_module_id]
-        try:
-            mod.ranges.remove(rng)
-        except ValueError:
-            # In case something got out of sync, bail quietly instead of crashing
-            return
-
-        self.on_change()
-        self.refresh_ranges()
+        # In case something got out of sync, bail quietly instead of crashing
+        self.store.delete_module_range(self.selected_module_id, rng)
 
     # ------------------- LOCK RANGE
 
     def _toggle_range_lock(self, s, new_state, rng):
-        rng.locked = bool(new_state)
-        self.on_change()
-        self.refresh_ranges()
+        self.store.set_range_lock(self.selected_module_id, rng, new_state)
+
+    # ------------------- BULK PASTE
+
+    def _open_bulk_popup(self, text):
+        dpg.set_value(self.bulk_text_input, text)
+        self._preview_bulk()
+        dpg.show_item(self.bulk_popup_id)
+
+    def _preview_bulk(self, sender=None, app_data=None, user_data=None):
+        for r in dpg.get_item_children(self.bulk_table_id).get(1,[]):
+            dpg.delete_item(r)
+
+        plan, errors = self.store.plan_range_import(dpg.get_value(self.bulk_text_input),
+                                                    default_module_id=self.selected_module_id)
+        self.bulk_plan = plan
+
+        rows = [(no, "", "", "", "", msg, self.error_theme) for no, msg in errors]
+        for e in plan:
+            status = e.error or e.warning or "ok"
+            theme = self.error_theme if e.error else (self.warning_theme if e.warning else 0)
+            rows.append((e.line, f"0x{e.start:X}", f"0x{e.end:X}", e.module, e.section, status, theme))
+        rows.sort(key=lambda row: row[0])
+
+        for row in rows:
+            with dpg.table_row(parent=self.bulk_table_id):
+                for cell in row[:-1]:
+                    dpg.bind_item_theme(dpg.add_text(str(cell)), row[-1])
+
+        good = sum(1 for e in plan if e.ok)
+        dpg.set_value(self.bulk_status_id,
+                      f"{good} range(s) ready, {len(plan) - good + len(errors)} line(s) rejected")
+
+    def _import_bulk(self, *args):
+        self._preview_bulk()   # the map may have changed since the preview
+        try:
+            added = self.store.apply_range_import(self.bulk_plan)
+        except ValueError as e:
+            return self._err(str(e))
+
+        print(f"[BULK] Imported {added} range(s)")
+        dpg.hide_item(self.bulk_popup_id)
 
     # ========================================================= UTIL
 
@@ -435,6 +577,11 @@ class ModulesNyNameUI:
         # Normalize whitespace and split
         parts = [p.strip() for p in text.replace("\r", "").replace("\n", " ").split(" ") if p.strip()]
 
+        # Several lines / values: hand over to bulk paste
+        if len(parts) > 2 and "\n" in text:
+            dpg.hide_item(self.range_popup_id)
+            return self._open_bulk_popup(text)
+
         # Expect exactly 2 values (start, end)
         if len(parts) != 2:
             return  # silently ignore anything else
@@ -1,12 +1,19 @@
 import dearpygui.dearpygui as dpg
-from models import ModuleRange
+import events
+from ui.ui_heatmap import draw_heat_row
+from ui.ui_theme import ROW_HEIGHT, highlight_row
 from ui.ui_utils import parse_hex
 
 class ModulesBySectionUI:
-    def __init__(self, store, change_callback):
+    def __init__(self, store):
         self.store = store
-        self.on_change = change_callback
         self.selected_section_id = None
+        self.shown_section_id = None   # section whose ranges are in the table
+        self.shown_modules = set()     # modules named in the range table
+        self.row_spans = []            # (start, end) of each table row, in order
+        self.highlighted_row = None
+        self.tab_id = None
+        self.heat_id = None
         self.last_selected_module_id = None
 
         # POPUP INTERNALS
@@ -18,6 +25,7 @@ class ModulesBySectionUI:
         self.range_end_input   = None
 
         self.editing_range = None  # the ModuleRange being edited
+        self.editing_range_mod_id = None  # its owner when editing started
 
         # THEMES -----------------------------
         self.locked_text_theme = self._create_locked_text_theme()
@@ -33,9 +41,13 @@ class ModulesBySectionUI:
     # ========================================================= UI BUILD
 
     def draw(self, parent):
+        # only the tab itself; build() fills it the first time it is shown
+        self.tab_id = dpg.add_tab(label="Modules by Section", parent=parent)
+
+    def build(self):
         self._create_popups()
 
-        with dpg.tab(label="Modules by Section", parent=parent):
+        with dpg.group(parent=self.tab_id):
 
             with dpg.group(horizontal=True):
 
@@ -50,8 +62,10 @@ class ModulesBySectionUI:
                     )
 
                 # ---------------- RIGHT (Ranges)
-                with dpg.child_window(width=-1, height=500):
+                with dpg.child_window(width=-1, height=500) as w:
+                    self.range_window_id = w
                     dpg.add_text("Ranges")
+                    self.heat_id = dpg.add_drawlist(width=620, height=22)
 
                     with dpg.table(header_row=True, resizable=True,
                                    policy=dpg.mvTable_SizingStretchProp) as t:
@@ -68,6 +82,10 @@ class ModulesBySectionUI:
                     dpg.add_button(label="Add Range",
                                    callback=self._add_range_clicked)
 
+        self.store.events.subscribe(self._on_store_events,
+                                    events.SECTION_EVENTS + events.MODULE_EVENTS
+                                    + (events.RANGE_CHANGED, events.EXE_RANGE_CHANGED,
+                                       events.EXE_DATA_READY, events.PROJECT_RELOADED))
         self.refresh_sections()
 
     # ========================================================= POPUPS
@@ -141,17 +159,39 @@ class ModulesBySectionUI:
     # ========================================================= SECTION MGMT
 
     def refresh_sections(self):
+        self._refresh_section_list()
+        self.refresh_ranges()
+
+    def _refresh_section_list(self):
         names = [s.name for s in self.store.project.sections.values()]
         dpg.configure_item(self.section_list_id, items=names)
 
         # auto-select something if nothing is selected
         if self.selected_section_id not in self.store.project.sections:
+            self.selected_section_id = None
             if names:
                 first = next(iter(self.store.project.sections.values()))
                 self.selected_section_id = first.id
                 dpg.set_value(self.section_list_id, first.name)
-
-        self.refresh_ranges()
+        elif self.selected_section_id is not None:
+            selected = self.store.project.sections[self.selected_section_id]
+            dpg.set_value(self.section_list_id, selected.name)
+
+    def _on_store_events(self, batch):
+        if events.PROJECT_RELOADED in batch:
+            return self.refresh_sections()
+
+        if batch.kinds & set(events.SECTION_EVENTS):
+            self._refresh_section_list()
+
+        # module renames/removals show up as names in the table
+        if (self.selected_section_id != self.shown_section_id
+                or self.selected_section_id in batch.sections()
+                or self.shown_modules & batch.ids(events.MODULE_UPDATED, events.MODULE_DELETED)):
+            self.refresh_ranges()
+        elif (events.EXE_RANGE_CHANGED in batch
+                or "byte map" in batch.ids(events.EXE_DATA_READY)):
+            self._refresh_heat()
 
     def _select_section(self, s, name, u):
         # listbox returns name
@@ -163,20 +203,33 @@ class ModulesBySectionUI:
 
     # ========================================================= RANGES
 
+    def _refresh_heat(self):
+        # the bytes under the selected section, at the table's own zoom
+        sec = self.store.project.sections.get(self.shown_section_id)
+        if sec is None:
+            dpg.delete_item(self.heat_id, children_only=True)
+            return
+        draw_heat_row(self.heat_id, self.store, sec.start, sec.end, 0, 600, 2, 20)
+
     def refresh_ranges(self):
+        if self.highlighted_row is not None:
+            dpg.unhighlight_table_row(self.range_table_id, self.highlighted_row)
+            self.highlighted_row = None
+
         rows = dpg.get_item_children(self.range_table_id).get(1,[])
         for r in rows: dpg.delete_item(r)
+        self.shown_section_id = self.selected_section_id
+        self.shown_modules = set()
+        self.row_spans = []
+        self._refresh_heat()
 
         if not self.selected_section_id: return
 
         sec = self.store.project.sections[self.selected_section_id]
 
         # Collect all ranges in this section, with their modules
-        ranges_with_modules = []
-        for mod in self.store.project.modules.values():
-            for rng in mod.ranges:
-                if rng.section_id == sec.id:
-                    ranges_with_modules.append((mod, rng))
+        ranges_with_modules = self.store.section_ranges(sec.id)
+        self.shown_modules = {mod.id for mod, rng in ranges_with_modules}
 
         # Sort ranges by start
         ranges_with_modules.sort(key=lambda x: x[1].start)
@@ -213,6 +266,7 @@ class ModulesBySectionUI:
         for item in items:
             if item[1] == 'range':
                 mod, rng = item[2], item[3]
+                self.row_spans.append((rng.start, rng.end))
                 with dpg.table_row(parent=self.range_table_id):
                     # module name + values
                     txt_mod = dpg.add_text(mod.name)
@@ -242,6 +296,7 @@ class ModulesBySectionUI:
                             dpg.bind_item_theme(item, 0)
             elif item[1] == 'gap':
                 gap_start, gap_end, gap_size = item[2], item[3], item[4]
+                self.row_spans.append((gap_start, gap_end))
                 with dpg.table_row(parent=self.range_table_id):
                     dpg.add_text("Gap")
                     dpg.add_text(f"0x{gap_start:X}")
@@ -251,6 +306,22 @@ class ModulesBySectionUI:
                     dpg.add_button(label="Add", user_data=gap_start, callback=self._add_range_for_gap)
                     dpg.add_text("")  # delete
 
+    # ------------------------- JUMP (from Where?)
+
+    def show_address(self, sec_id, addr):
+        """Switch to this tab with sec_id selected and the row at addr highlighted."""
+        sec = self.store.project.sections[sec_id]
+        self.selected_section_id = sec_id
+        dpg.set_value(self.section_list_id, sec.name)
+        self.refresh_ranges()
+        dpg.set_value(dpg.get_item_parent(self.tab_id), self.tab_id)
+
+        for i, (a, b) in enumerate(self.row_spans):
+            if a <= addr < b:
+                self.highlighted_row = highlight_row(self.range_table_id, i)
+                dpg.set_y_scroll(self.range_window_id, i * ROW_HEIGHT)
+                return
+
     # ------------------------- ADD RANGE
 
     def _add_range_clicked(self):
@@ -258,7 +329,8 @@ class ModulesBySectionUI:
         sec = self.store.project.sections[self.selected_section_id]
 
         # Filter modules that don't have range in this section
-        available_mods = [m for m in self.store.project.modules.values() if not any(r.section_id == sec.id for r in m.ranges)]
+        taken = {m.id for m, r in self.store.section_ranges(sec.id)}
+        available_mods = [m for m in self.store.project.modules.values() if m.id not in taken]
         if not available_mods: return self._err("All modules already have ranges in this section")
 
         mod_names = [m.name for m in available_mods]
@@ -301,6 +373,7 @@ class ModulesBySectionUI:
         dpg.set_value(self.range_size_input, self._hx(rng.end - rng.start))
 
         self.editing_range = rng
+        self.editing_range_mod_id = mod.id
         dpg.show_item(self.range_popup_id)
 
     # ------------------------- SAVE RANGE
@@ -326,26 +399,14 @@ class ModulesBySectionUI:
 
         if self.editing_range is None:
             # adding new
-            target_mod.ranges.append(ModuleRange(
-                section_id=sec.id, start=start, end=end, locked=False
-            ))
+            self.store.set_module_range(target_mod.id, sec.id, start, end)
         else:
-            # editing existing
-            self.editing_range.start = start
-            self.editing_range.end = end
-            # If module changed, need to move the range
-            if self.editing_range not in target_mod.ranges:
-                # Find current module and remove
-                for m in self.store.project.modules.values():
-                    if self.editing_range in m.ranges:
-                        m.ranges.remove(self.editing_range)
-                        break
-                target_mod.ranges.append(self.editing_range)
-
-        self.on_change()
+            # editing existing (moves it if the module changed)
+            self.store.update_module_range(self.editing_range_mod_id, self.editing_range,
+                                           sec.id, start, end, new_mod_id=target_mod.id)
+
         dpg.hide_item(self.range_popup_id)
         self.last_selected_module_id = target_mod.id
-        self.refresh_ranges()
 
     # ------------------- DELETE RANGE
 
@@ -354,21 +415,13 @@ class ModulesBySectionUI:
         if rng is None:
             return
 
-        try:
-            mod.ranges.remove(rng)
-        except ValueError:
-            return
-
-        self.on_change()
-        self.refresh_ranges()
+        self.store.delete_module_range(mod.id, rng)
 
     # ------------------- LOCK RANGE
 
     def _toggle_range_lock(self, s, new_state, user_data):
         mod, rng = user_data
-        rng.locked = bool(new_state)
-        self.on_change()
-        self.refresh_ranges()
+        self.store.set_range_lock(mod.id, rng, new_state)
 
     # ========================================================= UTIL
 
@@ -1,4 +1,10 @@
+import threading
+import time
 import dearpygui.dearpygui as dpg
+import boundaries
+import events
+from integrity import section_label
+from ui.ui_heatmap import LEGEND, draw_heat_row
 
 # ============================================================
 # BAR COLORS
@@ -12,29 +18,70 @@ COLOR_BORDER    = (255,255,255,0)      # Borders around bars
 
 HOLE_COLOR      = (255,255,128,255)
 OVERLAP_COLOR   = (255,128,128,255)
+ISSUE_COLOR     = (255,170,90,255)
+
+BOUNDARY_ROWS   = 200    # suggestions kept / shown per scan
+PAGE_ROWS       = 100    # hole / overlap rows per page
 
 
 
 class ReportsUI:
     def __init__(self, store):
         self.store = store
+        self.tab_id = None
         self.bar = None
+        self.heat_bar = None
 
         self.table_sections = None
         self.table_modules = None
         self.table_overlap = None
+        self.views = {}    # report kind -> table, page text, sort column / direction, offset
+        self.table_integrity = None
+        self.integrity_status_id = None
+        self.fix_locked = False
+
+        self.table_boundaries = None
+        self.boundary_status_id = None
+        self.boundary_min_run = boundaries.MIN_RUN
+        self.suggestions = []
 
+        self.export_format = "csv"
+        self.export_status_id = None
+
+        self.hole_theme = None
+        self.overlap_theme = None
+        self.issue_theme = None
 
     # ================================================================== BUILD UI
 
     def draw(self, tab_parent):
-        with dpg.tab(label="Reports", parent=tab_parent):
+        # only the tab itself; build() fills it the first time it is shown
+        self.tab_id = dpg.add_tab(label="Reports", parent=tab_parent)
+
+    def build(self):
+        # THEMES (one each, shared by every cell) -----------------------------
+        self.hole_theme = self._create_text_theme(HOLE_COLOR)
+        self.overlap_theme = self._create_text_theme(OVERLAP_COLOR)
+        self.issue_theme = self._create_text_theme(ISSUE_COLOR)
 
-            dpg.add_text("Executable Visual Map")
+        with dpg.group(parent=self.tab_id):
+
+            with dpg.group(horizontal=True):
+                dpg.add_text("Executable Visual Map")
+                dpg.add_spacer(width=20)
+                dpg.add_combo(items=["csv", "json", "jsonl"], default_value=self.export_format,
+                              width=70, label="Export format",
+                              callback=lambda s, a: setattr(self, "export_format", a))
+                dpg.add_button(label="Export All Ranges",
+                               callback=lambda: self._export("ranges", "ranges"))
+            self.export_status_id = dpg.add_text("")
             dpg.add_spacer(height=4)
 
             # BAR
             self.bar = dpg.add_drawlist(width=900, height=55)
+            # what the bytes look like under the bar (entropy / padding)
+            self.heat_bar = dpg.add_drawlist(width=900, height=24)
+            dpg.add_text(LEGEND)
 
             dpg.add_spacer(height=10)
             dpg.add_separator()
@@ -43,15 +90,18 @@ class ReportsUI:
             # ==== 1) SECTION HOLES (NO SECTION) ====
             with dpg.group(horizontal=True):
                 dpg.add_text("Executable Holes (No section covers this area):")
-                dpg.add_button(label="Export CSV",
-                               callback=lambda: self._export_table_csv(self.table_sections, "section_holes.csv"))
+                dpg.add_button(label="Export",
+                               callback=lambda: self._export("section_holes", "section_holes"))
+                self._pager("section_holes")
 
-            with dpg.table(header_row=True, resizable=True,
+            with dpg.table(header_row=True, resizable=True, sortable=True,
+                           callback=lambda s, a: self._sort("section_holes", a),
                            policy=dpg.mvTable_SizingStretchProp) as t1:
-                self.table_sections = t1
-                dpg.add_table_column(label="Start")
-                dpg.add_table_column(label="End")
-                dpg.add_table_column(label="Size")
+                self.table_sections = self.views["section_holes"]["table"] = t1
+                dpg.add_table_column(label="Start", user_data="address")
+                dpg.add_table_column(label="End", no_sort=True)
+                dpg.add_table_column(label="Size", user_data="size",
+                                     default_sort=True, prefer_sort_descending=True)
 
             dpg.add_spacer(height=10)
             dpg.add_separator()
@@ -60,49 +110,117 @@ class ReportsUI:
             # ==== 2) MODULE HOLES ====
             with dpg.group(horizontal=True):
                 dpg.add_text("Module Holes (Inside a section but no module owns it):")
-                dpg.add_button(label="Export CSV",
-                               callback=lambda: self._export_table_csv(self.table_modules, "module_holes.csv"))
+                dpg.add_button(label="Export",
+                               callback=lambda: self._export("module_holes", "module_holes"))
+                self._pager("module_holes")
 
-            with dpg.table(header_row=True, resizable=True,
+            with dpg.table(header_row=True, resizable=True, sortable=True,
+                           callback=lambda s, a: self._sort("module_holes", a),
                            policy=dpg.mvTable_SizingStretchProp) as t2:
-                self.table_modules = t2
+                self.table_modules = self.views["module_holes"]["table"] = t2
+                dpg.add_table_column(label="Section", user_data="section")
+                dpg.add_table_column(label="Start", user_data="address")
+                dpg.add_table_column(label="End", no_sort=True)
+                dpg.add_table_column(label="Size", user_data="size",
+                                     default_sort=True, prefer_sort_descending=True)
+
+            dpg.add_spacer(height=10)
+            dpg.add_separator()
+            dpg.add_spacer(height=10)
+
+            # ==== 3) BOUNDARY SUGGESTIONS ====
+            with dpg.group(horizontal=True):
+                dpg.add_text("Module Boundary Suggestions (after padding runs inside module holes):")
+                dpg.add_button(label="Scan Holes", callback=lambda: self._scan_boundaries())
+                dpg.add_input_int(label="Min padding", default_value=self.boundary_min_run, width=90,
+                                  min_value=2, min_clamped=True,
+                                  callback=lambda s, a: setattr(self, "boundary_min_run", a))
+            self.boundary_status_id = dpg.add_text("")
+
+            with dpg.table(header_row=True, resizable=True,
+                           policy=dpg.mvTable_SizingStretchProp) as tb:
+                self.table_boundaries = tb
                 dpg.add_table_column(label="Section")
-                dpg.add_table_column(label="Start")
+                dpg.add_table_column(label="Module Start")
                 dpg.add_table_column(label="End")
                 dpg.add_table_column(label="Size")
+                dpg.add_table_column(label="Padding")
+                dpg.add_table_column(label="Run")
+                dpg.add_table_column(label="Align")
+                dpg.add_table_column(label="Score")
+                dpg.add_table_column(label="")
 
             dpg.add_spacer(height=10)
             dpg.add_separator()
             dpg.add_spacer(height=10)
 
-            # ==== 3) OVERLAP ====
+            # ==== 4) OVERLAP ====
             with dpg.group(horizontal=True):
                 dpg.add_text("Module Overlap Conflicts:")
-                dpg.add_button(label="Export CSV",
-                               callback=lambda: self._export_table_csv(self.table_overlap, "overlaps.csv"))
+                dpg.add_button(label="Export",
+                               callback=lambda: self._export("overlaps", "overlaps"))
+                self._pager("overlaps")
 
-            with dpg.table(header_row=True, resizable=True,
+            with dpg.table(header_row=True, resizable=True, sortable=True,
+                           callback=lambda s, a: self._sort("overlaps", a),
                            policy=dpg.mvTable_SizingStretchProp) as t3:
-                self.table_overlap = t3
+                self.table_overlap = self.views["overlaps"]["table"] = t3
+                dpg.add_table_column(label="Section", user_data="section")
+                dpg.add_table_column(label="Module A", no_sort=True)
+                dpg.add_table_column(label="A Start", user_data="address")
+                dpg.add_table_column(label="A End", no_sort=True)
+                dpg.add_table_column(label="Module B", no_sort=True)
+                dpg.add_table_column(label="B Start", no_sort=True)
+                dpg.add_table_column(label="B End", no_sort=True)
+                dpg.add_table_column(label="Overlap Size", user_data="size",
+                                     default_sort=True, prefer_sort_descending=True)
+
+            dpg.add_spacer(height=10)
+            dpg.add_separator()
+            dpg.add_spacer(height=10)
+
+            # ==== 5) INTEGRITY ====
+            with dpg.group(horizontal=True):
+                dpg.add_text("Broken Ranges (orphaned / out of bounds / duplicate):")
+                dpg.add_button(label="Fix All", callback=lambda: self._fix(None))
+                dpg.add_checkbox(label="Include locked", default_value=self.fix_locked,
+                                 callback=lambda s, a: setattr(self, "fix_locked", a))
+            self.integrity_status_id = dpg.add_text("")
+
+            with dpg.table(header_row=True, resizable=True,
+                           policy=dpg.mvTable_SizingStretchProp) as t4:
+                self.table_integrity = t4
+                dpg.add_table_column(label="Problem")
+                dpg.add_table_column(label="Module")
                 dpg.add_table_column(label="Section")
-                dpg.add_table_column(label="Module A")
-                dpg.add_table_column(label="A Start")
-                dpg.add_table_column(label="A End")
-                dpg.add_table_column(label="Module B")
-                dpg.add_table_column(label="B Start")
-                dpg.add_table_column(label="B End")
-                dpg.add_table_column(label="Overlap Size")
+                dpg.add_table_column(label="Start")
+                dpg.add_table_column(label="End")
+                dpg.add_table_column(label="Details")
+                dpg.add_table_column(label="")
 
+        self.store.events.subscribe(self._on_store_events, events.MAP_EVENTS + (events.EXE_DATA_READY,))
         self.refresh()
 
 
     # ================================================================== REFRESH
 
+    def _on_store_events(self, batch):
+        # hidden tabs catch up in on_tab_change
+        if dpg.get_value(dpg.get_item_parent(self.tab_id)) != self.tab_id:
+            return
+        if batch.kinds - {events.EXE_DATA_READY}:
+            self.refresh()
+        elif "byte map" in batch.ids(events.EXE_DATA_READY):
+            self._refresh_heat()
+
     def refresh(self):
         self._refresh_bar()
+        self._refresh_heat()
         self._refresh_section_holes()
         self._refresh_module_holes()
+        self._refresh_boundaries()
         self._refresh_overlaps()
+        self._refresh_integrity()
 
 
     # ================================================================== BAR DRAW
@@ -136,7 +254,7 @@ class ReportsUI:
 
 
         # 3) module holes (yellow)
-        for sec, a, b in self.store.compute_module_holes():
+        for sec, a, b in self.store.report_items("module_holes"):
             dpg.draw_rectangle((X(a),T),(X(b),B),
                                color=COLOR_BORDER,fill=COLOR_HOLE,parent=self.bar)
 
@@ -155,7 +273,7 @@ class ReportsUI:
 
 
         # 5) overlaps (draw before OK so they stay visible)
-        overlaps = self.store.compute_module_overlaps()
+        overlaps = self.store.report_items("overlaps")
         for A,Bm,rA,rB,size in overlaps:
             lo,hi = max(rA.start,rB.start), min(rA.end,rB.end)
             dpg.draw_rectangle((X(lo),T),(X(hi),B),
@@ -169,26 +287,82 @@ class ReportsUI:
 
 
 
+    def _refresh_heat(self):
+        # same x scale as the bar above
+        p = self.store.project
+        if p.exe_start is None or p.exe_end is None or p.exe_start >= p.exe_end:
+            dpg.delete_item(self.heat_bar, children_only=True)
+            return
+        draw_heat_row(self.heat_bar, self.store, p.exe_start, p.exe_end, 20, 850, 2, 22)
+
+
     # ================================================================== TABLES
 
+    def _pager(self, kind):
+        """Page buttons and "Rows x-y of n" text of a ranked report table."""
+        v = self.views[kind] = {"table": None, "by": "size", "descending": True, "offset": 0, "total": 0}
+        dpg.add_spacer(width=20)
+        dpg.add_button(label="<", callback=lambda: self._turn(kind, -1))
+        dpg.add_button(label=">", callback=lambda: self._turn(kind, 1))
+        v["status"] = dpg.add_text("")
+
+    def _page(self, kind):
+        """Items of the shown page of a report, from the store's cached analysis."""
+        v = self.views[kind]
+        total, items = self.store.report_page(kind, v["by"], v["descending"], v["offset"], PAGE_ROWS)
+        if v["offset"] and v["offset"] >= total:
+            # the report shrank below the page: show its last one
+            v["offset"] = max(0, (total - 1) // PAGE_ROWS * PAGE_ROWS)
+            total, items = self.store.report_page(kind, v["by"], v["descending"], v["offset"], PAGE_ROWS)
+        v["total"] = total
+        if v["by"] == "size":
+            order = "largest first" if v["descending"] else "smallest first"
+        else:
+            order = f"by {v['by']}" + (", descending" if v["descending"] else "")
+        dpg.set_value(v["status"], f"Rows {v['offset'] + 1}-{v['offset'] + len(items)} of {total}, {order}"
+                                   if total else "None")
+        return items
+
+    def _redraw(self, kind):
+        {"section_holes": self._refresh_section_holes,
+         "module_holes": self._refresh_module_holes,
+         "overlaps": self._refresh_overlaps}[kind]()
+
+    def _sort(self, kind, sort_specs):
+        # sort_specs: [[column, direction]], direction 1 ascending / -1 descending
+        if not sort_specs:
+            return
+        column, direction = sort_specs[0]
+        v = self.views[kind]
+        v["by"], v["descending"], v["offset"] = dpg.get_item_user_data(column), direction < 0, 0
+        self._redraw(kind)
+
+    def _turn(self, kind, step):
+        v = self.views[kind]
+        offset = v["offset"] + step * PAGE_ROWS
+        if offset < 0 or offset >= v["total"]:
+            return
+        v["offset"] = offset
+        self._redraw(kind)
+
     def _refresh_section_holes(self):
         rows = dpg.get_item_children(self.table_sections).get(1,[])
         for r in rows: dpg.delete_item(r)
 
-        for a,b in self.store.compute_section_holes():
+        for a,b in self._page("section_holes"):
             size=b-a
             with dpg.table_row(parent=self.table_sections):
                 id1=dpg.add_text(f"0x{a:X}")
                 id2=dpg.add_text(f"0x{b:X}")
                 id3=dpg.add_text(f"0x{size:X}")
                 for id in (id1,id2,id3):
-                    dpg.bind_item_theme(id,self._yellow())
+                    dpg.bind_item_theme(id,self.hole_theme)
 
     def _refresh_module_holes(self):
         rows=dpg.get_item_children(self.table_modules).get(1,[])
         for r in rows: dpg.delete_item(r)
 
-        for sec,a,b in self.store.compute_module_holes():
+        for sec,a,b in self._page("module_holes"):
             size=b-a
             with dpg.table_row(parent=self.table_modules):
                 id0=dpg.add_text(sec)
@@ -196,14 +370,57 @@ class ReportsUI:
                 id2=dpg.add_text(f"0x{b:X}")
                 id3=dpg.add_text(f"0x{size:X}")
                 for id in (id0,id1,id2,id3):
-                    dpg.bind_item_theme(id,self._yellow())
+                    dpg.bind_item_theme(id,self.hole_theme)
+
+    def _refresh_boundaries(self):
+        rows=dpg.get_item_children(self.table_boundaries).get(1,[])
+        for r in rows: dpg.delete_item(r)
+
+        # suggestions whose span got (partly) claimed since the scan are gone
+        self.suggestions = [b for b in self.suggestions
+                            if b.section_id in self.store.project.sections
+                            and not self.store.query(b.address, b.end)["ranges"]]
+        for b in self.suggestions:
+            with dpg.table_row(parent=self.table_boundaries):
+                dpg.add_text(b.section)
+                dpg.add_text(f"0x{b.address:X}")
+                dpg.add_text(f"0x{b.end:X}")
+                dpg.add_text(f"0x{b.end - b.address:X}")
+                dpg.add_text(b.fill_name)
+                dpg.add_text(str(b.run))
+                dpg.add_text(f"0x{b.align:X}")
+                dpg.add_text(f"{b.score:.1f}")
+                dpg.add_button(label="Create", user_data=b, callback=lambda s, a, u: self._create_suggested(u))
+
+    def _scan_boundaries(self):
+        t0 = time.perf_counter()
+        try:
+            found = self.store.suggest_boundaries(min_run=self.boundary_min_run)
+        except ValueError as e:
+            dpg.set_value(self.boundary_status_id, str(e))
+            return
+        self.suggestions = found[:BOUNDARY_ROWS]
+        shown = f", showing the best {BOUNDARY_ROWS}" if len(found) > BOUNDARY_ROWS else ""
+        dpg.set_value(self.boundary_status_id,
+                      f"{len(found)} candidate(s) in {time.perf_counter() - t0:.2f} s{shown}")
+        self._refresh_boundaries()
+
+    def _create_suggested(self, boundary):
+        """New module owning the suggestion's span; the tab refreshes through the store events."""
+        try:
+            mod = self.store.create_suggested_range(boundary)
+        except (KeyError, ValueError) as e:
+            dpg.set_value(self.boundary_status_id, f"Create failed: {e}")
+            return
+        dpg.set_value(self.boundary_status_id,
+                      f"Created {mod.name} at 0x{boundary.address:X}-0x{boundary.end:X}")
 
     def _refresh_overlaps(self):
         rows=dpg.get_item_children(self.table_overlap).get(1,[])
         for r in rows: dpg.delete_item(r)
 
-        for A,B,rA,rB,size in self.store.compute_module_overlaps():
-            sec=self.store.project.sections[rA.section_id].name
+        for A,B,rA,rB,size in self._page("overlaps"):
+            sec=section_label(self.store.project, rA.section_id)
             with dpg.table_row(parent=self.table_overlap):
                 items=[
                     dpg.add_text(sec),
@@ -216,40 +433,59 @@ class ReportsUI:
                     dpg.add_text(f"0x{size:X}")
                 ]
                 for id in items:
-                    dpg.bind_item_theme(id,self._red())
+                    dpg.bind_item_theme(id,self.overlap_theme)
 
-    def _export_table_csv(self, table_id, filename):
-        import csv
+    def _refresh_integrity(self):
+        rows=dpg.get_item_children(self.table_integrity).get(1,[])
+        for r in rows: dpg.delete_item(r)
+
+        p = self.store.project
+        for issue in self.store.check_integrity():
+            with dpg.table_row(parent=self.table_integrity):
+                items=[
+                    dpg.add_text(issue.kind.replace("_", " ")),
+                    dpg.add_text(issue.module + (" (locked)" if issue.locked else "")),
+                    dpg.add_text(section_label(p, issue.section_id)),
+                    dpg.add_text(f"0x{issue.start:X}"),
+                    dpg.add_text(f"0x{issue.end:X}"),
+                    dpg.add_text(issue.message),
+                ]
+                dpg.add_button(label="Fix", user_data=issue, callback=lambda s, a, u: self._fix([u]))
+                for id in items:
+                    dpg.bind_item_theme(id,self.issue_theme)
+
+    def _fix(self, issues):
+        """Fix the given issues (None = all); the tab refreshes through the store events."""
+        try:
+            count, skipped = self.store.fix_integrity(issues, include_locked=self.fix_locked)
+        except (KeyError, ValueError) as e:
+            dpg.set_value(self.integrity_status_id, f"Fix failed: {e}")
+            return
+        msg = f"Applied {count} fix(es)"
+        if skipped:
+            msg += f", skipped {len(skipped)} locked range(s)"
+        dpg.set_value(self.integrity_status_id, msg)
 
-        # COLUMN HEADERS -------------------------------------------------
-        cols = dpg.get_item_children(table_id).get(0, [])
-        headers = [dpg.get_item_label(col) for col in cols]
+    # ================================================================== EXPORT
 
-        # TABLE ROWS -----------------------------------------------------
-        rows = []
-        for row in dpg.get_item_children(table_id).get(1, []):  # slot 1 = table rows
-            cell_items = dpg.get_item_children(row).get(1, [])  # slot 1 = individual cell widgets
-            row_values = [dpg.get_value(item) for item in cell_items]
-            rows.append(row_values)
+    def _export(self, kind, basename):
+        """Export straight from the store on a worker thread so the UI keeps drawing."""
+        filename = f"{basename}.{self.export_format}"
+        dpg.set_value(self.export_status_id, f"Exporting {filename}...")
 
-        # WRITE CSV ------------------------------------------------------
-        with open(filename, "w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(headers)
-            writer.writerows(rows)
+        def run():
+            try:
+                count = self.store.export_report(kind, filename)
+                dpg.set_value(self.export_status_id, f"Exported {count} rows to {filename}")
+            except Exception as e:
+                dpg.set_value(self.export_status_id, f"Export of {filename} failed: {e}")
 
-        print(f"[CSV EXPORT] {filename} — {len(rows)} rows + headers written.")
+        threading.Thread(target=run, daemon=True).start()
 
     # ================================================================== THEMES
 
-    def _yellow(self):
-        with dpg.theme() as t:
-            with dpg.theme_component(dpg.mvText):
-                dpg.add_theme_color(dpg.mvThemeCol_Text, HOLE_COLOR)
-        return t
-
-    def _red(self):
+    def _create_text_theme(self, color):
         with dpg.theme() as t:
             with dpg.theme_component(dpg.mvText):
-                dpg.add_theme_color(dpg.mvThemeCol_Text, OVERLAP_COLOR)
+                dpg.add_theme_color(dpg.mvThemeCol_Text, color)
         return t
@@ -1,14 +1,19 @@
+import os
 import dearpygui.dearpygui as dpg
+import events
+import rebase
 from ui.ui_theme import LOCKED_COLOR
 from ui.ui_utils import parse_hex
 
 
 class SectionsUI:
-    def __init__(self, store, change_callback):
+    def __init__(self, store):
         self.store = store
-        self.on_change = change_callback
+        self.tab_id = None
 
         self.table_id = None
+        self.rows = {}        # section id -> [name, start, end, size, lock, edit, delete] items
+        self.row_order = []   # section ids as shown (by start)
 
         # Section edit popup
         self.current_edit_sec_id = None
@@ -16,6 +21,9 @@ class SectionsUI:
         self.edit_name_id = None
         self.edit_start_id = None
         self.edit_end_id = None
+        self.edit_mode_id = None
+        self.edit_clip_id = None
+        self.edit_preview_id = None
 
         # Section add popup
         self.add_popup_id = None
@@ -27,6 +35,12 @@ class SectionsUI:
         self.exe_popup_id = None
         self.exe_start_id = None
         self.exe_end_id = None
+        self.exe_file_id = None
+
+        # Symbol import popup
+        self.symbols_popup_id = None
+        self.symbols_path_id = None
+        self.symbols_status_id = None
 
         # error popup
         self.error_popup_id = None
@@ -35,12 +49,17 @@ class SectionsUI:
     # ==================================================================== UI BUILD
 
     def draw(self, tab_parent):
+        # only the tab itself; build() fills it the first time it is shown
+        self.tab_id = dpg.add_tab(label="Sections", parent=tab_parent)
+
+    def build(self):
 
-        with dpg.tab(label="Sections", parent=tab_parent):
+        with dpg.group(parent=self.tab_id):
 
             with dpg.group(horizontal=True):
                 dpg.add_button(label="Add Section", callback=self._open_add_popup)
                 dpg.add_button(label="Set Executable Range", callback=self._open_exe_popup)
+                dpg.add_button(label="Import Symbols", callback=self._open_symbols_popup)
                 dpg.add_text("", tag="exe_range_preview")
 
             dpg.add_spacer(height=6)
@@ -61,55 +80,77 @@ class SectionsUI:
         self._create_edit_popup()
         self._create_add_popup()
         self._create_exe_popup()           # <-- NEW
+        self._create_symbols_popup()
         self._create_error_popup()
 
+        self.store.events.subscribe(self._on_store_events,
+                                    events.SECTION_EVENTS + (events.EXE_RANGE_CHANGED,
+                                                             events.PROJECT_RELOADED))
         self.refresh()
 
     # ==================================================================== REFRESH
 
     def refresh(self):
-        p = self.store.project
-        if p.exe_start is not None and p.exe_end is not None:
-            dpg.set_value("exe_range_preview", f"[ EXE: 0x{p.exe_start:X} - 0x{p.exe_end:X} ]")
-        else:
-            dpg.set_value("exe_range_preview", "[ <no executable range set> ]")
+        self._refresh_exe_preview()
 
         children = dpg.get_item_children(self.table_id)
         for row in children.get(1, []):
             dpg.delete_item(row)
+        self.rows = {}
 
         # sort by start always
         sections = sorted(
             self.store.project.sections.values(),
             key=lambda s: s.start
         )
+        self.row_order = [s.id for s in sections]
 
         for sec in sections:
             with dpg.table_row(parent=self.table_id):
+                self.rows[sec.id] = [
+                    dpg.add_text(""),
+                    dpg.add_text(""),
+                    dpg.add_text(""),
+                    dpg.add_text(""),
+                    dpg.add_checkbox(label="", user_data=sec.id, callback=self.toggle_lock),
+                    dpg.add_button(label="Edit", user_data=sec.id,
+                                   callback=self._open_edit_popup),
+                    dpg.add_button(label="Delete", user_data=sec.id,
+                                   callback=self._delete_section_confirm),
+                ]
+            self._update_row(sec)
+
+    def _refresh_exe_preview(self):
+        p = self.store.project
+        if p.exe_start is not None and p.exe_end is not None:
+            file = f" {os.path.basename(p.exe_path)}" if p.exe_path else ""
+            dpg.set_value("exe_range_preview", f"[ EXE{file}: 0x{p.exe_start:X} - 0x{p.exe_end:X} ]")
+        else:
+            dpg.set_value("exe_range_preview", "[ <no executable range set> ]")
 
-                dpg.add_text(sec.name)
-                dpg.add_text(f"0x{sec.start:X}")
-                dpg.add_text(f"0x{sec.end:X}")
-                dpg.add_text(f"0x{sec.size:X}")
-
-                dpg.add_checkbox(
-                    label="",
-                    default_value=sec.locked,
-                    user_data=sec.id,
-                    callback=self.toggle_lock
-                )
-
-                dpg.add_button(
-                    label="Edit", user_data=sec.id,
-                    callback=self._open_edit_popup,
-                    enabled=not sec.locked
-                )
-
-                dpg.add_button(
-                    label="Delete", user_data=sec.id,
-                    callback=self._delete_section_confirm,
-                    enabled=not sec.locked
-                )
+    def _update_row(self, sec):
+        name, start, end, size, lock, edit, delete = self.rows[sec.id]
+        dpg.set_value(name, sec.name)
+        dpg.set_value(start, f"0x{sec.start:X}")
+        dpg.set_value(end, f"0x{sec.end:X}")
+        dpg.set_value(size, f"0x{sec.size:X}")
+        dpg.set_value(lock, sec.locked)
+        dpg.configure_item(edit, enabled=not sec.locked)
+        dpg.configure_item(delete, enabled=not sec.locked)
+
+    def _on_store_events(self, batch):
+        if batch.kinds & {events.SECTION_ADDED, events.SECTION_DELETED, events.PROJECT_RELOADED}:
+            return self.refresh()
+
+        if events.EXE_RANGE_CHANGED in batch:
+            self._refresh_exe_preview()
+
+        if events.SECTION_UPDATED in batch:
+            order = [s.id for s in sorted(self.store.project.sections.values(), key=lambda s: s.start)]
+            if order != self.row_order:
+                return self.refresh()
+            for sid in batch.ids(events.SECTION_UPDATED):
+                self._update_row(self.store.project.sections[sid])
 
     # ==================================================================== POPUPS
 
@@ -124,6 +165,15 @@ class SectionsUI:
             self.edit_start_id = dpg.add_input_text(label="Start (hex)")
             self.edit_end_id   = dpg.add_input_text(label="End (hex)")
 
+            # move the section's ranges along (shift by the start delta or scale)
+            self.edit_mode_id  = dpg.add_combo(items=["keep", rebase.SHIFT, rebase.SCALE],
+                                               default_value="keep", width=100,
+                                               label="Ranges", callback=self._preview_rebase)
+            self.edit_clip_id  = dpg.add_checkbox(label="Clip ranges spilling out of the section")
+            self.edit_preview_id = dpg.add_text("", wrap=500)
+            for item in (self.edit_start_id, self.edit_end_id):
+                dpg.set_item_callback(item, self._preview_rebase)
+
             with dpg.group(horizontal=True):
                 dpg.add_button(label="Save", callback=self._on_save_edit)
                 dpg.add_button(label="Cancel", callback=self._on_cancel_edit)
@@ -154,11 +204,27 @@ class SectionsUI:
             self.exe_popup_id  = popup
             self.exe_start_id = dpg.add_input_text(label="Start (hex)")
             self.exe_end_id   = dpg.add_input_text(label="End (hex)")
+            self.exe_file_id  = dpg.add_input_text(label="File (optional)", width=400)
 
             with dpg.group(horizontal=True):
                 dpg.add_button(label="Save",   callback=self._save_exe_range)
                 dpg.add_button(label="Cancel", callback=lambda:s_dpg_hide(self.exe_popup_id))
 
+    def _create_symbols_popup(self):
+        with dpg.window(
+            tag="symbols_import_popup", modal=True, show=False,
+            no_collapse=True, autosize=True, label="Import Symbols"
+        ) as popup:
+
+            self.symbols_popup_id  = popup
+            dpg.add_text("Text file, one 'start size name' per line (hex).")
+            self.symbols_path_id   = dpg.add_input_text(label="File", width=400)
+            self.symbols_status_id = dpg.add_text("")
+
+            with dpg.group(horizontal=True):
+                dpg.add_button(label="Import", callback=self._import_symbols)
+                dpg.add_button(label="Close",  callback=lambda:s_dpg_hide(self.symbols_popup_id))
+
     def _create_error_popup(self):
         with dpg.window(
             tag="section_error_popup", modal=False, show=False,
@@ -179,9 +245,38 @@ class SectionsUI:
         dpg.set_value(self.edit_name_id, sec.name)
         dpg.set_value(self.edit_start_id, f"0x{sec.start:X}")
         dpg.set_value(self.edit_end_id, f"0x{sec.end:X}")
+        dpg.set_value(self.edit_mode_id, "keep")
+        dpg.set_value(self.edit_clip_id, False)
+        dpg.set_value(self.edit_preview_id, "")
 
         dpg.configure_item(self.edit_popup_id, show=True)
 
+    def _preview_rebase(self, *args):
+        """Say what the chosen rebase would do to the ranges, before saving."""
+        mode = dpg.get_value(self.edit_mode_id)
+        if mode == "keep" or self.current_edit_sec_id is None:
+            dpg.set_value(self.edit_preview_id, "")
+            return
+
+        try:
+            start = parse_hex(dpg.get_value(self.edit_start_id))
+            end = parse_hex(dpg.get_value(self.edit_end_id))
+            plan = self.store.plan_section_rebase(self.current_edit_sec_id, start, end, mode)
+        except ValueError as e:
+            dpg.set_value(self.edit_preview_id, str(e))
+            return
+
+        moved = sum(1 for m in plan.moves if (m.new_start, m.new_end) != (m.start, m.end))
+        lines = [f"{moved} of {len(plan.moves)} range(s) move."]
+        spills = plan.spills
+        if spills:
+            lines.append(f"{len(spills)} would spill out of 0x{start:X}-0x{end:X}:")
+            for m in spills[:8]:
+                lines.append(f"  {m.module}: 0x{m.start:X}-0x{m.end:X} -> 0x{m.new_start:X}-0x{m.new_end:X}")
+            if len(spills) > 8:
+                lines.append(f"  ... and {len(spills) - 8} more")
+        dpg.set_value(self.edit_preview_id, "\n".join(lines))
+
     def _on_cancel_edit(self, *args):
         self.current_edit_sec_id = None
         dpg.configure_item(self.edit_popup_id, show=False)
@@ -191,16 +286,23 @@ class SectionsUI:
         start = parse_hex(dpg.get_value(self.edit_start_id))
         end = parse_hex(dpg.get_value(self.edit_end_id))
 
+        mode = dpg.get_value(self.edit_mode_id)
+
         try:
-            self.store.update_section(self.current_edit_sec_id, name, start, end)
+            if mode == "keep":
+                self.store.update_section(self.current_edit_sec_id, name, start, end)
+            else:
+                # one transaction: one validation, one save, one undo step
+                with self.store.transaction():
+                    self.store.rebase_section(self.current_edit_sec_id, start, end, mode,
+                                              clip=dpg.get_value(self.edit_clip_id))
+                    self.store.update_section(self.current_edit_sec_id, name, start, end)
 
         except Exception as e:
             self._show_error(str(e))
             return
 
         self.current_edit_sec_id = None
-        self.on_change()
-        self.refresh()
         dpg.configure_item(self.edit_popup_id, show=False)
 
     # ==================================================================== SECTION ADD
@@ -225,8 +327,6 @@ class SectionsUI:
             self._show_error(str(e))
             return
 
-        self.on_change()
-        self.refresh()
         dpg.configure_item(self.add_popup_id, show=False)
 
     # ==================================================================== EXE RANGE LOGIC (NEW)
@@ -235,6 +335,7 @@ class SectionsUI:
         p = self.store.project
         dpg.set_value(self.exe_start_id, f"0x{p.exe_start:X}" if p.exe_start is not None else "")
         dpg.set_value(self.exe_end_id, f"0x{p.exe_end:X}" if p.exe_end is not None else "")
+        dpg.set_value(self.exe_file_id, p.exe_path or "")
         dpg.configure_item(self.exe_popup_id, show=True)
 
     def _save_exe_range(self, *args):
@@ -254,19 +355,41 @@ class SectionsUI:
                     f"New EXE range does not cover existing section '{sec.name}'."
                 )
 
+        path = dpg.get_value(self.exe_file_id).strip() or None
+        if path != self.store.project.exe_path:
+            self.store.set_executable_file(path)
+            if path is not None:
+                try:
+                    self.store.executable_image()
+                except ValueError as e:
+                    self._show_error(f"{e} (kept, fix the path or the file)")
+
         if not self.store.set_executable_range(start, end):
             return self._show_error("Failed to set executable range.")
 
-        self.on_change()
         dpg.configure_item(self.exe_popup_id, show=False)
-        self.refresh()  # update preview text
+
+    # ==================================================================== SYMBOLS
+
+    def _open_symbols_popup(self, *args):
+        n = len(self.store.symbols) if self.store.has_symbols() else 0
+        dpg.set_value(self.symbols_status_id, f"{n} symbols loaded")
+        dpg.configure_item(self.symbols_popup_id, show=True)
+
+    def _import_symbols(self, *args):
+        path = dpg.get_value(self.symbols_path_id).strip()
+        try:
+            added, skipped = self.store.import_symbols_text(path)
+        except (OSError, ValueError) as e:
+            return self._show_error(f"Symbol import failed: {e}")
+
+        dpg.set_value(self.symbols_status_id,
+                      f"Imported {added} symbols, skipped {skipped} outside sections")
 
     # ==================================================================== DELETE
 
     def _delete_section_confirm(self, sender, app_data, sec_id):
         self.store.delete_section(sec_id)
-        self.on_change()
-        self.refresh()
 
     # ==================================================================== ERROR + UTILS
 
@@ -280,8 +403,6 @@ class SectionsUI:
 
     def toggle_lock(self, sender, locked, sec_id):
         self.store.set_section_lock(sec_id, bool(locked))
-        self.on_change()
-        self.refresh()
 
 
 def s_dpg_hide(id): dpg.configure_item(id, show=False)
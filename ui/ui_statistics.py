@@ -0,0 +1,141 @@
+import dearpygui.dearpygui as dpg
+import events
+
+HOLE_COLOR = (255,255,128,255)
+
+
+class StatisticsUI:
+    def __init__(self, store):
+        self.store = store
+        self.tab_id = None
+
+        self.summary_id = None
+        self.table_sections = None
+        self.table_modules = None
+        self.table_holes = None
+
+        # THEMES -----------------------------
+        self.hole_text_theme = self._create_hole_text_theme()
+
+    # ================================================================== THEMES
+
+    def _create_hole_text_theme(self):
+        with dpg.theme() as t:
+            with dpg.theme_component(dpg.mvText):
+                dpg.add_theme_color(dpg.mvThemeCol_Text, HOLE_COLOR)
+        return t
+
+    # ================================================================== BUILD UI
+
+    def draw(self, tab_parent):
+        # only the tab itself; build() fills it the first time it is shown
+        self.tab_id = dpg.add_tab(label="Statistics", parent=tab_parent)
+
+    def build(self):
+        with dpg.group(parent=self.tab_id):
+
+            self.summary_id = dpg.add_text("")
+
+            dpg.add_spacer(height=10)
+            dpg.add_separator()
+            dpg.add_spacer(height=10)
+
+            # ==== 1) PER SECTION ====
+            dpg.add_text("Section Coverage:")
+            with dpg.table(header_row=True, resizable=True,
+                           policy=dpg.mvTable_SizingStretchProp) as t1:
+                self.table_sections = t1
+                dpg.add_table_column(label="Section")
+                dpg.add_table_column(label="Size")
+                dpg.add_table_column(label="Owned")
+                dpg.add_table_column(label="Coverage")
+                dpg.add_table_column(label="Overlap")
+                dpg.add_table_column(label="Unclaimed")
+                dpg.add_table_column(label="Largest Hole")
+
+            dpg.add_spacer(height=10)
+            dpg.add_separator()
+            dpg.add_spacer(height=10)
+
+            # ==== 2) PER MODULE ====
+            dpg.add_text("Bytes per Module:")
+            with dpg.table(header_row=True, resizable=True,
+                           policy=dpg.mvTable_SizingStretchProp) as t2:
+                self.table_modules = t2
+                dpg.add_table_column(label="#")
+                dpg.add_table_column(label="Module")
+                dpg.add_table_column(label="Bytes")
+                dpg.add_table_column(label="Share")
+
+            dpg.add_spacer(height=10)
+            dpg.add_separator()
+            dpg.add_spacer(height=10)
+
+            # ==== 3) LARGEST UNCLAIMED ====
+            dpg.add_text("Largest Unclaimed Regions:")
+            with dpg.table(header_row=True, resizable=True,
+                           policy=dpg.mvTable_SizingStretchProp) as t3:
+                self.table_holes = t3
+                dpg.add_table_column(label="Section")
+                dpg.add_table_column(label="Start")
+                dpg.add_table_column(label="End")
+                dpg.add_table_column(label="Size")
+
+        self.store.events.subscribe(self._on_store_events, events.MAP_EVENTS)
+        self.refresh()
+
+
+    # ================================================================== REFRESH
+
+    def _on_store_events(self, batch):
+        # hidden tabs catch up in on_tab_change
+        if dpg.get_value(dpg.get_item_parent(self.tab_id)) == self.tab_id:
+            self.refresh()
+
+    def refresh(self):
+        total, owned, overlapped = self.store.coverage_totals()
+        pct = 100.0 * owned / total if total else 0.0
+        dpg.set_value(self.summary_id,
+                      f"Sections: 0x{total:X} bytes, owned 0x{owned:X} ({pct:.2f}%), "
+                      f"overlapping 0x{overlapped:X}")
+
+        self._refresh_sections()
+        self._refresh_modules(total)
+        self._refresh_holes()
+
+    def _clear(self, table_id):
+        for r in dpg.get_item_children(table_id).get(1,[]):
+            dpg.delete_item(r)
+
+    def _refresh_sections(self):
+        self._clear(self.table_sections)
+
+        for c in self.store.coverage_by_section():
+            largest = c.holes[0][1] - c.holes[0][0] if c.holes else 0
+            with dpg.table_row(parent=self.table_sections):
+                dpg.add_text(c.name)
+                dpg.add_text(f"0x{c.size:X}")
+                dpg.add_text(f"0x{c.owned:X}")
+                dpg.add_text(f"{c.percent:.2f}%")
+                dpg.add_text(f"0x{c.overlapped:X}")
+                dpg.add_text(f"0x{c.hole_bytes:X}")
+                dpg.add_text(f"0x{largest:X}")
+
+    def _refresh_modules(self, total):
+        self._clear(self.table_modules)
+
+        for mod, n in self.store.coverage_by_module():
+            share = 100.0 * n / total if total else 0.0
+            with dpg.table_row(parent=self.table_modules):
+                dpg.add_text(str(mod.number))
+                dpg.add_text(mod.name)
+                dpg.add_text(f"0x{n:X}")
+                dpg.add_text(f"{share:.2f}%")
+
+    def _refresh_holes(self):
+        self._clear(self.table_holes)
+
+        for sec, a, b in self.store.largest_holes():
+            with dpg.table_row(parent=self.table_holes):
+                for txt in (sec, f"0x{a:X}", f"0x{b:X}", f"0x{b-a:X}"):
+                    dpg.bind_item_theme(dpg.add_text(txt), self.hole_text_theme)
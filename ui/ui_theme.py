@@ -1,6 +1,10 @@
 import dearpygui.dearpygui as dpg
 
 LOCKED_COLOR = (90, 30, 30, 255)
+JUMP_COLOR   = (60, 90, 160, 255)   # row reached from Where?
+
+# approximate table row height (font 16 + cell padding), for scrolling to a row
+ROW_HEIGHT = 27
 
 def apply_theme():
     with dpg.theme() as global_theme:
@@ -13,3 +17,11 @@ def apply_theme():
 
 def color_locked_row(row_id):
     dpg.set_item_color(row_id, dpg.mvTableRow_bgColor, LOCKED_COLOR)
+
+
+def highlight_row(table_id, index, previous=None):
+    """Highlight one table row (by index), clearing the previously highlighted one."""
+    if previous is not None:
+        dpg.unhighlight_table_row(table_id, previous)
+    dpg.highlight_table_row(table_id, index, JUMP_COLOR)
+    return index
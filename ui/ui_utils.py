@@ -1,8 +1,2 @@
-
-def parse_hex(text):
-    s = str(text).strip()
-    if not s:
-        raise ValueError("Value required.")
-    if s.endswith(("h", "H")): s = s[:-1]
-    if s.lower().startswith("0x"): s = s[2:]
-    return int(s, 16)
\ No newline at end of file
+# parsing lives below the UI (the store and the server use it too)
+from hex_utils import parse_hex
@@ -0,0 +1,108 @@
+import hashlib
+import os
+import threading
+
+from project_loader import load_project
+
+
+def file_signature(filename):
+    """(mtime_ns, size) of the file, or None if it does not exist."""
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def file_hash(filename):
+    h = hashlib.blake2b(digest_size=16)
+    with open(filename, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ProjectFileWatcher:
+    """Polls the project file for edits made outside the tool.
+
+    Pure stat() polling, no OS notification APIs. A changed mtime/size is
+    confirmed with a content hash (touching or re-saving identical content
+    is ignored), then the file is parsed on the watcher thread and handed
+    over through take_pending() for the UI thread to apply. The file as it
+    is at the first poll is the baseline; hashing it there keeps a big
+    project file off the caller's thread at startup.
+    """
+
+    def __init__(self, filename, interval=1.0):
+        self.filename = filename
+        self.interval = interval
+
+        self.signature = None
+        self.hash = None
+        self._has_baseline = False
+
+        self._lock = threading.Lock()
+        self._pending = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    # ---------------------------------------------------------- own writes
+
+    def mark_saved(self):
+        """Record the file we just wrote ourselves so it is not reported."""
+        with self._lock:
+            self._take_baseline(force=True)
+
+    def _take_baseline(self, force=False):
+        # called with _lock held
+        if self._has_baseline and not force:
+            return
+        self.signature = file_signature(self.filename)
+        self.hash = file_hash(self.filename) if self.signature else None
+        self._has_baseline = True
+
+    # ---------------------------------------------------------- polling
+
+    def poll(self):
+        """Check once; returns the freshly loaded Project if the file changed."""
+        with self._lock:
+            self._take_baseline()
+            sig = file_signature(self.filename)
+            if sig is None or sig == self.signature:
+                return None
+            digest = file_hash(self.filename)
+            self.signature = sig
+            if digest == self.hash:
+                return None
+            self.hash = digest
+
+        try:
+            return load_project(self.filename)
+        except (OSError, ValueError, KeyError) as e:
+            # most likely caught mid-write; the next poll sees the final file
+            print(f"[WATCH] Could not read changed {self.filename}: {e}")
+            with self._lock:
+                self.signature = None
+            return None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        with self._lock:
+            self._take_baseline()
+        while not self._stop.wait(self.interval):
+            project = self.poll()
+            if project is not None:
+                with self._lock:
+                    self._pending = project
+
+    def take_pending(self):
+        """The latest externally changed Project not applied yet, or None."""
+        with self._lock:
+            project, self._pending = self._pending, None
+        return project
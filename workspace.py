@@ -0,0 +1,238 @@
+import json
+import os
+
+import numpy as np
+
+from models import ModuleRange
+from store import ProjectStore
+
+
+class Workspace:
+    """Several builds of the same executable, keyed by build name.
+
+    Addresses move from one build to another through the section they are
+    in (matched by section name): the offset from the nearest anchor at or
+    below the address is kept. Every section start is an implicit anchor,
+    user anchor pairs (src_addr, dst_addr) refine the mapping inside
+    sections whose contents shifted. Everything is done on NumPy arrays, so
+    porting a whole map is a handful of searchsorted calls.
+    """
+
+    def __init__(self):
+        self.builds = {}    # build -> ProjectStore
+        self.files = {}     # build -> project file it was loaded from
+        self.anchors = {}   # (src build, dst build) -> [(src_addr, dst_addr)]
+
+    # ---------------------------------------------------------- builds
+
+    def add_build(self, build, store, filename=None):
+        self.builds[build] = store
+        if filename:
+            self.files[build] = filename
+
+    def load_build(self, build, filename):
+        store = ProjectStore()
+        store.load(filename)
+        self.add_build(build, store, filename)
+        return store
+
+    def add_anchor(self, src, dst, src_addr, dst_addr):
+        self.anchors.setdefault((src, dst), []).append((src_addr, dst_addr))
+
+    # ---------------------------------------------------------- persistence
+
+    def save(self, filename):
+        """Write builds and anchors; project paths are stored relative to the
+        workspace file's folder (load() resolves them against it)."""
+        base = os.path.dirname(os.path.abspath(filename))
+        data = {
+            "builds":  {build: _relative(path, base) for build, path in self.files.items()},
+            "anchors": [{"src": s, "dst": d, "pairs": pairs}
+                        for (s, d), pairs in self.anchors.items()],
+        }
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=4)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        ws = cls()
+        base = os.path.dirname(os.path.abspath(filename))
+        for build, path in data.get("builds", {}).items():
+            ws.load_build(build, os.path.join(base, path))
+        for a in data.get("anchors", []):
+            ws.anchors[(a["src"], a["dst"])] = [tuple(p) for p in a["pairs"]]
+        return ws
+
+    # ---------------------------------------------------------- translation
+
+    def _mapping(self, src, dst):
+        """Sorted anchor table for src → dst.
+
+        Returns (anchor_src, anchor_dst, sec_end_src, sec_start_dst,
+        sec_end_dst): one row per anchor, carrying the bounds of the section
+        it belongs to in both builds.
+        """
+        src_p, dst_p = self.builds[src].project, self.builds[dst].project
+        dst_by_name = {s.name: s for s in dst_p.sections.values()}
+
+        rows = []
+        pairs = sorted(self.anchors.get((src, dst), []))
+        for s in src_p.sections.values():
+            d = dst_by_name.get(s.name)
+            if d is None:
+                continue
+            rows.append((s.start, d.start, s.end, d.start, d.end))
+            rows.extend((a, b, s.end, d.start, d.end)
+                        for a, b in pairs if s.start < a < s.end)
+        rows.sort()
+
+        cols = np.array(rows, dtype=np.uint64).reshape(-1, 5)
+        return tuple(cols[:, i] for i in range(5))
+
+    def translate_addresses(self, src, dst, addrs):
+        """Map addresses of build src to build dst.
+
+        Returns (out, ok): uint64 array of translated addresses and a bool
+        array that is False where the address is outside every section shared
+        by both builds, or lands outside its section in dst.
+        """
+        addrs = np.asarray(addrs, dtype=np.uint64)
+        a_src, a_dst, end_src, start_dst, end_dst = self._mapping(src, dst)
+
+        if len(a_src) == 0:
+            return np.zeros_like(addrs), np.zeros(addrs.shape, dtype=bool)
+
+        idx = np.searchsorted(a_src, addrs, side="right").astype(np.int64) - 1
+        ok = idx >= 0
+        idx = np.where(ok, idx, 0)
+
+        ok &= addrs < end_src[idx]
+        delta = addrs - np.where(ok, a_src[idx], addrs)  # no wrap-around where not ok
+        out = a_dst[idx] + delta
+        ok &= (out >= start_dst[idx]) & (out < end_dst[idx])
+        return np.where(ok, out, 0), ok
+
+    def translate_ranges(self, src, dst, starts, ends):
+        """Map [start, end) ranges; the last byte is mapped, not the end.
+
+        Returns (new_starts, new_ends, ok).
+        """
+        starts = np.asarray(starts, dtype=np.uint64)
+        ends = np.asarray(ends, dtype=np.uint64)
+
+        s_out, s_ok = self.translate_addresses(src, dst, starts)
+        e_out, e_ok = self.translate_addresses(src, dst, ends - np.uint64(1))
+        e_out = e_out + np.uint64(1)
+
+        ok = s_ok & e_ok & (e_out > s_out)
+        return s_out, e_out, ok
+
+    def port_ranges(self, src, dst):
+        """Translate every module range of src into dst in one call.
+
+        Returns ({module name: [ModuleRange in dst]}, [(module name, range)
+        that could not be mapped]).
+        """
+        src_store, dst_p = self.builds[src], self.builds[dst].project
+        src_store.materialize()
+        src_p = src_store.project
+
+        owners, starts, ends, locks = [], [], [], []
+        for mod in src_p.modules.values():
+            for r in mod.ranges:
+                owners.append((mod.name, r))
+                starts.append(r.start)
+                ends.append(r.end)
+                locks.append(r.locked)
+
+        new_s, new_e, ok = self.translate_ranges(src, dst, starts, ends)
+
+        dst_secs = sorted(dst_p.sections.values(), key=lambda s: s.start)
+        sec_starts = np.array([s.start for s in dst_secs], dtype=np.uint64)
+        sec_idx = np.searchsorted(sec_starts, new_s, side="right") - 1
+
+        ported, failed = {}, []
+        for i, (name, r) in enumerate(owners):
+            if not ok[i]:
+                failed.append((name, r))
+                continue
+            ported.setdefault(name, []).append(ModuleRange(
+                dst_secs[sec_idx[i]].id, int(new_s[i]), int(new_e[i]), locks[i]))
+
+        return ported, failed
+
+    def apply_port(self, src, dst):
+        """Port src's ranges into dst, creating modules by name as needed.
+
+        Ranges for sections where the dst module already has one are left
+        alone. Returns (added, skipped, failed) counts.
+        """
+        ported, failed = self.port_ranges(src, dst)
+        store = self.builds[dst]
+        by_name = {m.name.lower(): m for m in store.project.modules.values()}
+
+        added = skipped = 0
+        for name, ranges in ported.items():
+            mod = by_name.get(name.lower())
+            if mod is None:
+                mod = by_name[name.lower()] = store.add_module(name)
+            have = {r.section_id for r in store.module_ranges(mod.id)}
+            for r in ranges:
+                if r.section_id in have:
+                    skipped += 1
+                    continue
+                store.set_module_range(mod.id, r.section_id, r.start, r.end, r.locked)
+                have.add(r.section_id)
+                added += 1
+
+        return added, skipped, len(failed)
+
+    # ---------------------------------------------------------- content
+
+    def compare_ranges(self, src, dst, mask_relocations=True):
+        """Which module ranges of src hold the same bytes at their ported place
+        in dst (both projects need their executable, see set_executable_file).
+
+        Returns {module name: (identical ranges, changed ranges)} counted
+        per module; ranges that cannot be ported are left out. Relocations
+        are masked by default so a moved image base does not count as a
+        change.
+        """
+        src_store, dst_store = self.builds[src], self.builds[dst]
+        src_store.materialize()
+
+        owners, starts, ends = [], [], []
+        for mod in src_store.project.modules.values():
+            for r in mod.ranges:
+                owners.append((mod.name, r))
+                starts.append(r.start)
+                ends.append(r.end)
+
+        new_s, new_e, ok = self.translate_ranges(src, dst, starts, ends)
+        keep = [i for i in range(len(owners)) if ok[i]]
+
+        src_hashes = src_store.hash_ranges(
+            [(owners[i][1].section_id, starts[i], ends[i]) for i in keep], mask_relocations)
+        dst_spans = [(int(new_s[i]), int(new_e[i])) for i in keep]
+        dst_hashes = dst_store.hash_spans(dst_spans, mask_relocations)
+
+        out = {}
+        for i, dst_hash in zip(keep, dst_hashes):
+            name, r = owners[i]
+            same, changed = out.get(name, (0, 0))
+            if src_hashes[(r.section_id, r.start, r.end)] == dst_hash:
+                out[name] = (same + 1, changed)
+            else:
+                out[name] = (same, changed + 1)
+        return out
+
+
+def _relative(path, base):
+    path = os.path.abspath(path)
+    try:
+        return os.path.relpath(path, base)
+    except ValueError:   # another drive (Windows)
+        return path
@@ -0,0 +1,109 @@
+import os
+
+import numpy as np
+
+# pointer-sized words read (as a view, no copy) at a time while scanning
+CHUNK_WORDS = 4 << 20
+
+_FORMAT = 1
+
+
+def _merge(spans):
+    """Sorted, non-overlapping (starts, ends) arrays of spans."""
+    merged = []
+    for a, b in sorted(spans):
+        if merged and a <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], b)
+        else:
+            merged.append([a, b])
+    starts = np.array([a for a, b in merged], dtype=np.uint64)
+    ends = np.array([b for a, b in merged], dtype=np.uint64)
+    return starts, ends
+
+
+class XrefIndex:
+    """Pointers from the data of an executable into its code, by target.
+
+    Two parallel uint64 arrays sorted by target: targets[i] is a code
+    address found stored, as an aligned pointer-sized value, at sources[i].
+    What is data and what is code comes from the PE section flags; a flat
+    image (no headers) is scanned against itself. A few MB even for big
+    binaries, so it is kept whole in memory and answers lookups with
+    searchsorted.
+    """
+
+    def __init__(self, targets, sources, ptr_size, signature=None):
+        self.targets = targets
+        self.sources = sources
+        self.ptr_size = ptr_size
+        self.signature = signature
+
+    def __len__(self):
+        return len(self.targets)
+
+    # ---------------------------------------------------------- build
+
+    @classmethod
+    def build(cls, image):
+        """Scan every data segment of the mapped image (file-backed bytes only)."""
+        ps = image.ptr_size
+        dtype = np.dtype("<u8" if ps == 8 else "<u4")
+        code_starts, code_ends = _merge(image.code)
+
+        if image.is_pe:
+            code = set(image.code)
+            data = [s for s in image.segments[1:] if (s[0], s[1]) not in code]   # [0]: headers
+        else:
+            data = image.segments
+
+        targets, sources = [], []
+        for va, _, offset, raw in data:
+            skip = -va % ps                    # first aligned address
+            count = (raw - skip) // ps
+            for i in range(0, max(count, 0), CHUNK_WORDS):
+                n = min(CHUNK_WORDS, count - i)
+                words = np.frombuffer(image.view, dtype=dtype, count=n,
+                                      offset=offset + skip + i * ps).astype(np.uint64)
+                k = np.searchsorted(code_starts, words, side="right") - 1
+                hit = (k >= 0) & (words < code_ends[np.maximum(k, 0)])
+                if hit.any():
+                    where = np.flatnonzero(hit).astype(np.uint64)
+                    targets.append(words[hit])
+                    sources.append(np.uint64(va + skip + i * ps) + where * np.uint64(ps))
+
+        if targets:
+            targets, sources = np.concatenate(targets), np.concatenate(sources)
+            order = np.lexsort((sources, targets))
+            targets, sources = targets[order], sources[order]
+        else:
+            targets = sources = np.zeros(0, dtype=np.uint64)
+        return cls(targets, sources, ps, image.signature)
+
+    # ---------------------------------------------------------- query
+
+    def refs_to(self, start, end):
+        """(targets, sources) of the pointers into [start, end), by target."""
+        lo = np.searchsorted(self.targets, np.uint64(start), side="left")
+        hi = np.searchsorted(self.targets, np.uint64(end), side="left")
+        return self.targets[lo:hi], self.sources[lo:hi]
+
+    # ---------------------------------------------------------- persistence
+
+    def save(self, filename):
+        tmp = filename + ".tmp.npz"
+        np.savez(tmp, format=_FORMAT, signature=np.array(self.signature, dtype=np.uint64),
+                 ptr_size=self.ptr_size, targets=self.targets, sources=self.sources)
+        os.replace(tmp, filename)
+
+    @classmethod
+    def load(cls, filename, signature):
+        """The saved index if it was built from a file with this signature, else None."""
+        if not os.path.exists(filename):
+            return None
+        try:
+            with np.load(filename) as data:
+                if int(data["format"]) != _FORMAT or tuple(data["signature"].tolist()) != tuple(signature):
+                    return None
+                return cls(data["targets"], data["sources"], int(data["ptr_size"]), tuple(signature))
+        except (OSError, ValueError, KeyError):
+            return None